@@ -23,6 +23,69 @@ class Settings:
     # ChromaDB settings
     CHROMA_PERSIST_DIRECTORY: str = "./chroma_db"
     EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"  # SentenceTransformers model
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")  # "torch" (SentenceTransformers) or "onnx"
+    EMBEDDING_ONNX_DIR: str = os.getenv("EMBEDDING_ONNX_DIR", "")  # Exported model; empty uses PROCESSED_DATA_DIR/onnx/<model>
+    EMBEDDING_ONNX_QUANTIZED: bool = os.getenv("EMBEDDING_ONNX_QUANTIZED", "false").lower() == "true"  # int8 weights
+    EMBEDDING_NUM_THREADS: int = int(os.getenv("EMBEDDING_NUM_THREADS", "0"))  # 0 uses every CPU available to the process
+
+    # Vector search backend: "chroma" (HNSW) or "numpy" (exact, in-process)
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma")
+    VECTOR_STORE_DIR: str = os.getenv("VECTOR_STORE_DIR", "./data/processed/vectors")
+
+    # Precomputed item-item neighbour table
+    NEIGHBOR_TABLE_DIR: str = os.getenv("NEIGHBOR_TABLE_DIR", "./data/processed/neighbors")
+    NEIGHBOR_TABLE_K: int = int(os.getenv("NEIGHBOR_TABLE_K", "50"))
+
+    # Collaborative-filtering model
+    CF_MODEL_DIR: str = os.getenv("CF_MODEL_DIR", "./data/processed/cf")
+    CF_FACTORS: int = int(os.getenv("CF_FACTORS", "64"))
+    CF_POSITIVE_THRESHOLD: float = float(os.getenv("CF_POSITIVE_THRESHOLD", "3.5"))
+    CF_GENRE_BOOST: float = float(os.getenv("CF_GENRE_BOOST", "0.2"))  # Relative score boost per favourite-genre match
+
+    # Content-based personalization: "multi_seed" (all favourites, one query) or "random_seed"
+    PERSONALIZATION_MODE: str = os.getenv("PERSONALIZATION_MODE", "multi_seed")
+    PERSONALIZATION_CANDIDATE_FACTOR: int = int(os.getenv("PERSONALIZATION_CANDIDATE_FACTOR", "4"))
+    PERSONALIZATION_GENRE_BOOST: float = float(os.getenv("PERSONALIZATION_GENRE_BOOST", "0.05"))  # Added per genre match
+
+    # Bulk ingestion settings
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "2048"))  # Rows encoded and upserted per chunk
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))  # Sentences per model forward pass
+
+    # Query embedding micro-batching settings
+    EMBEDDING_MICROBATCH_ENABLED: bool = os.getenv("EMBEDDING_MICROBATCH_ENABLED", "true").lower() == "true"
+    EMBEDDING_MICROBATCH_MAX_SIZE: int = int(os.getenv("EMBEDDING_MICROBATCH_MAX_SIZE", "32"))
+    EMBEDDING_MICROBATCH_WAIT_MS: float = float(os.getenv("EMBEDDING_MICROBATCH_WAIT_MS", "5"))
+
+    # Search settings
+    SEARCH_MAX_OVERFETCH: int = int(os.getenv("SEARCH_MAX_OVERFETCH", "8"))  # Max n_results as a multiple of limit
+
+    # Tool execution settings
+    TOOL_EXECUTOR_MAX_WORKERS: int = int(os.getenv("TOOL_EXECUTOR_MAX_WORKERS", "8"))  # Threads for sync tools
+    TOOL_DEFAULT_CONCURRENCY: int = int(os.getenv("TOOL_DEFAULT_CONCURRENCY", "4"))  # Per-tool in-flight calls
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"  # Coalesce identical calls
+    TOOL_RESULT_CACHE_TTL_SECONDS: float = float(os.getenv("TOOL_RESULT_CACHE_TTL_SECONDS", "5"))  # 0 disables
+    TOOL_RESULT_CACHE_SIZE: int = int(os.getenv("TOOL_RESULT_CACHE_SIZE", "1024"))
+
+    # Query embedding cache settings
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))  # In-memory LRU entries
+    EMBEDDING_CACHE_DISK_PATH: str = os.getenv("EMBEDDING_CACHE_DISK_PATH", "")  # Empty disables the disk tier
+    EMBEDDING_CACHE_DISK_SIZE: int = int(os.getenv("EMBEDDING_CACHE_DISK_SIZE", "100000"))
+
+    # Background job settings
+    JOBS_STATE_PATH: str = os.getenv("JOBS_STATE_PATH", "./data/processed/jobs.json")  # Registry and checkpoints
+    JOBS_MAX_HISTORY: int = int(os.getenv("JOBS_MAX_HISTORY", "100"))  # Finished jobs kept in the registry
+
+    # Session settings
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory")
+    SESSION_TTL_SECONDS: int = int(os.getenv("SESSION_TTL_SECONDS", "3600"))  # Idle time before a session expires
+    SESSION_MAX_SESSIONS: int = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+
+    # Semantic response cache settings
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+    RESPONSE_CACHE_THRESHOLD: float = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.92"))  # Minimum cosine similarity
 
     # LLM settings
     LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "openai")
@@ -30,10 +93,28 @@ class Settings:
     LLM_MODEL_NAME: str = os.getenv("LLM_MODEL_NAME", "gpt-3.5-turbo")
     LLM_TEMPERATURE: float = 0.7
     LLM_MAX_TOKENS: int = 1000
+    LLM_API_BASE: str = os.getenv("LLM_API_BASE", "https://api.openai.com/v1")  # Any OpenAI-compatible server
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # In-flight calls and pooled connections
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+    LLM_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_BACKOFF_BASE_SECONDS: float = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+    LLM_BACKOFF_MAX_SECONDS: float = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+    LLM_TOOL_FORMAT: str = os.getenv("LLM_TOOL_FORMAT", "tools")  # "tools" or legacy "functions"
+    LLM_STREAM_USAGE: bool = os.getenv("LLM_STREAM_USAGE", "false").lower() == "true"  # Ask streams to report token usage
+
+    # Agent loop settings
+    MAX_AGENT_STEPS: int = int(os.getenv("MAX_AGENT_STEPS", "4"))  # LLM calls per chat turn
+    HISTORY_TOKEN_BUDGET: int = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))  # Older turns are summarized past this
+    TOOL_RESULT_COMPACTION_ENABLED: bool = os.getenv("TOOL_RESULT_COMPACTION_ENABLED", "true").lower() == "true"
+    TOOL_RESULT_MAX_ITEMS: int = int(os.getenv("TOOL_RESULT_MAX_ITEMS", "10"))  # List entries sent to the LLM
+    TOOL_RESULT_FLOAT_DIGITS: int = int(os.getenv("TOOL_RESULT_FLOAT_DIGITS", "2"))
 
     # Data settings
     MOVIE_DATA_SOURCE: str = os.getenv("MOVIE_DATA_SOURCE",
                                        "https://files.grouplens.org/datasets/movielens/ml-latest-small.zip")
+    MOVIE_DATA_SHA256: str = os.getenv("MOVIE_DATA_SHA256", "")  # Expected archive checksum; empty skips the check
+    RATING_PRIOR_COUNT: float = float(os.getenv("RATING_PRIOR_COUNT", "10"))  # Bayesian score weight of the global mean
     DATA_DIR: str = "./data"
     PROCESSED_DATA_DIR: str = "./data/processed"
 
@@ -0,0 +1,256 @@
+import logging
+import re
+import threading
+from typing import List, Dict, Any, Optional
+import numpy as np
+import pandas as pd
+
+from app.data.title_index import TitleIndex
+from app.utils.text_utils import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# MovieLens genre vocabulary, in bit order for the genre bitmask
+GENRES = [
+    "Action", "Adventure", "Animation", "Children", "Comedy", "Crime",
+    "Documentary", "Drama", "Fantasy", "Film-Noir", "Horror", "IMAX",
+    "Musical", "Mystery", "Romance", "Sci-Fi", "Thriller", "War", "Western",
+    "(no genres listed)",
+]
+
+def genre_slug(genre: str) -> str:
+    """Canonical form of a genre name, so "Sci Fi" and "Sci-Fi" compare equal"""
+    return re.sub(r"[^a-z0-9]+", "_", normalize_text(genre)).strip("_")
+
+def genre_flag_key(genre: str) -> str:
+    """Metadata key of the boolean flag marking a movie as having a genre"""
+    return f"genre_{genre_slug(genre)}"
+
+class MovieCatalog:
+    """
+    In-memory columnar movie catalog
+
+    Every column is a NumPy array indexed by row; `row_for_id` maps a
+    MovieLens movie ID to its row. Filters are evaluated as boolean masks
+    over whole columns instead of looping over rows, and title lookups go
+    through a TitleIndex built at load time.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        titles: np.ndarray,
+        genres: np.ndarray,
+        years: np.ndarray,
+        genre_masks: np.ndarray,
+        avg_ratings: np.ndarray,
+        num_ratings: np.ndarray,
+        genre_bits: Dict[str, int],
+        bayesian_scores: Optional[np.ndarray] = None,
+        popularity_order: Optional[np.ndarray] = None
+    ):
+        self.ids = ids
+        self.titles = titles
+        self.genres = genres
+        self.norm_titles = np.array([normalize_text(t) for t in titles], dtype=str)
+        self.years = years
+        self.genre_masks = genre_masks
+        self.avg_ratings = avg_ratings
+        self.num_ratings = num_ratings
+        self.bayesian_scores = bayesian_scores if bayesian_scores is not None else avg_ratings
+        self.genre_bits = genre_bits
+        self._row_by_id = {int(movie_id): row for row, movie_id in enumerate(ids.tolist())}
+        self.title_index = TitleIndex(self.norm_titles)
+
+        # Most rated first, ties broken by score; the loader precomputes this order
+        if popularity_order is None:
+            popularity_order = np.lexsort((-np.nan_to_num(self.bayesian_scores), -num_ratings))
+        self.popularity_order = popularity_order
+
+    @classmethod
+    def from_dataframe(cls, movies_df: pd.DataFrame, popularity_order: Optional[np.ndarray] = None) -> "MovieCatalog":
+        """
+        Build a catalog from the MovieLens movies DataFrame
+
+        Args:
+            movies_df: DataFrame with movieId, title_clean, year, genres and,
+                when available, avg_rating, num_ratings and bayesian_score columns
+            popularity_order: Precomputed rows sorted by popularity (computed
+                from the rating columns when omitted)
+
+        Returns:
+            MovieCatalog instance
+        """
+        n = len(movies_df)
+
+        genres = movies_df["genres"].map(
+            lambda g: list(g) if isinstance(g, (list, tuple)) else []
+        )
+
+        # Known genres keep fixed bits, unexpected ones are appended
+        genre_bits = {genre_slug(g): i for i, g in enumerate(GENRES)}
+        for genre in sorted({g for movie_genres in genres for g in movie_genres}):
+            genre_bits.setdefault(genre_slug(genre), len(genre_bits))
+        if len(genre_bits) > 63:
+            raise ValueError(f"Too many distinct genres for a 64-bit mask: {len(genre_bits)}")
+
+        genre_masks = np.fromiter(
+            (sum(1 << genre_bits[genre_slug(g)] for g in set(movie_genres)) for movie_genres in genres),
+            dtype=np.int64,
+            count=n
+        )
+
+        years = pd.to_numeric(movies_df["year"], errors="coerce").fillna(0).to_numpy(dtype=np.int32)
+
+        if "avg_rating" in movies_df.columns:
+            avg_ratings = pd.to_numeric(movies_df["avg_rating"], errors="coerce").to_numpy(dtype=np.float32)
+        else:
+            avg_ratings = np.full(n, np.nan, dtype=np.float32)
+
+        if "num_ratings" in movies_df.columns:
+            num_ratings = pd.to_numeric(movies_df["num_ratings"], errors="coerce").fillna(0).to_numpy(dtype=np.int32)
+        else:
+            num_ratings = np.zeros(n, dtype=np.int32)
+
+        if "bayesian_score" in movies_df.columns:
+            bayesian_scores = pd.to_numeric(movies_df["bayesian_score"], errors="coerce").to_numpy(dtype=np.float32)
+        else:
+            bayesian_scores = None
+
+        genre_lists = np.empty(n, dtype=object)
+        genre_lists[:] = genres.tolist()
+
+        return cls(
+            ids=movies_df["movieId"].to_numpy(dtype=np.int64),
+            titles=movies_df["title_clean"].astype(str).to_numpy(dtype=object),
+            genres=genre_lists,
+            years=years,
+            genre_masks=genre_masks,
+            avg_ratings=avg_ratings,
+            num_ratings=num_ratings,
+            genre_bits=genre_bits,
+            bayesian_scores=bayesian_scores,
+            popularity_order=np.asarray(popularity_order) if popularity_order is not None else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def has_ratings(self) -> bool:
+        """Whether rating aggregates were available when the catalog was built"""
+        return bool(self.num_ratings.any())
+
+    def row_for_id(self, movie_id: int) -> Optional[int]:
+        """Get the row of a movie ID, or None if it is not in the catalog"""
+        return self._row_by_id.get(int(movie_id))
+
+    def rows_for_ids(self, movie_ids: List[int]) -> np.ndarray:
+        """Get the rows of the given movie IDs, skipping unknown IDs"""
+        rows = [self._row_by_id.get(int(movie_id)) for movie_id in movie_ids]
+        return np.array([row for row in rows if row is not None], dtype=np.int64)
+
+    def genres_to_mask(self, genres: List[str]) -> int:
+        """Convert genre names to a bitmask, ignoring unknown genres"""
+        mask = 0
+        for genre in genres:
+            bit = self.genre_bits.get(genre_slug(genre))
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def filter_mask(
+        self,
+        genres: Optional[List[str]] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        min_rating: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Evaluate filters over the whole catalog
+
+        Args:
+            genres: Keep movies with any of these genres
+            year_from: Minimum release year
+            year_to: Maximum release year
+            min_rating: Minimum average rating
+
+        Returns:
+            Boolean array with one entry per row
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if genres:
+            mask &= (self.genre_masks & self.genres_to_mask(genres)) != 0
+        if year_from:
+            mask &= self.years >= year_from
+        if year_to:
+            mask &= (self.years <= year_to) & (self.years > 0)
+        if min_rating is not None:
+            mask &= self.avg_ratings >= min_rating
+
+        return mask
+
+    def popular_rows(self, limit: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Get the rows of the most popular movies, optionally filtered (a slice of the precomputed order)"""
+        order = self.popularity_order
+        if mask is not None:
+            order = order[mask[order]]
+        return order[:limit]
+
+    def movie_at(self, row: int) -> Dict[str, Any]:
+        """Get a movie dictionary for a catalog row"""
+        year = int(self.years[row])
+        movie = {
+            "id": int(self.ids[row]),
+            "title": self.titles[row],
+            "year": str(year) if year else None,
+            "genres": list(self.genres[row]),
+        }
+
+        if self.num_ratings[row] > 0:
+            movie["avg_rating"] = round(float(self.avg_ratings[row]), 2)
+            movie["num_ratings"] = int(self.num_ratings[row])
+
+        return movie
+
+    def to_movies(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Get movie dictionaries for several catalog rows"""
+        return [self.movie_at(int(row)) for row in rows]
+
+    def get_movie(self, movie_id: int) -> Optional[Dict[str, Any]]:
+        """Get a movie dictionary by movie ID, or None if unknown"""
+        row = self.row_for_id(movie_id)
+        return self.movie_at(row) if row is not None else None
+
+# Singleton for the movie catalog
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_catalog() -> MovieCatalog:
+    """Get or load the process-wide movie catalog"""
+    global _catalog
+
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = _build_catalog()
+
+    return _catalog
+
+def reload_catalog() -> MovieCatalog:
+    """Rebuild the catalog from the current dataset"""
+    global _catalog
+
+    catalog = _build_catalog()
+    with _catalog_lock:
+        _catalog = catalog
+    return catalog
+
+def _build_catalog() -> MovieCatalog:
+    from app.data.loader import load_movie_data, load_popularity_order
+
+    logger.info("Loading movie catalog")
+    catalog = MovieCatalog.from_dataframe(load_movie_data(), popularity_order=load_popularity_order())
+    logger.info(f"Movie catalog loaded with {len(catalog)} movies")
+    return catalog
@@ -0,0 +1,456 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+import numpy as np
+import pandas as pd
+import requests
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout or parsing of the column cache changes
+CACHE_VERSION = 2
+
+MOVIE_COLUMNS = ["movieId", "title", "title_clean", "year", "genres", "avg_rating", "num_ratings", "bayesian_score"]
+RATING_COLUMNS = ["userId", "movieId", "rating"]
+
+_YEAR_PATTERN = re.compile(r"\s*\((\d{4})\)\s*$")
+
+def _dataset_name() -> str:
+    """Name of the dataset, taken from the archive file name (e.g. ml-latest-small)"""
+    source_path = urlparse(settings.MOVIE_DATA_SOURCE).path or settings.MOVIE_DATA_SOURCE
+    return os.path.splitext(os.path.basename(source_path))[0]
+
+def dataset_dir() -> str:
+    """Directory the MovieLens archive is extracted to"""
+    return os.path.join(settings.DATA_DIR, _dataset_name())
+
+def cache_dir() -> str:
+    """Directory of the columnar cache built from the extracted CSVs"""
+    return os.path.join(settings.PROCESSED_DATA_DIR, _dataset_name())
+
+def _fetch_archive(source: str) -> str:
+    """
+    Get a local path to the dataset archive, downloading it once if needed
+
+    HTTP(S) sources are downloaded into DATA_DIR and reused afterwards;
+    file:// URLs and plain paths are read in place, which lets a local
+    archive stand in for the network.
+    """
+    parsed = urlparse(source)
+    if parsed.scheme == "file":
+        return url2pathname(parsed.path)
+    if parsed.scheme not in ("http", "https"):
+        return source
+
+    archive_path = os.path.join(settings.DATA_DIR, os.path.basename(parsed.path))
+    if os.path.exists(archive_path):
+        return archive_path
+
+    os.makedirs(settings.DATA_DIR, exist_ok=True)
+    logger.info(f"Downloading {source}")
+    partial_path = archive_path + ".part"
+    with requests.get(source, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with open(partial_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+    os.replace(partial_path, archive_path)
+    return archive_path
+
+def _archive_sha256(archive_path: str) -> str:
+    """
+    SHA-256 of the archive
+
+    The digest is remembered in DATA_DIR together with the archive's size
+    and modification time, so it is only recomputed when the file changes.
+    """
+    stat = os.stat(archive_path)
+    memo_path = os.path.join(settings.DATA_DIR, os.path.basename(archive_path) + ".sha256")
+    try:
+        with open(memo_path) as f:
+            memo = json.load(f)
+        if memo["size"] == stat.st_size and memo["mtime_ns"] == stat.st_mtime_ns:
+            return memo["sha256"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    digest = hashlib.sha256()
+    with open(archive_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    sha256 = digest.hexdigest()
+
+    os.makedirs(settings.DATA_DIR, exist_ok=True)
+    with open(memo_path, "w") as f:
+        json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}, f)
+    return sha256
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _extract(archive_path: str, target_dir: str):
+    """Extract the archive and move the folder holding movies.csv to target_dir"""
+    os.makedirs(settings.DATA_DIR, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(dir=settings.DATA_DIR, prefix=".extract-")
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            archive.extractall(staging_dir)
+
+        for root, _, files in os.walk(staging_dir):
+            if "movies.csv" in files:
+                break
+        else:
+            raise ValueError(f"No movies.csv found in {archive_path}")
+
+        shutil.rmtree(target_dir, ignore_errors=True)
+        os.replace(root, target_dir)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+def _prepare_dataset() -> Tuple[str, str]:
+    """Make sure the extracted dataset matches the archive, returning its directory and the archive hash"""
+    archive_path = _fetch_archive(settings.MOVIE_DATA_SOURCE)
+    sha256 = _archive_sha256(archive_path)
+
+    expected = settings.MOVIE_DATA_SHA256.strip().lower()
+    if expected and sha256 != expected:
+        raise ValueError(f"Checksum mismatch for {archive_path}: expected {expected}, got {sha256}")
+
+    target_dir = dataset_dir()
+    marker_path = os.path.join(target_dir, ".archive_sha256")
+    if _read_text(marker_path) != sha256:
+        logger.info(f"Extracting {archive_path} to {target_dir}")
+        _extract(archive_path, target_dir)
+        with open(marker_path, "w") as f:
+            f.write(sha256)
+
+    return target_dir, sha256
+
+def download_and_extract_dataset() -> str:
+    """
+    Download, verify and extract the MovieLens dataset if needed
+
+    The archive is fetched once and checked against MOVIE_DATA_SHA256 when
+    that is set. It is only extracted again when its hash changes.
+
+    Returns:
+        Directory containing the extracted CSV files
+    """
+    directory, _ = _prepare_dataset()
+    return directory
+
+def parse_movies_csv(path: str) -> Dict[str, np.ndarray]:
+    """
+    Parse movies.csv into typed columns
+
+    Args:
+        path: Path to movies.csv
+
+    Returns:
+        Dictionary of column arrays: movieId, title, title_clean, year
+        (0 when unknown) and genres ("|"-separated)
+    """
+    movies = pd.read_csv(path, dtype={"movieId": np.int64, "title": str, "genres": str}, keep_default_na=False)
+
+    titles = movies["title"].str.strip()
+    years = titles.str.extract(_YEAR_PATTERN, expand=False)
+    return {
+        "movieId": movies["movieId"].to_numpy(dtype=np.int64),
+        "title": titles.to_numpy(dtype=str),
+        "title_clean": titles.str.replace(_YEAR_PATTERN, "", regex=True).to_numpy(dtype=str),
+        "year": pd.to_numeric(years, errors="coerce").fillna(0).to_numpy(dtype=np.int32),
+        "genres": movies["genres"].to_numpy(dtype=str),
+    }
+
+def parse_ratings_csv(path: str) -> Dict[str, np.ndarray]:
+    """
+    Parse ratings.csv into typed columns
+
+    Args:
+        path: Path to ratings.csv
+
+    Returns:
+        Dictionary of column arrays: userId, movieId and rating
+    """
+    ratings = pd.read_csv(
+        path,
+        usecols=RATING_COLUMNS,
+        dtype={"userId": np.int32, "movieId": np.int32, "rating": np.float32}
+    )
+    return {column: ratings[column].to_numpy() for column in RATING_COLUMNS}
+
+def compute_rating_aggregates(
+    movie_ids: np.ndarray,
+    rating_movie_ids: Optional[np.ndarray],
+    ratings: Optional[np.ndarray],
+    prior_count: float
+) -> Dict[str, np.ndarray]:
+    """
+    Per-movie rating aggregates in one vectorized pass over the ratings
+
+    Ratings are mapped to movie rows with a lookup table and summed with
+    np.bincount, so no per-movie Python loop or pandas group-by is needed.
+    The Bayesian score shrinks each movie's mean towards the global mean
+    as if it had prior_count extra ratings at that mean, which keeps
+    movies with a handful of high ratings from topping the charts.
+
+    Args:
+        movie_ids: Movie ID of every row of the movies table
+        rating_movie_ids: Movie ID of every rating, or None without ratings
+        ratings: Rating values, aligned with rating_movie_ids
+        prior_count: Weight of the global mean in the Bayesian score
+
+    Returns:
+        Dictionary of row-aligned arrays: avg_rating (NaN when unrated),
+        num_ratings and bayesian_score, plus popularity_order (rows sorted
+        by number of ratings, then Bayesian score)
+    """
+    n = len(movie_ids)
+    counts = np.zeros(n, dtype=np.int64)
+    sums = np.zeros(n, dtype=np.float64)
+
+    if rating_movie_ids is not None and len(rating_movie_ids):
+        # MovieLens IDs are small integers, so a dense ID -> row table is cheapest
+        row_of_id = np.full(int(max(movie_ids.max(), rating_movie_ids.max())) + 1, -1, dtype=np.int64)
+        row_of_id[movie_ids] = np.arange(n)
+        rows = row_of_id[rating_movie_ids]
+        known = rows >= 0
+        rows = rows[known]
+
+        counts = np.bincount(rows, minlength=n)
+        sums = np.bincount(rows, weights=np.asarray(ratings, dtype=np.float64)[known], minlength=n)
+
+    rated = counts > 0
+    avg_ratings = np.full(n, np.nan)
+    np.divide(sums, counts, out=avg_ratings, where=rated)
+
+    global_mean = sums.sum() / counts.sum() if rated.any() else 0.0
+    bayesian_scores = np.where(rated, (sums + prior_count * global_mean) / (counts + prior_count), np.nan)
+
+    return {
+        "avg_rating": avg_ratings.astype(np.float32),
+        "num_ratings": counts.astype(np.int32),
+        "bayesian_score": bayesian_scores.astype(np.float32),
+        "popularity_order": np.lexsort((-np.nan_to_num(bayesian_scores), -counts)).astype(np.int64),
+    }
+
+def _write_cache(directory: str, source_dir: str, sha256: str):
+    """Parse the CSVs, precompute rating aggregates and write every column as a .npy file, manifest last"""
+    start = time.perf_counter()
+    tables = {"movies": parse_movies_csv(os.path.join(source_dir, "movies.csv"))}
+    ratings_path = os.path.join(source_dir, "ratings.csv")
+    if os.path.exists(ratings_path):
+        tables["ratings"] = parse_ratings_csv(ratings_path)
+
+    ratings = tables.get("ratings", {})
+    aggregates = compute_rating_aggregates(
+        tables["movies"]["movieId"],
+        ratings.get("movieId"),
+        ratings.get("rating"),
+        settings.RATING_PRIOR_COUNT
+    )
+    tables["movies"].update(aggregates)
+
+    os.makedirs(os.path.dirname(directory) or ".", exist_ok=True)
+    staging_dir = tempfile.mkdtemp(dir=os.path.dirname(directory) or ".", prefix=".columns-")
+    try:
+        for table, columns in tables.items():
+            for column, values in columns.items():
+                np.save(os.path.join(staging_dir, f"{table}.{column}.npy"), values)
+
+        manifest = {
+            "version": CACHE_VERSION,
+            "archive_sha256": sha256,
+            "rating_prior_count": settings.RATING_PRIOR_COUNT,
+            "rows": {table: len(next(iter(columns.values()))) for table, columns in tables.items()},
+        }
+        with open(os.path.join(staging_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging_dir, directory)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    logger.info(f"Built column cache in {directory} in {time.perf_counter() - start:.2f}s: {manifest['rows']}")
+
+def _read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _load_columns(directory: str, table: str, columns: List[str]) -> Dict[str, np.ndarray]:
+    """Memory-map the cached columns of a table"""
+    return {
+        column: np.load(os.path.join(directory, f"{table}.{column}.npy"), mmap_mode="r")
+        for column in columns
+    }
+
+def ensure_column_cache() -> Tuple[str, Dict[str, Any]]:
+    """
+    Make sure the column cache matches the current archive, building it if needed
+
+    Returns:
+        Cache directory and its manifest
+    """
+    source_dir, sha256 = _prepare_dataset()
+    directory = cache_dir()
+
+    manifest = _read_manifest(directory)
+    if (
+        manifest is None
+        or manifest.get("version") != CACHE_VERSION
+        or manifest.get("archive_sha256") != sha256
+        or manifest.get("rating_prior_count") != settings.RATING_PRIOR_COUNT
+    ):
+        _write_cache(directory, source_dir, sha256)
+        manifest = _read_manifest(directory)
+
+    return directory, manifest
+
+# Memoized frames, keyed by the manifest of the cache they were loaded from
+_movies: Optional[Tuple[Dict[str, Any], pd.DataFrame]] = None
+_popularity: Optional[Tuple[Dict[str, Any], np.ndarray]] = None
+_ratings: Optional[Tuple[Dict[str, Any], pd.DataFrame]] = None
+_load_lock = threading.Lock()
+
+def load_movie_data() -> pd.DataFrame:
+    """
+    Load the MovieLens movies table
+
+    Columns come from the memory-mapped cache; the frame is reused until
+    the source archive changes.
+
+    Returns:
+        DataFrame with movieId, title, title_clean, year (0 when unknown),
+        genres (list of genre names), avg_rating (NaN when unrated),
+        num_ratings and bayesian_score columns
+    """
+    global _movies
+
+    with _load_lock:
+        directory, manifest = ensure_column_cache()
+        if _movies is not None and _movies[0] == manifest:
+            return _movies[1]
+
+        start = time.perf_counter()
+        columns = _load_columns(directory, "movies", MOVIE_COLUMNS)
+        movies_df = pd.DataFrame({
+            "movieId": columns["movieId"],
+            "title": columns["title"].astype(object),
+            "title_clean": columns["title_clean"].astype(object),
+            "year": columns["year"],
+            "genres": [genres.split("|") if genres else [] for genres in columns["genres"].tolist()],
+            "avg_rating": columns["avg_rating"],
+            "num_ratings": columns["num_ratings"],
+            "bayesian_score": columns["bayesian_score"],
+        })
+        logger.info(f"Loaded {len(movies_df)} movies from column cache in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        _movies = (manifest, movies_df)
+        return movies_df
+
+def load_popularity_order() -> np.ndarray:
+    """
+    Rows of the movies table sorted by popularity
+
+    Precomputed with the column cache: most rated first, ties broken by
+    Bayesian score. The top N movies are the first N entries.
+
+    Returns:
+        Array of row positions into load_movie_data()
+    """
+    global _popularity
+
+    with _load_lock:
+        directory, manifest = ensure_column_cache()
+        if _popularity is None or _popularity[0] != manifest:
+            _popularity = (manifest, _load_columns(directory, "movies", ["popularity_order"])["popularity_order"])
+        return _popularity[1]
+
+def load_ratings_data() -> pd.DataFrame:
+    """
+    Load the MovieLens ratings table
+
+    The columns are memory-mapped rather than read into memory, so the
+    frame is cheap to create even for the large datasets.
+
+    Returns:
+        DataFrame with userId, movieId and rating columns
+    """
+    global _ratings
+
+    with _load_lock:
+        directory, manifest = ensure_column_cache()
+        if _ratings is not None and _ratings[0] == manifest:
+            return _ratings[1]
+
+        if "ratings" not in manifest["rows"]:
+            raise FileNotFoundError(f"The {_dataset_name()} dataset has no ratings.csv")
+
+        ratings_df = pd.DataFrame(_load_columns(directory, "ratings", RATING_COLUMNS), copy=False)
+        _ratings = (manifest, ratings_df)
+        return ratings_df
+
+def _movie_dict(row: pd.Series) -> Dict[str, Any]:
+    year = int(row["year"])
+    movie = {
+        "id": int(row["movieId"]),
+        "title": row["title_clean"],
+        "year": str(year) if year else None,
+        "genres": list(row["genres"]),
+    }
+
+    if row["num_ratings"] > 0:
+        movie["avg_rating"] = round(float(row["avg_rating"]), 2)
+        movie["num_ratings"] = int(row["num_ratings"])
+
+    return movie
+
+def get_movie_details(movie_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Get details for a movie straight from the dataset
+
+    Args:
+        movie_id: MovieLens movie ID
+
+    Returns:
+        Movie dictionary, or None if the ID is unknown
+    """
+    movies_df = load_movie_data()
+    matches = movies_df.index[movies_df["movieId"].to_numpy() == movie_id]
+    if len(matches) == 0:
+        return None
+    return _movie_dict(movies_df.loc[matches[0]])
+
+def get_popular_movies(limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Get the most rated movies
+
+    Args:
+        limit: Maximum number of movies to return
+
+    Returns:
+        List of movie dictionaries with avg_rating and num_ratings
+    """
+    movies_df = load_movie_data()
+    rows = load_popularity_order()[:limit]
+    return [_movie_dict(row) for _, row in movies_df.iloc[rows].iterrows()]
@@ -0,0 +1,185 @@
+import logging
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+
+from app.utils.text_utils import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Match types in ranking order
+MATCH_EXACT = "exact"
+MATCH_PREFIX = "prefix"
+MATCH_SUBSTRING = "partial"
+MATCH_FUZZY = "fuzzy"
+
+_MATCH_BASE_SCORES = {
+    MATCH_EXACT: 3.0,
+    MATCH_PREFIX: 2.0,
+    MATCH_SUBSTRING: 1.0,
+    MATCH_FUZZY: 0.0,
+}
+
+def _trigrams(text: str, padded: bool = True) -> List[str]:
+    """Get the unique character trigrams of a normalized string"""
+    if padded:
+        text = f"  {text} "
+    return list(dict.fromkeys(text[i:i + 3] for i in range(len(text) - 2)))
+
+class TitleIndex:
+    """
+    Trigram and prefix index over normalized movie titles
+
+    Trigram posting lists are stored CSR-style: the rows containing
+    trigram g are postings[offsets[g]:offsets[g + 1]]. Prefix lookups use
+    binary search over the sorted titles.
+    """
+
+    def __init__(self, norm_titles: np.ndarray):
+        self.norm_titles = norm_titles
+        n = len(norm_titles)
+
+        # Collect (trigram, row) pairs once, then sort them into posting lists
+        gram_ids: Dict[str, int] = {}
+        pair_grams: List[int] = []
+        pair_rows: List[int] = []
+        gram_counts = np.zeros(n, dtype=np.int32)
+
+        for row, title in enumerate(norm_titles.tolist()):
+            grams = _trigrams(title)
+            gram_counts[row] = len(grams)
+            for gram in grams:
+                pair_grams.append(gram_ids.setdefault(gram, len(gram_ids)))
+                pair_rows.append(row)
+
+        pair_grams_arr = np.array(pair_grams, dtype=np.int32)
+        order = np.argsort(pair_grams_arr, kind="stable")
+
+        self.gram_ids = gram_ids
+        self.gram_counts = gram_counts
+        self.postings = np.array(pair_rows, dtype=np.int32)[order]
+        self.offsets = np.zeros(len(gram_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_grams_arr, minlength=len(gram_ids)), out=self.offsets[1:])
+
+        # Sorted prefix array
+        self.sorted_rows = np.argsort(norm_titles, kind="stable")
+        self.sorted_titles = norm_titles[self.sorted_rows]
+
+        logger.info(f"Title index built: {n} titles, {len(gram_ids)} trigrams")
+
+    def _posting(self, gram: str) -> Optional[np.ndarray]:
+        gram_id = self.gram_ids.get(gram)
+        if gram_id is None:
+            return None
+        return self.postings[self.offsets[gram_id]:self.offsets[gram_id + 1]]
+
+    def exact(self, query: str) -> np.ndarray:
+        """Rows whose title equals the normalized query"""
+        start = np.searchsorted(self.sorted_titles, query, side="left")
+        end = np.searchsorted(self.sorted_titles, query, side="right")
+        return self.sorted_rows[start:end]
+
+    def prefix(self, query: str) -> np.ndarray:
+        """Rows whose title starts with the normalized query"""
+        start = np.searchsorted(self.sorted_titles, query, side="left")
+        end = np.searchsorted(self.sorted_titles, query + "\uffff", side="left")
+        return self.sorted_rows[start:end]
+
+    def substring(self, query: str) -> np.ndarray:
+        """Rows whose title contains the normalized query"""
+        if len(query) < 3:
+            # Too short for trigrams, and too unselective to be useful
+            return self.prefix(query)
+
+        # A containing title must have every inner trigram of the query
+        candidates = None
+        for gram in _trigrams(query, padded=False):
+            posting = self._posting(gram)
+            if posting is None:
+                return np.array([], dtype=np.int64)
+            candidates = posting if candidates is None else np.intersect1d(
+                candidates, posting, assume_unique=True
+            )
+
+        found = np.char.find(self.norm_titles[candidates], query) >= 0
+        return candidates[found]
+
+    def fuzzy(self, query: str, min_score: float = 0.3) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows whose title shares enough trigrams with the query
+
+        Args:
+            query: Normalized query
+            min_score: Minimum Dice coefficient over padded trigrams
+
+        Returns:
+            Tuple of (rows, scores)
+        """
+        grams = _trigrams(query)
+        postings = [p for p in (self._posting(g) for g in grams) if p is not None]
+        if not postings:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.norm_titles))
+        rows = np.flatnonzero(shared)
+        scores = 2.0 * shared[rows] / (len(grams) + self.gram_counts[rows])
+
+        keep = scores >= min_score
+        return rows[keep], scores[keep].astype(np.float32)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        mask: Optional[np.ndarray] = None,
+        fuzzy: bool = True
+    ) -> List[Tuple[int, float, str]]:
+        """
+        Ranked title lookup: exact, then prefix, then substring, then fuzzy matches
+
+        Args:
+            query: Title query (normalized before matching)
+            limit: Maximum number of results
+            mask: Optional boolean row filter
+            fuzzy: Whether to add trigram-similarity matches
+
+        Returns:
+            List of (row, score, match type) tuples, best first
+        """
+        query = normalize_text(query)
+        if not query:
+            return []
+
+        best: Dict[int, Tuple[float, str]] = {}
+
+        def add(rows: np.ndarray, match_type: str, similarity: Optional[np.ndarray] = None):
+            if mask is not None:
+                keep = mask[rows]
+                rows = rows[keep]
+                if similarity is not None:
+                    similarity = similarity[keep]
+
+            if similarity is None:
+                # Shorter titles are closer to the query
+                similarity = len(query) / np.maximum(np.char.str_len(self.norm_titles[rows]), 1)
+
+            # Only the best few of a large bucket can make the final ranking
+            cap = limit * 4
+            if len(rows) > cap:
+                top = np.argpartition(-similarity, cap)[:cap]
+                rows, similarity = rows[top], similarity[top]
+
+            for row, sim in zip(rows.tolist(), similarity.tolist()):
+                if row not in best:
+                    best[row] = (_MATCH_BASE_SCORES[match_type] + float(sim), match_type)
+
+        add(self.exact(query), MATCH_EXACT)
+        add(self.prefix(query), MATCH_PREFIX)
+        add(self.substring(query), MATCH_SUBSTRING)
+
+        if fuzzy and len(best) < limit:
+            rows, similarity = self.fuzzy(query)
+            add(rows, MATCH_FUZZY, similarity)
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+        return [(row, round(score - _MATCH_BASE_SCORES[match_type], 4), match_type)
+                for row, (score, match_type) in ranked]
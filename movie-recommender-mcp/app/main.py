@@ -6,8 +6,12 @@ import os
 
 from app.config import settings
 from app.routers import mcp, admin
+from app.data.catalog import get_catalog
+from app.services.tool_executor import run_tool
+from app.services.llm_client import close_llm_client
+from app.services.jobs import get_job_registry
 
-from app.tools.search_tools import search_movies, get_movie_by_id, get_top_movies
+from app.tools.search_tools import search_movies, find_titles, get_movie_by_id, get_top_movies
 from app.tools.recommend_tools import recommend_similar_movies, recommend_by_genres, recommend_by_query, recommend_personalized
 
 # Setup logging
@@ -47,6 +51,22 @@ async def startup_event():
     os.makedirs(settings.DATA_DIR, exist_ok=True)
     os.makedirs(settings.PROCESSED_DATA_DIR, exist_ok=True)
 
+    # Load the movie catalog once so searches don't re-read the dataset
+    try:
+        get_catalog()
+    except Exception as e:
+        logger.warning(f"Movie catalog not loaded at startup, will retry on first use: {e}")
+
+    # Pick up background jobs that were running when the server last stopped
+    resumed = get_job_registry().resume_interrupted()
+    if resumed:
+        logger.info(f"Resumed {len(resumed)} interrupted jobs: {resumed}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled connections on shutdown"""
+    await close_llm_client()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -73,27 +93,34 @@ async def search_movies_endpoint(
     min_rating: Optional[float] = None,
     limit: int = 10
 ):
-    return search_movies(query, movie_id, genres, year_from, year_to, min_rating, limit)
+    return await run_tool(
+        "search_movies", search_movies, query=query, movie_id=movie_id, genres=genres,
+        year_from=year_from, year_to=year_to, min_rating=min_rating, limit=limit
+    )
+
+@tools_router.post("/find_titles")
+async def find_titles_endpoint(query: str, limit: int = 10):
+    return await run_tool("find_titles", find_titles, query=query, limit=limit)
 
 @tools_router.post("/get_movie_by_id")
 async def get_movie_endpoint(movie_id: int):
-    return get_movie_by_id(movie_id)
+    return await run_tool("get_movie_by_id", get_movie_by_id, movie_id=movie_id)
 
 @tools_router.get("/get_top_movies")
 async def top_movies_endpoint(limit: int = 10):
-    return get_top_movies(limit)
+    return await run_tool("get_top_movies", get_top_movies, limit=limit)
 
 @tools_router.post("/recommend_similar_movies")
 async def similar_movies_endpoint(movie_id: int, limit: int = 5):
-    return recommend_similar_movies(movie_id, limit)
+    return await run_tool("recommend_similar_movies", recommend_similar_movies, movie_id=movie_id, limit=limit)
 
 @tools_router.post("/recommend_by_genres")
 async def genre_recommendations_endpoint(genres: List[str], limit: int = 5):
-    return recommend_by_genres(genres, limit)
+    return await run_tool("recommend_by_genres", recommend_by_genres, genres=genres, limit=limit)
 
 @tools_router.post("/recommend_by_query")
 async def query_recommendations_endpoint(query: str, limit: int = 5):
-    return recommend_by_query(query, limit)
+    return await run_tool("recommend_by_query", recommend_by_query, query=query, limit=limit)
 
 @tools_router.post("/recommend_personalized")
 async def personalized_recommendations_endpoint(
@@ -101,7 +128,10 @@ async def personalized_recommendations_endpoint(
     favorite_genres: Optional[List[str]] = None,
     limit: int = 5
 ):
-    return recommend_personalized(favorite_movies, favorite_genres, limit)
+    return await run_tool(
+        "recommend_personalized", recommend_personalized,
+        favorite_movies=favorite_movies, favorite_genres=favorite_genres, limit=limit
+    )
 
 # Add this line after the other include_router lines:
 app.include_router(tools_router, prefix=f"{settings.API_PREFIX}/tools", tags=["Tools"])
@@ -9,17 +9,21 @@ class MessageRole(str, Enum):
     USER = "user"
     ASSISTANT = "assistant"
     FUNCTION = "function"
-
-class Message(BaseModel):
-    """Chat message model"""
-    role: MessageRole
-    content: str
-    name: Optional[str] = None
+    TOOL = "tool"
 
 class FunctionCall(BaseModel):
     """Function call model"""
     name: str
     arguments: Dict[str, Any]
+    id: Optional[str] = None  # Tool call ID when using the tools format
+
+class Message(BaseModel):
+    """Chat message model"""
+    role: MessageRole
+    content: Optional[str] = ""
+    name: Optional[str] = None
+    tool_calls: Optional[List[FunctionCall]] = None  # Calls requested by an assistant message
+    tool_call_id: Optional[str] = None  # Call a tool message answers
 
 class FunctionDefinition(BaseModel):
     """Function definition model"""
@@ -39,6 +43,7 @@ class MCPContext(BaseModel):
     favorite_genres: Optional[List[str]] = None
     favorite_movies: Optional[List[int]] = None
     recent_searches: Optional[List[str]] = None
+    disable_response_cache: Optional[bool] = False  # Always ask the LLM for this session
 
 class MCPRequest(BaseModel):
     """MCP request model"""
@@ -51,6 +56,8 @@ class MCPRequest(BaseModel):
 class MCPResponse(BaseModel):
     """MCP response model"""
     message: Message
-    function_call: Optional[FunctionCall] = None
+    function_call: Optional[FunctionCall] = None  # First call made, kept for older clients
+    function_calls: Optional[List[FunctionCall]] = None
     context_update: Optional[Dict[str, Any]] = None
+    cached: bool = False  # Answered from the semantic response cache
     created_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
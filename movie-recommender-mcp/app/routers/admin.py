@@ -1,38 +1,157 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 from app.services.chromadb_service import populate_chroma_from_data
-from app.data.loader import download_and_extract_dataset, get_popular_movies
+from app.services.embedding_cache import get_embedding_cache
+from app.services.jobs import JobAlreadyRunningError, JobContext, get_job_registry, register_job_runner
+from app.services.neighbors import build_neighbor_table
+from app.services.single_flight import get_single_flight
+from app.services.tool_executor import get_tool_executor, run_tool
+from app.services.llm_client import get_llm_client
+from app.services.cf_model import train_cf_model
+from app.data.loader import download_and_extract_dataset
+from app.tools.search_tools import get_top_movies
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+POPULATE_JOB = "populate-database"
+NEIGHBOR_TABLE_JOB = "build-neighbor-table"
+CF_MODEL_JOB = "train-cf-model"
+
+def _run_populate_job(context: JobContext) -> Dict[str, Any]:
+    """
+    Job runner for database population
+
+    Population is incremental, so a resumed job only embeds the movies its
+    earlier attempts did not commit; their count is carried over so
+    progress continues where it stopped.
+    """
+    # Download dataset if needed
+    download_and_extract_dataset()
+
+    committed = context.committed
+    return populate_chroma_from_data(
+        batch_size=context.params.get("batch_size"),
+        progress_callback=lambda done, total, checkpoint: context.report(committed + done, committed + total, checkpoint),
+        should_cancel=context.cancelled
+    )
+
+def _run_neighbor_table_job(context: JobContext) -> Dict[str, Any]:
+    """Job runner for the neighbour table build; a resumed job starts over"""
+    movies = build_neighbor_table(
+        k=context.params.get("k"),
+        progress_callback=lambda done, total: context.report(done, total),
+        should_cancel=context.cancelled
+    )
+    return {"movies": movies}
+
+def _run_cf_model_job(context: JobContext) -> Dict[str, Any]:
+    """Job runner for CF model training; a resumed job starts over"""
+    return {"items": train_cf_model()}
+
+register_job_runner(POPULATE_JOB, _run_populate_job)
+register_job_runner(NEIGHBOR_TABLE_JOB, _run_neighbor_table_job)
+register_job_runner(CF_MODEL_JOB, _run_cf_model_job)
+
+def _submit_job(kind: str, params: Dict[str, Any], description: str) -> Dict[str, Any]:
+    """Submit a background job, mapping a job of the same kind in progress to 409"""
+    try:
+        return get_job_registry().submit(kind, params)
+    except JobAlreadyRunningError as e:
+        raise HTTPException(status_code=409, detail=f"{description} is already running as job {e.job_id}")
+    except Exception as e:
+        logger.error(f"Error starting {description.lower()}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/populate-database")
-async def populate_database(background_tasks: BackgroundTasks):
+async def populate_database(batch_size: Optional[int] = None):
     """
     Populate the ChromaDB database with movie data
 
     Args:
-        background_tasks: FastAPI background tasks
+        batch_size: Rows embedded and upserted per chunk
 
     Returns:
-        Confirmation message
+        Confirmation message and the job to poll at /jobs/{job_id}
     """
     logger.info("Starting database population")
 
-    try:
-        # Download dataset if needed
-        download_and_extract_dataset()
+    job = _submit_job(POPULATE_JOB, {"batch_size": batch_size}, "Database population")
+    return {"message": "Database population started in the background", "job_id": job["id"], "job": job}
 
-        # Add to background tasks to avoid blocking the response
-        background_tasks.add_task(populate_chroma_from_data)
+@router.get("/jobs")
+async def list_jobs():
+    """
+    List background jobs
 
-        return {"message": "Database population started in the background"}
-    except Exception as e:
-        logger.error(f"Error starting database population: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    Returns:
+        Jobs with their progress, newest first
+    """
+    return {"jobs": get_job_registry().list()}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get the progress of a background job
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        Status, progress, throughput, ETA and, once finished, the result
+    """
+    job = get_job_registry().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """
+    Cancel a background job
+
+    Running jobs stop after the batch in progress is committed.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        The job
+    """
+    job = get_job_registry().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.post("/build-neighbor-table")
+async def build_neighbor_table_endpoint(k: int = 50):
+    """
+    Precompute the item-item neighbour table used by recommend_similar_movies
+
+    Args:
+        k: Neighbours stored per movie
+
+    Returns:
+        Confirmation message and the job to poll at /jobs/{job_id}
+    """
+    logger.info(f"Starting neighbour table build with k={k}")
+    job = _submit_job(NEIGHBOR_TABLE_JOB, {"k": k}, "Neighbour table build")
+    return {"message": "Neighbour table build started in the background", "job_id": job["id"], "job": job}
+
+@router.post("/train-cf-model")
+async def train_cf_model_endpoint():
+    """
+    Train the collaborative-filtering model used by recommend_personalized
+
+    Returns:
+        Confirmation message and the job to poll at /jobs/{job_id}
+    """
+    logger.info("Starting CF model training")
+    job = _submit_job(CF_MODEL_JOB, {}, "CF model training")
+    return {"message": "CF model training started in the background", "job_id": job["id"], "job": job}
 
 @router.get("/popular-movies")
 async def get_popular_movies_endpoint(limit: int = 10):
@@ -46,8 +165,42 @@ async def get_popular_movies_endpoint(limit: int = 10):
         List of popular movies
     """
     try:
-        movies = get_popular_movies(limit=limit)
+        movies = await run_tool("get_top_movies", get_top_movies, limit=limit)
         return {"movies": movies}
     except Exception as e:
         logger.error(f"Error getting popular movies: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/embedding-cache")
+async def get_embedding_cache_stats():
+    """
+    Get query embedding cache statistics
+
+    Returns:
+        Hit/miss counters and current size of the embedding cache
+    """
+    return get_embedding_cache().stats()
+
+@router.get("/tool-metrics")
+async def get_tool_metrics():
+    """
+    Get tool execution metrics
+
+    Returns:
+        Thread pool queue depth plus in-flight, waiting and latency stats per
+        tool, and how many calls single-flight deduplication saved
+    """
+    return {
+        **get_tool_executor().stats(),
+        "single_flight": get_single_flight().stats(),
+    }
+
+@router.get("/llm-metrics")
+async def get_llm_metrics():
+    """
+    Get LLM client metrics
+
+    Returns:
+        Call counts, retries, latency and token usage of the LLM client
+    """
+    return get_llm_client().stats()
\ No newline at end of file
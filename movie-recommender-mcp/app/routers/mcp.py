@@ -1,13 +1,26 @@
 from fastapi import APIRouter, HTTPException, Depends, Body, BackgroundTasks
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+import asyncio
 import logging
 import json
-from typing import Dict, List, Any, Optional
+import time
+from typing import Dict, List, Any, AsyncIterator, Optional, Tuple
 import uuid
 
+from app.config import settings
 from app.models.mcp_models import MCPRequest, MCPResponse, Message, MessageRole, FunctionCall, FunctionDefinition
-from app.services.llm_service import call_llm
+from app.services.llm_service import call_llm, compile_function_schema
+from app.services.response_cache import context_fingerprint, get_response_cache
+from app.services.session_store import SessionState, get_session_store
+from app.services.tool_executor import get_tool_executor, run_tool
+from app.utils.history import fit_history
 from app.utils.prompt_templates import get_system_prompt
-from app.tools.search_tools import search_movies, get_movie_by_id, get_top_movies
+from app.utils.result_compaction import encode_result, get_compaction_stats
+from app.utils.formatters import (
+    render_search_results, render_title_matches, render_movie_details, render_top_movies, summarize_movies
+)
+from app.tools.search_tools import search_movies, find_titles, get_movie_by_id, get_top_movies
 from app.tools.recommend_tools import recommend_similar_movies, recommend_by_genres, recommend_by_query, recommend_personalized
 
 logger = logging.getLogger(__name__)
@@ -15,10 +28,20 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Function registry
-# Maps function names to their implementations and definitions
+# Maps function names to their implementations and definitions.
+# "render" controls what happens with a tool's result:
+#   "llm"      - the JSON result goes back to the model to write the answer (default)
+#   "template" - the renderer answers directly, skipping the follow-up LLM call
+#   "summary"  - the model gets the renderer's compact text instead of the JSON
+# A renderer returning None falls back to "llm" for that result. "template" is
+# only for terminal tools: a step that called nothing else ends the turn, so
+# a tool whose result the model may feed into another call (e.g. find_titles
+# resolving a title to an ID) must leave the next step to the model.
 function_registry = {
     "search_movies": {
         "func": search_movies,
+        "render": "template",
+        "renderer": render_search_results,
         "definition": FunctionDefinition(
             name="search_movies",
             description="Search for movies based on various criteria",
@@ -62,8 +85,36 @@ function_registry = {
             }
         )
     },
+    "find_titles": {
+        "func": find_titles,
+        "render": "summary",
+        "renderer": render_title_matches,
+        "max_concurrency": 16,  # Cheap in-memory catalog lookup
+        "definition": FunctionDefinition(
+            name="find_titles",
+            description="Find movies by title, tolerating typos and partial titles",
+            parameters={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Full or partial movie title"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of results",
+                        "default": 10
+                    }
+                },
+                "required": ["query"]
+            }
+        )
+    },
     "get_movie_by_id": {
         "func": get_movie_by_id,
+        "render": "template",
+        "renderer": render_movie_details,
+        "max_concurrency": 16,  # Cheap in-memory catalog lookup
         "definition": FunctionDefinition(
             name="get_movie_by_id",
             description="Get details for a specific movie",
@@ -81,6 +132,9 @@ function_registry = {
     },
     "get_top_movies": {
         "func": get_top_movies,
+        "render": "template",
+        "renderer": render_top_movies,
+        "max_concurrency": 16,  # Cheap in-memory catalog lookup
         "definition": FunctionDefinition(
             name="get_top_movies",
             description="Get the top rated/popular movies",
@@ -99,6 +153,8 @@ function_registry = {
     },
     "recommend_similar_movies": {
         "func": recommend_similar_movies,
+        "render": "summary",
+        "renderer": summarize_movies,
         "definition": FunctionDefinition(
             name="recommend_similar_movies",
             description="Recommend movies similar to the given movie",
@@ -121,6 +177,8 @@ function_registry = {
     },
     "recommend_by_genres": {
         "func": recommend_by_genres,
+        "render": "summary",
+        "renderer": summarize_movies,
         "definition": FunctionDefinition(
             name="recommend_by_genres",
             description="Recommend movies based on specified genres",
@@ -146,6 +204,8 @@ function_registry = {
     },
     "recommend_by_query": {
         "func": recommend_by_query,
+        "render": "summary",
+        "renderer": summarize_movies,
         "definition": FunctionDefinition(
             name="recommend_by_query",
             description="Recommend movies based on a text query",
@@ -168,6 +228,8 @@ function_registry = {
     },
     "recommend_personalized": {
         "func": recommend_personalized,
+        "render": "summary",
+        "renderer": summarize_movies,
         "definition": FunctionDefinition(
             name="recommend_personalized",
             description="Generate personalized recommendations based on user preferences",
@@ -200,6 +262,25 @@ function_registry = {
     }
 }
 
+# Apply per-tool concurrency limits
+for _name, _registry_item in function_registry.items():
+    if "max_concurrency" in _registry_item:
+        get_tool_executor().set_limit(_name, _registry_item["max_concurrency"])
+
+# Wire-format schema for every registered function, built once per process
+FUNCTION_SCHEMA = compile_function_schema([
+    registry_item["definition"] for registry_item in function_registry.values()
+])
+
+# Chat metrics: LLM calls made, and follow-up calls avoided by rendering results directly
+_chat_stats = {
+    "requests": 0,
+    "llm_calls": 0,
+    "llm_calls_saved": 0,
+    "template_renders": 0,
+    "summary_renders": 0,
+}
+
 async def execute_function_call(function_call: FunctionCall) -> Dict[str, Any]:
     """
     Execute a function call based on the function registry
@@ -220,162 +301,455 @@ async def execute_function_call(function_call: FunctionCall) -> Dict[str, Any]:
 
     try:
         logger.info(f"Executing function {function_name} with arguments {arguments}")
-        result = function(**arguments)
+        result = await run_tool(function_name, function, **arguments)
         return result
     except Exception as e:
         logger.error(f"Error executing function {function_name}: {e}")
         raise
 
-@router.post("/chat", response_model=MCPResponse)
-async def chat(request: MCPRequest, background_tasks: BackgroundTasks):
-    """Process a chat request through the MCP server"""
+def _prepare_conversation(request: MCPRequest) -> Tuple[List[Message], SessionState]:
+    """
+    Build the messages for the LLM from the stored session and the request
+
+    Clients normally send only the new user message and the server keeps
+    the history. A request carrying more than one user/assistant message is
+    treated as a legacy client resending its full history, which then
+    replaces the stored one. History past settings.HISTORY_TOKEN_BUDGET is
+    summarized.
+
+    Returns:
+        Tuple of (messages for the LLM, session state to save after the turn)
+    """
     # Create a new session ID if one isn't provided
     if not request.context.session_id:
         request.context.session_id = str(uuid.uuid4())
 
-    # Add system message if not present
-    system_message_present = any(
-        message.role == MessageRole.SYSTEM for message in request.messages
+    session = get_session_store().get(request.context.session_id) or SessionState()
+
+    system_messages = [message for message in request.messages if message.role == MessageRole.SYSTEM]
+    incoming = [message for message in request.messages if message.role != MessageRole.SYSTEM]
+
+    if len(incoming) > 1:
+        session.messages = incoming
+        session.summary = None
+    else:
+        session.messages.extend(incoming)
+
+    session.messages, session.summary = fit_history(
+        session.messages, session.summary, settings.HISTORY_TOKEN_BUDGET
     )
 
-    if not system_message_present:
+    # Add system message if not present
+    if not system_messages:
         system_prompt = get_system_prompt(request.context.favorite_genres)
-        request.messages.insert(0, Message(
+        system_messages = [Message(
             role=MessageRole.SYSTEM,
             content=system_prompt
+        )]
+
+    if session.summary:
+        system_messages.append(Message(
+            role=MessageRole.SYSTEM,
+            content=f"Summary of the earlier conversation:\n{session.summary}"
         ))
 
-    # Get function definitions
-    function_definitions = [
-        registry_item["definition"] for registry_item in function_registry.values()
-    ]
+    return system_messages + session.messages, session
+
+def _parse_function_call(fc: Dict[str, Any]) -> FunctionCall:
+    """Build a FunctionCall from the LLM's name/arguments-string pair"""
+    call_id = fc.get("id") or f"call_{uuid.uuid4().hex[:12]}"
+    try:
+        return FunctionCall(
+            id=call_id,
+            name=fc["name"],
+            arguments=json.loads(fc.get("arguments") or "{}")
+        )
+    except json.JSONDecodeError:
+        logger.error(f"Failed to parse function arguments: {fc.get('arguments')}")
+        return FunctionCall(
+            id=call_id,
+            name=fc["name"],
+            arguments={}
+        )
+
+def _render(function_call: FunctionCall, result: Any) -> Optional[str]:
+    """Text from the tool's renderer, or None if it has none or cannot render this result"""
+    renderer = function_registry.get(function_call.name, {}).get("renderer")
+    if renderer is None:
+        return None
+
+    try:
+        return renderer(result)
+    except Exception as e:
+        logger.warning(f"Renderer for {function_call.name} failed: {e}")
+        return None
+
+def _render_directly(calls: List[FunctionCall], outcomes: Dict[str, Tuple[Any, Optional[Exception]]]) -> Optional[str]:
+    """
+    Answer a turn from templates alone
+
+    Returns:
+        The combined rendered text if every call uses template rendering,
+        succeeded and could be rendered, otherwise None
+    """
+    parts = []
+    for call in calls:
+        result, error = outcomes[call.id]
+        if error is not None or function_registry.get(call.name, {}).get("render") != "template":
+            return None
+
+        text = _render(call, result)
+        if text is None:
+            return None
+        parts.append(text)
+
+    return "\n\n".join(parts)
+
+def _tool_message_content(call: FunctionCall, result: Any, error: Optional[Exception]) -> str:
+    """What the model sees for a tool result: a compact summary or the JSON result"""
+    if error is not None:
+        return json.dumps({"error": str(error)})
+
+    if function_registry.get(call.name, {}).get("render") == "summary":
+        summary = _render(call, result)
+        if summary is not None:
+            _chat_stats["summary_renders"] += 1
+            return summary
+
+    return encode_result(result)
+
+def _join_paragraphs(first: str, second: str) -> str:
+    """Join answer text from two agent steps with the blank line streamed between them"""
+    return f"{first}\n\n{second}" if first and second else first or second
+
+def _fallback_content(function_call: FunctionCall, result: Any) -> str:
+    """Format function results directly when the LLM returns an empty answer"""
+    rendered = _render(function_call, result)
+    if rendered is not None:
+        return rendered
+
+    if function_call.name == "get_movie_by_id":
+        return "I tried to find that movie, but couldn't retrieve any details."
+
+    # Generic fallback for other functions
+    return f"I found some information for you based on your request. Here's what I found:\n\n{json.dumps(result, indent=2)}"
+
+async def _llm_turn(
+    messages: List[Message],
+    request: MCPRequest,
+    stream: bool,
+    function_call: str = "auto"
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run one LLM call, relaying content tokens as they arrive
+
+    Yields "token" events, then one final "message" event with the full
+    content and the raw tool calls ({"id", "name", "arguments"} with
+    arguments still a JSON string). Legacy function_call replies are
+    reported as a single tool call.
+    """
+    _chat_stats["llm_calls"] += 1
+    response = await call_llm(
+        messages=messages,
+        function_schema=FUNCTION_SCHEMA,
+        function_call=function_call,
+        temperature=request.temperature,
+        max_tokens=request.max_tokens,
+        stream=stream
+    )
+
+    if not stream:
+        message = response["choices"][0]["message"]
+        content = message.get("content") or ""
+        if content:
+            yield {"type": "token", "content": content}
+
+        tool_calls = [
+            {"id": tc.get("id"), "name": tc["function"]["name"], "arguments": tc["function"].get("arguments")}
+            for tc in message.get("tool_calls") or []
+        ]
+        if message.get("function_call"):
+            tool_calls.append({"id": None, **message["function_call"]})
+
+        yield {"type": "message", "content": content, "tool_calls": tool_calls}
+        return
+
+    content_parts = []
+    tool_calls: Dict[int, Dict[str, Any]] = {}
+    async for chunk in response:
+        if not chunk.get("choices"):
+            continue  # Trailing usage-only chunk
+
+        delta = chunk["choices"][0].get("delta", {})
+        if delta.get("content"):
+            content_parts.append(delta["content"])
+            yield {"type": "token", "content": delta["content"]}
+
+        # Calls arrive as an ID and name followed by argument fragments, keyed by index
+        fragments = [
+            (tc.get("index", 0), tc.get("id"), tc.get("function", {}))
+            for tc in delta.get("tool_calls") or []
+        ]
+        if delta.get("function_call"):
+            fragments.append((0, None, delta["function_call"]))
+
+        for index, call_id, function in fragments:
+            call = tool_calls.setdefault(index, {"id": None, "name": "", "arguments": ""})
+            call["id"] = call["id"] or call_id
+            call["name"] += function.get("name") or ""
+            call["arguments"] += function.get("arguments") or ""
 
-    # Call the LLM
+    yield {
+        "type": "message",
+        "content": "".join(content_parts),
+        "tool_calls": [tool_calls[index] for index in sorted(tool_calls)]
+    }
+
+async def _execute_tool_calls(
+    calls: List[FunctionCall],
+    outcomes: Dict[str, Tuple[Any, Optional[Exception]]]
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a turn's tool calls concurrently
+
+    Yields a function_call_start event per call, then a function_call_end
+    event as each one finishes. Results (or exceptions) are stored in
+    outcomes by call ID.
+    """
+    async def timed_call(call: FunctionCall):
+        start = time.perf_counter()
+        try:
+            result, error = await execute_function_call(call), None
+        except Exception as e:
+            result, error = None, e
+        return call, result, error, time.perf_counter() - start
+
+    for call in calls:
+        yield {"type": "function_call_start", "id": call.id, "name": call.name, "arguments": call.arguments}
+
+    tasks = [asyncio.ensure_future(timed_call(call)) for call in calls]
     try:
-        response = await call_llm(
-            messages=request.messages,
-            functions=function_definitions,
-            temperature=request.temperature,
-            max_tokens=request.max_tokens,
-            stream=False
+        for next_done in asyncio.as_completed(tasks):
+            call, result, error, elapsed = await next_done
+            outcomes[call.id] = (result, error)
+
+            event = {
+                "type": "function_call_end",
+                "id": call.id,
+                "name": call.name,
+                "elapsed_ms": round(elapsed * 1000, 2)
+            }
+            if error is not None:
+                event["error"] = str(error)
+            yield event
+    finally:
+        # The client may disconnect mid-turn
+        for task in tasks:
+            task.cancel()
+
+async def chat_events(request: MCPRequest, stream: bool = True) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Process a chat request as a sequence of events
+
+    The model may request several tool calls per turn; they run
+    concurrently and their results go back to the model, for up to
+    settings.MAX_AGENT_STEPS LLM calls. The last step does not offer tools,
+    so the model has to answer with what it has.
+
+    Events:
+        token: a piece of assistant text ({"content"})
+        function_call_start: a tool is about to run ({"id", "name", "arguments"})
+        function_call_end: the tool finished ({"id", "name", "elapsed_ms", "error"?})
+        done: the final message, function calls, context update and whether
+            the answer came from the response cache
+
+    Args:
+        request: The chat request
+        stream: Whether to stream tokens from the upstream LLM API
+
+    Yields:
+        Event dictionaries
+    """
+    messages, session = _prepare_conversation(request)
+    _chat_stats["requests"] += 1
+
+    # Only opening messages are cached: later turns depend on the conversation so far
+    cache_embedding = None
+    if (
+        settings.RESPONSE_CACHE_ENABLED
+        and not request.context.disable_response_cache
+        and len(session.messages) == 1
+        and session.messages[0].role == MessageRole.USER
+    ):
+        cache = get_response_cache()
+        cache_context = context_fingerprint(request.context.favorite_genres, request.context.favorite_movies)
+        cache_embedding = await run_tool(
+            "response_cache", cache.embed,
+            message=session.messages[0].content or "",
+            favorite_genres=request.context.favorite_genres
         )
 
-        # Extract the assistant message - ensure content is never None
-        content = response["choices"][0]["message"].get("content")
-        if content is None:
-            content = ""
+        cached = cache.lookup(cache_embedding, cache_context)
+        if cached is not None:
+            logger.info(f"Response cache hit (similarity {cached['similarity']})")
+            session.messages.append(Message(role=MessageRole.ASSISTANT, content=cached["message"]["content"]))
+            get_session_store().save(request.context.session_id, session)
+
+            yield {"type": "token", "content": cached["message"]["content"]}
+            yield {
+                "type": "done",
+                "session_id": request.context.session_id,
+                **cached,
+                "cached": True
+            }
+            return
+
+    function_calls: List[FunctionCall] = []
+    outcomes: Dict[str, Tuple[Any, Optional[Exception]]] = {}
+    content = ""
+    shown = ""  # Text of earlier steps, already streamed to the client and kept in the answer
+
+    for step in range(settings.MAX_AGENT_STEPS):
+        last_step = step == settings.MAX_AGENT_STEPS - 1
+
+        message = None
+        separated = not shown
+        async for event in _llm_turn(
+            messages, request, stream,
+            function_call="none" if last_step else "auto"
+        ):
+            if event["type"] == "message":
+                message = event
+                continue
+            if event["type"] == "token" and event["content"] and not separated:
+                separated = True
+                yield {"type": "token", "content": "\n\n"}
+            yield event
 
-        assistant_message = Message(
-            role=MessageRole.ASSISTANT,
-            content=content
+        content = message["content"]
+        if not message["tool_calls"]:
+            break
+
+        calls = [_parse_function_call(tc) for tc in message["tool_calls"]]
+        function_calls.extend(calls)
+        messages.append(Message(role=MessageRole.ASSISTANT, content=content, tool_calls=calls))
+
+        outcomes = {}
+        async for event in _execute_tool_calls(calls, outcomes):
+            yield event
+
+        # Terminal lookups are answered from templates without another LLM call
+        rendered = _render_directly(calls, outcomes)
+        if rendered is not None:
+            _chat_stats["llm_calls_saved"] += 1
+            _chat_stats["template_renders"] += len(calls)
+            rendered = f"\n\n{rendered}" if content else rendered
+            content += rendered
+            if not separated:
+                yield {"type": "token", "content": "\n\n"}
+            yield {"type": "token", "content": rendered}
+            break
+
+        # Add each result as a tool message, in the order the model asked for them
+        for call in calls:
+            result, error = outcomes[call.id]
+            if error is not None:
+                logger.error(f"Error executing function call {call.name}: {error}")
+
+            messages.append(Message(
+                role=MessageRole.TOOL,
+                content=_tool_message_content(call, result, error),
+                name=call.name,
+                tool_call_id=call.id
+            ))
+
+        if step == 0:
+            # Add explicit instructions to the system message
+            processing_instructions = """
+            You'll now receive results from function calls.
+            Please format these results into a natural, conversational response.
+            If the result contains movie information, describe the movies in a helpful way.
+            Always provide a complete response based on the function results.
+            """
+
+            messages.append(Message(
+                role=MessageRole.SYSTEM,
+                content=processing_instructions
+            ))
+
+        shown = _join_paragraphs(shown, content)
+        content = ""
+
+    if content.strip() == "" and function_calls:
+        # Fallback if the LLM still doesn't generate a good response
+        succeeded = [
+            (call, outcomes[call.id][0]) for call in function_calls
+            if call.id in outcomes and outcomes[call.id][1] is None
+        ]
+        if succeeded:
+            content = _fallback_content(*succeeded[-1])
+        else:
+            error = next(error for _, error in outcomes.values())
+            content = f"I encountered an error while trying to process your request: {str(error)}"
+        yield {"type": "token", "content": f"\n\n{content}" if shown else content}
+
+    content = _join_paragraphs(shown, content)
+
+    # Only the visible turns are kept; tool calls and results stay out of the history
+    session.messages.append(Message(role=MessageRole.ASSISTANT, content=content))
+    get_session_store().save(request.context.session_id, session)
+
+    done = {
+        "type": "done",
+        "session_id": request.context.session_id,
+        "message": {"role": MessageRole.ASSISTANT.value, "content": content},
+        "function_call": jsonable_encoder(function_calls[0]) if function_calls else None,
+        "function_calls": jsonable_encoder(function_calls),
+        "context_update": {},
+        "cached": False
+    }
+
+    # Cache clean answers only; a failed tool call may succeed next time
+    tool_failed = any(error is not None for _, error in outcomes.values())
+    if cache_embedding is not None and content.strip() and not tool_failed:
+        get_response_cache().put(
+            cache_embedding, cache_context,
+            {key: value for key, value in done.items() if key not in ("type", "session_id", "cached")}
         )
 
-        # Extract function call if present
-        function_call = None
-        if "function_call" in response["choices"][0]["message"]:
-            fc = response["choices"][0]["message"]["function_call"]
-            try:
-                function_call = FunctionCall(
-                    name=fc["name"],
-                    arguments=json.loads(fc["arguments"])
-                )
-            except json.JSONDecodeError:
-                logger.error(f"Failed to parse function arguments: {fc['arguments']}")
-                function_call = FunctionCall(
-                    name=fc["name"],
-                    arguments={}
-                )
-
-            # Execute the function call
-            try:
-                result = await execute_function_call(function_call)
-
-                # Add function result as a new message
-                result_json = json.dumps(result) if result is not None else "{}"
-                function_response = Message(
-                    role=MessageRole.FUNCTION,
-                    content=result_json,
-                    name=function_call.name
-                )
-
-                # Call the LLM again with the function result
-                new_messages = request.messages + [
-                    Message(
-                        role=MessageRole.ASSISTANT,
-                        content="",
-                        name=None
-                    ),
-                    function_response
-                ]
-
-                # Add explicit instructions to the system message
-                processing_instructions = """
-                You'll now receive results from a function call.
-                Please format these results into a natural, conversational response.
-                If the result contains movie information, describe the movies in a helpful way.
-                Always provide a complete response based on the function results.
-                """
-
-                explicit_msg = Message(
-                    role=MessageRole.SYSTEM,
-                    content=processing_instructions
-                )
-
-                new_messages.append(explicit_msg)
-
-                final_response = await call_llm(
-                    messages=new_messages,
-                    functions=function_definitions,
-                    temperature=request.temperature,
-                    max_tokens=request.max_tokens,
-                    stream=False
-                )
-
-                # Update assistant message with the final response
-                final_content = final_response["choices"][0]["message"].get("content")
-                if final_content is None or final_content.strip() == "":
-                    # Fallback if the LLM still doesn't generate a good response
-                    if function_call.name == "search_movies":
-                        movies = result
-                        if movies and len(movies) > 0:
-                            final_content = "I found the following movies that match your query:\n\n"
-                            for i, movie in enumerate(movies[:5], 1):
-                                title = movie.get("title", "Unknown")
-                                year = f" ({movie.get('year')})" if movie.get("year") else ""
-                                genres = ", ".join(movie.get("genres", [])) if movie.get("genres") else "Unknown Genre"
-                                final_content += f"{i}. {title}{year} - {genres}\n"
-                        else:
-                            final_content = "I searched for movies matching your query, but couldn't find any results."
-                    elif function_call.name == "get_movie_by_id":
-                        movie = result
-                        if movie:
-                            title = movie.get("title", "Unknown")
-                            year = f" ({movie.get('year')})" if movie.get("year") else ""
-                            genres = ", ".join(movie.get("genres", [])) if movie.get("genres") else "Unknown Genre"
-                            final_content = f"Here are details about {title}{year}:\nGenres: {genres}\n"
-                        else:
-                            final_content = "I tried to find that movie, but couldn't retrieve any details."
-                    else:
-                        # Generic fallback for other functions
-                        final_content = f"I found some information for you based on your request. Here's what I found:\n\n{json.dumps(result, indent=2)}"
-
-                assistant_message = Message(
-                    role=MessageRole.ASSISTANT,
-                    content=final_content
-                )
-            except Exception as e:
-                logger.error(f"Error executing function call: {e}")
-                # Return error to the client
-                assistant_message = Message(
-                    role=MessageRole.ASSISTANT,
-                    content=f"I encountered an error while trying to process your request: {str(e)}"
-                )
+    yield done
+
+async def _ndjson_events(request: MCPRequest) -> AsyncIterator[str]:
+    """Serialize chat events as newline-delimited JSON"""
+    try:
+        async for event in chat_events(request, stream=True):
+            yield json.dumps(event) + "\n"
+    except Exception as e:
+        logger.error(f"Error processing streaming MCP request: {e}")
+        yield json.dumps({"type": "error", "message": str(e)}) + "\n"
+
+@router.post("/chat", response_model=MCPResponse)
+async def chat(request: MCPRequest, background_tasks: BackgroundTasks):
+    """Process a chat request through the MCP server"""
+    if request.stream:
+        return await chat_stream(request)
+
+    try:
+        done = None
+        async for event in chat_events(request, stream=False):
+            if event["type"] == "done":
+                done = event
 
         # Create the MCP response
         mcp_response = MCPResponse(
-            message=assistant_message,
-            function_call=function_call,
-            context_update={}
+            message=Message(
+                role=MessageRole.ASSISTANT,
+                content=done["message"]["content"]
+            ),
+            function_call=done["function_call"],
+            function_calls=done["function_calls"] or None,
+            context_update=done["context_update"],
+            cached=done["cached"]
         )
 
         return mcp_response
@@ -384,6 +758,39 @@ async def chat(request: MCPRequest, background_tasks: BackgroundTasks):
         logger.error(f"Error processing MCP request: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chat/stream")
+async def chat_stream(request: MCPRequest):
+    """
+    Process a chat request, streaming events as newline-delimited JSON
+
+    Tokens are relayed as the upstream LLM produces them, so clients can
+    render the answer before it is complete.
+    """
+    return StreamingResponse(
+        _ndjson_events(request),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/metrics")
+async def chat_metrics():
+    """LLM calls made per chat, follow-up calls saved by direct rendering, compaction, sessions and cache hits"""
+    calls, saved = _chat_stats["llm_calls"], _chat_stats["llm_calls_saved"]
+    return {
+        **_chat_stats,
+        "saved_ratio": round(saved / (calls + saved), 4) if calls + saved else 0.0,
+        "compaction": get_compaction_stats(),
+        "sessions": get_session_store().stats(),
+        "response_cache": get_response_cache().stats(),
+    }
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """Forget a session's conversation history"""
+    if not get_session_store().delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    return {"status": "deleted", "session_id": session_id}
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,176 @@
+"""
+Implicit-feedback collaborative filtering model
+
+Trained offline from the MovieLens ratings with a truncated SVD of the
+user-item matrix; only the item factors are kept. A user is folded in from
+a list of favourite movies in one step, and all items are scored with one
+matrix-vector product:
+
+    python -m app.services.cf_model --factors 64
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import svds
+
+from app.config import settings
+from app.data.loader import load_ratings_data
+
+logger = logging.getLogger(__name__)
+
+def train_cf_model(
+    factors: Optional[int] = None,
+    positive_threshold: Optional[float] = None,
+    directory: Optional[str] = None
+) -> int:
+    """
+    Train the item factors and write them to disk
+
+    Ratings at or above positive_threshold count as positive feedback.
+    Each user's row is scaled by 1/sqrt(#positives) so heavy raters do not
+    dominate the factorization.
+
+    Args:
+        factors: Number of latent factors (defaults to settings.CF_FACTORS)
+        positive_threshold: Minimum rating treated as a positive signal
+        directory: Output directory (defaults to settings.CF_MODEL_DIR)
+
+    Returns:
+        Number of items in the model
+    """
+    factors = factors or settings.CF_FACTORS
+    positive_threshold = positive_threshold if positive_threshold is not None else settings.CF_POSITIVE_THRESHOLD
+    directory = directory or settings.CF_MODEL_DIR
+
+    start = time.perf_counter()
+    ratings = load_ratings_data()
+    positives = ratings[ratings["rating"] >= positive_threshold]
+
+    user_codes, _ = pd.factorize(positives["userId"])
+    item_codes, item_ids = pd.factorize(positives["movieId"])
+
+    user_counts = np.bincount(user_codes)
+    values = (1.0 / np.sqrt(user_counts[user_codes])).astype(np.float32)
+    matrix = csr_matrix(
+        (values, (user_codes, item_codes)),
+        shape=(user_counts.shape[0], len(item_ids))
+    )
+
+    factors = min(factors, min(matrix.shape) - 1)
+    _, singular_values, vt = svds(matrix, k=factors)
+
+    # Scale item factors by sqrt(singular values) so dot products stay comparable
+    item_factors = (vt.T * np.sqrt(singular_values)).astype(np.float32)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "item_ids.npy"), np.asarray(item_ids, dtype=np.int32))
+    np.save(os.path.join(directory, "item_factors.npy"), item_factors)
+
+    logger.info(
+        f"Trained CF model on {len(positives)} positive ratings: {matrix.shape[0]} users, "
+        f"{matrix.shape[1]} items, {factors} factors in {time.perf_counter() - start:.1f}s"
+    )
+    reset_cf_model()
+    return matrix.shape[1]
+
+class CFModel:
+    """In-memory item factors with fold-in scoring for ad-hoc users"""
+
+    def __init__(self, directory: Optional[str] = None):
+        directory = directory or settings.CF_MODEL_DIR
+
+        self.item_ids = np.load(os.path.join(directory, "item_ids.npy"))
+        self.item_factors = np.load(os.path.join(directory, "item_factors.npy"))
+        self._row_by_id = {int(movie_id): row for row, movie_id in enumerate(self.item_ids.tolist())}
+
+        logger.info(f"CF model loaded: {self.item_factors.shape[0]} items x {self.item_factors.shape[1]} factors")
+
+    def knows_any(self, movie_ids: List[int]) -> bool:
+        """Whether at least one of the movies is in the model"""
+        return any(int(movie_id) in self._row_by_id for movie_id in movie_ids)
+
+    def score(self, favorite_movies: List[int]) -> Optional[np.ndarray]:
+        """
+        Score every item for a user described by their favourite movies
+
+        Args:
+            favorite_movies: IDs of the user's favourite movies
+
+        Returns:
+            Array of scores aligned with item_ids (favourites set to -inf),
+            or None if none of the favourites are in the model
+        """
+        rows = [self._row_by_id[int(m)] for m in favorite_movies if int(m) in self._row_by_id]
+        if not rows:
+            return None
+
+        # Fold the user in: their vector is the sum of their favourites' factors
+        user_vector = self.item_factors[rows].sum(axis=0)
+        scores = self.item_factors @ user_vector
+        scores[rows] = -np.inf
+        return scores
+
+    def recommend(self, favorite_movies: List[int], limit: int) -> List[Tuple[int, float]]:
+        """
+        Get the top-scoring movies for a user
+
+        Args:
+            favorite_movies: IDs of the user's favourite movies
+            limit: Maximum number of recommendations
+
+        Returns:
+            List of (movie ID, score) pairs, best first
+        """
+        scores = self.score(favorite_movies)
+        if scores is None:
+            return []
+
+        k = min(limit, len(scores) - 1)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.item_ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+# Singleton for the CF model
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+def get_cf_model() -> Optional[CFModel]:
+    """Get the CF model, or None if it has not been trained"""
+    global _model, _model_loaded
+
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                try:
+                    _model = CFModel()
+                except FileNotFoundError:
+                    logger.info("No CF model found, personalized recommendations will use content-based fallback")
+                    _model = None
+                _model_loaded = True
+
+    return _model
+
+def reset_cf_model():
+    """Drop the cached model so the next call reloads it"""
+    global _model, _model_loaded
+
+    with _model_lock:
+        _model = None
+        _model_loaded = False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the collaborative-filtering item factors")
+    parser.add_argument("--factors", type=int, default=settings.CF_FACTORS, help="Latent factors")
+    parser.add_argument("--threshold", type=float, default=settings.CF_POSITIVE_THRESHOLD,
+                        help="Minimum rating counted as positive feedback")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    train_cf_model(factors=args.factors, positive_threshold=args.threshold)
@@ -1,11 +1,22 @@
+import hashlib
+import json
 import logging
 import os
+import time
+import numpy as np
+import pandas as pd
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Callable, Optional, Union
 
 from app.config import settings
-from app.services.embeddings import generate_embedding, generate_movie_embedding
+from app.data.catalog import MovieCatalog, genre_flag_key, get_catalog, reload_catalog
+from app.services.embeddings import build_movie_text, embedding_model_id, generate_embedding, generate_embeddings
+from app.services.neighbors import reset_neighbor_table
+from app.services.vector_store import (
+    VectorStore, collection_fingerprint_path, embeddings_fingerprint, get_vector_store,
+    reset_vector_store, save_embedding_matrix, write_fingerprint
+)
 
 logger = logging.getLogger(__name__)
 
@@ -48,10 +59,119 @@ def _ensure_collections_exist(client):
         # Create the collection
         client.create_collection(
             name="movies",
-            metadata={"description": "Movie embeddings for recommendation"}
+            metadata={
+                "description": "Movie embeddings for recommendation",
+                "hnsw:space": "cosine"
+            }
         )
         logger.info("Movies collection created")
 
+def content_hash(text: str) -> str:
+    """
+    Hash of a movie's embedding text, stored in its metadata
+
+    The model, backend and quantization (see embedding_model_id) are part
+    of the hash, so switching any of them re-embeds everything on the next
+    ingestion.
+    """
+    return hashlib.sha1(f"{embedding_model_id()}\n{text}".encode("utf-8")).hexdigest()
+
+def build_movie_metadata(
+    movie_id: int,
+    title: str,
+    year: Optional[Union[int, str]],
+    genres: List[str],
+    genre_mask: int,
+    avg_rating: Optional[float] = None,
+    num_ratings: Optional[int] = None,
+    text_hash: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build ChromaDB metadata for a movie
+
+    Year and ratings are numeric so range filters compare numbers, not
+    strings. ChromaDB's where clause has no bitwise operators, so besides
+    the genre bitmask each genre also gets a boolean flag that filters
+    can match on.
+
+    Args:
+        movie_id: MovieLens movie ID
+        title: Movie title
+        year: Release year, if known
+        genres: Genre names
+        genre_mask: Genre bitmask from the catalog
+        avg_rating: Average rating, if known
+        num_ratings: Number of ratings, if known
+        text_hash: Content hash of the embedding text (see content_hash)
+
+    Returns:
+        Metadata dictionary, including a hash of its own contents under
+        "metadata_hash" so ingestion can detect changes without comparing
+        values that ChromaDB may return with a different type
+    """
+    metadata = {
+        "movie_id": str(movie_id),
+        "title": title,
+        "genres": ",".join(genres),
+        "genre_mask": int(genre_mask),
+    }
+
+    if year:
+        metadata["year"] = int(year)
+
+    if num_ratings:
+        metadata["avg_rating"] = round(float(avg_rating), 4)
+        metadata["num_ratings"] = int(num_ratings)
+
+    if text_hash:
+        metadata["content_hash"] = text_hash
+
+    for genre in genres:
+        metadata[genre_flag_key(genre)] = True
+
+    metadata["metadata_hash"] = hashlib.sha1(
+        json.dumps(metadata, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+    return metadata
+
+def build_metadata_filter(
+    genres: Optional[List[str]] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    min_rating: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Build a ChromaDB where clause from search filters
+
+    Args:
+        genres: Match movies with any of these genres
+        year_from: Minimum release year
+        year_to: Maximum release year
+        min_rating: Minimum average rating
+
+    Returns:
+        Where clause, or None if there are no filters
+    """
+    conditions = []
+
+    if genres:
+        genre_conditions = [{key: True} for key in dict.fromkeys(genre_flag_key(g) for g in genres)]
+        conditions.append(genre_conditions[0] if len(genre_conditions) == 1 else {"$or": genre_conditions})
+
+    if year_from:
+        conditions.append({"year": {"$gte": int(year_from)}})
+
+    if year_to:
+        conditions.append({"year": {"$lte": int(year_to)}})
+
+    if min_rating is not None:
+        conditions.append({"avg_rating": {"$gte": float(min_rating)}})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
 def add_movie_to_chroma(movie: Dict[str, Any]) -> str:
     """
     Add a movie to the ChromaDB collection
@@ -66,18 +186,24 @@ def add_movie_to_chroma(movie: Dict[str, Any]) -> str:
     collection = client.get_collection("movies")
 
     # Generate embedding
-    embedding = generate_movie_embedding(movie)
+    text = build_movie_text(movie)
+    embedding = generate_embedding(text).tolist()
 
     # Document ID
     doc_id = f"movie_{movie['id']}"
 
-    # Construct metadata (must be strings for ChromaDB)
-    metadata = {
-        "movie_id": str(movie["id"]),
-        "title": movie["title"],
-        "year": str(movie["year"]) if movie.get("year") else "",
-        "genres": ",".join(movie["genres"]) if movie.get("genres") else "",
-    }
+    # Construct metadata
+    genres = movie.get("genres") or []
+    metadata = build_movie_metadata(
+        movie_id=movie["id"],
+        title=movie["title"],
+        year=movie.get("year"),
+        genres=genres,
+        genre_mask=get_catalog().genres_to_mask(genres),
+        avg_rating=movie.get("avg_rating"),
+        num_ratings=movie.get("num_ratings"),
+        text_hash=content_hash(text)
+    )
 
     # Create document text
     document = f"Title: {movie['title']}\n"
@@ -86,64 +212,107 @@ def add_movie_to_chroma(movie: Dict[str, Any]) -> str:
     if movie.get("genres"):
         document += f"Genres: {', '.join(movie['genres'])}\n"
 
-    # Add to collection
+    # Add to collection, replacing any existing entry
     try:
-        # Check if it already exists
-        try:
-            collection.get(ids=[doc_id])
-            # Update if it exists
-            collection.update(
-                ids=[doc_id],
-                embeddings=[embedding],
-                metadatas=[metadata],
-                documents=[document]
-            )
-            logger.debug(f"Updated movie {movie['id']} in ChromaDB")
-        except:
-            # Add if it doesn't exist
-            collection.add(
-                ids=[doc_id],
-                embeddings=[embedding],
-                metadatas=[metadata],
-                documents=[document]
-            )
-            logger.debug(f"Added movie {movie['id']} to ChromaDB")
+        collection.upsert(
+            ids=[doc_id],
+            embeddings=[embedding],
+            metadatas=[metadata],
+            documents=[document]
+        )
+        logger.debug(f"Upserted movie {movie['id']} in ChromaDB")
 
         return doc_id
     except Exception as e:
         logger.error(f"Error adding movie {movie['id']} to ChromaDB: {e}")
         raise
 
+class ChromaVectorStore(VectorStore):
+    """Vector store backed by the ChromaDB movies collection (HNSW index)"""
+
+    def __init__(self):
+        self.collection = get_chroma_client().get_collection("movies")
+
+    def get_embeddings(self, movie_ids: List[int]) -> Dict[int, np.ndarray]:
+        result = self.collection.get(
+            ids=[f"movie_{movie_id}" for movie_id in movie_ids],
+            include=["embeddings"]
+        )
+        return {
+            int(doc_id[len("movie_"):]): np.asarray(embedding, dtype=np.float32)
+            for doc_id, embedding in zip(result["ids"], result["embeddings"])
+        }
+
+    def query(
+        self,
+        embedding: np.ndarray,
+        where: Optional[Dict[str, Any]] = None,
+        limit: int = 10,
+        include_embeddings: bool = False
+    ) -> List[Dict[str, Any]]:
+        # Documents only repeat the title/year/genres metadata, so leave them out
+        include = ["metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
+
+        results = self.collection.query(
+            query_embeddings=[np.asarray(embedding, dtype=np.float32).tolist()],
+            n_results=limit,
+            where=where if where else None,
+            include=include
+        )
+
+        # Process and return results
+        movies = []
+        for i, metadata in enumerate(results["metadatas"][0]):
+
+            # Extract similarity score if available
+            similarity = 1.0 - results["distances"][0][i] if "distances" in results else None
+
+            # Parse genres from string
+            genres = metadata["genres"].split(",") if metadata.get("genres") else []
+
+            movie = {
+                "id": int(metadata["movie_id"]),
+                "title": metadata["title"],
+                "year": str(metadata["year"]) if metadata.get("year") else None,
+                "genres": genres,
+                "similarity": similarity
+            }
+            if metadata.get("num_ratings"):
+                movie["avg_rating"] = metadata["avg_rating"]
+                movie["num_ratings"] = metadata["num_ratings"]
+            if include_embeddings:
+                movie["embedding"] = np.asarray(results["embeddings"][0][i], dtype=np.float32)
+            movies.append(movie)
+
+        return movies
+
 def search_similar_movies(
     query_text: Optional[str] = None,
     movie_id: Optional[int] = None,
-    filter_dict: Optional[Dict[str, str]] = None,
+    filter_dict: Optional[Dict[str, Any]] = None,
     limit: int = 10
 ) -> List[Dict[str, Any]]:
     """
-    Search for similar movies in ChromaDB
+    Search for similar movies in the configured vector store
 
     Args:
         query_text: Text to search for (will be converted to embedding)
         movie_id: Movie ID to find similar movies for
-        filter_dict: Dictionary of metadata filters
+        filter_dict: ChromaDB where clause (see build_metadata_filter)
         limit: Maximum number of results to return
 
     Returns:
         List of similar movies with metadata
     """
-    client = get_chroma_client()
-    collection = client.get_collection("movies")
+    store = get_vector_store()
 
     # Determine query method
     if movie_id is not None:
         # Get embedding for the specified movie
-        doc_id = f"movie_{movie_id}"
         try:
-            result = collection.get(ids=[doc_id], include=["embeddings"])
-            if not result["embeddings"]:
-                raise ValueError(f"Movie with ID {movie_id} not found in database")
-            query_embedding = result["embeddings"][0]
+            query_embedding = store.get_embedding(movie_id)
         except Exception as e:
             logger.error(f"Error retrieving movie {movie_id}: {e}")
             raise
@@ -153,71 +322,261 @@ def search_similar_movies(
     else:
         raise ValueError("Either query_text or movie_id must be provided")
 
-    # Prepare where clause for filtering
-    where = {}
-    if filter_dict:
-        where = filter_dict
-
     try:
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=limit,
-            where=where if where else None
+        return store.query(query_embedding, where=filter_dict, limit=limit)
+    except Exception as e:
+        logger.error(f"Error searching {settings.VECTOR_BACKEND} vector store: {e}")
+        raise
+
+def export_chroma_to_numpy(page_size: int = 5000) -> int:
+    """
+    Export the ChromaDB movie embeddings for the NumPy vector backend
+
+    Args:
+        page_size: Documents fetched per get() call
+
+    Returns:
+        Number of exported movies
+    """
+    collection = get_chroma_client().get_collection("movies")
+    total = collection.count()
+
+    movie_ids = np.empty(total, dtype=np.int64)
+    content_hashes = []
+    embeddings = None
+
+    for offset in range(0, total, page_size):
+        page = collection.get(include=["embeddings", "metadatas"], limit=page_size, offset=offset)
+        page_embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+        if embeddings is None:
+            embeddings = np.empty((total, page_embeddings.shape[1]), dtype=np.float32)
+
+        end = offset + len(page["ids"])
+        movie_ids[offset:end] = [int(doc_id[len("movie_"):]) for doc_id in page["ids"]]
+        embeddings[offset:end] = page_embeddings
+        content_hashes.extend(metadata.get("content_hash") for metadata in page["metadatas"])
+
+    if embeddings is None:
+        raise ValueError("The movies collection is empty")
+
+    save_embedding_matrix(movie_ids, embeddings, fingerprint=embeddings_fingerprint(movie_ids, content_hashes))
+    reset_vector_store()
+    return total
+
+def build_movie_batch(catalog: MovieCatalog) -> Dict[str, List[Any]]:
+    """
+    Build ChromaDB ids, documents, metadata and embedding texts column-wise
+
+    Args:
+        catalog: Movie catalog to ingest
+
+    Returns:
+        Dictionary of parallel lists: ids, texts, documents, metadatas
+        (including each text's content hash)
+    """
+    movie_ids = pd.Series(catalog.ids).astype(str)
+    titles = pd.Series(catalog.titles).astype(str)
+    years = pd.Series(np.where(catalog.years > 0, catalog.years.astype(str), ""))
+    genres_text = pd.Series(catalog.genres).map(", ".join)
+
+    has_year = (years != "").to_numpy()
+    has_genres = (genres_text != "").to_numpy()
+
+    # Embedding text mirrors build_movie_text: "Title: ... Genres: ... Year: ..."
+    texts = (
+        "Title: " + titles
+        + np.where(has_genres, " Genres: " + genres_text, "")
+        + np.where(has_year, " Year: " + years, "")
+    )
+
+    # Stored document text mirrors add_movie_to_chroma
+    documents = (
+        "Title: " + titles + "\n"
+        + np.where(has_year, "Year: " + years + "\n", "")
+        + np.where(has_genres, "Genres: " + genres_text + "\n", "")
+    )
+
+    texts = texts.tolist()
+    metadatas = [
+        build_movie_metadata(movie_id, title, year, genres, genre_mask, avg_rating, num_ratings, content_hash(text))
+        for movie_id, title, year, genres, genre_mask, avg_rating, num_ratings, text in zip(
+            catalog.ids.tolist(), catalog.titles.tolist(), catalog.years.tolist(), catalog.genres.tolist(),
+            catalog.genre_masks.tolist(), catalog.avg_ratings.tolist(), catalog.num_ratings.tolist(), texts
         )
+    ]
 
-        # Process and return results
-        movies = []
-        for i, (id, metadata, document) in enumerate(zip(
-                results["ids"][0],
-                results["metadatas"][0],
-                results["documents"][0]
-            )):
+    return {
+        "ids": ("movie_" + movie_ids).tolist(),
+        "texts": texts,
+        "documents": documents.tolist(),
+        "metadatas": metadatas,
+    }
 
-            # Extract similarity score if available
-            similarity = 1.0 - results["distances"][0][i] if "distances" in results else None
+def _stored_metadata(collection, page_size: int = 5000) -> Dict[str, Dict[str, Any]]:
+    """Get the metadata of every document in a collection, keyed by document ID"""
+    stored = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        stored.update(zip(page["ids"], page["metadatas"]))
+        if len(page["ids"]) < page_size:
+            return stored
+        offset += page_size
+
+def diff_movie_batch(batch: Dict[str, List[Any]], stored: Dict[str, Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    Compare a movie batch with what the collection already holds
 
-            # Parse genres from string
-            genres = metadata["genres"].split(",") if metadata.get("genres") else []
+    Args:
+        batch: Output of build_movie_batch
+        stored: Stored metadata keyed by document ID
 
-            movie = {
-                "id": int(metadata["movie_id"]),
-                "title": metadata["title"],
-                "year": metadata["year"] if metadata.get("year") else None,
-                "genres": genres,
-                "similarity": similarity,
-                "document": document
-            }
-            movies.append(movie)
+    Returns:
+        Dictionary with batch positions to embed ("added", "changed"),
+        positions whose embedding text is unchanged ("unchanged") and of
+        those the ones with other metadata changes ("metadata_changed"),
+        plus document IDs no longer in the batch ("deleted")
+    """
+    diff = {"added": [], "changed": [], "unchanged": [], "metadata_changed": []}
+
+    for position, (doc_id, metadata) in enumerate(zip(batch["ids"], batch["metadatas"])):
+        previous = stored.get(doc_id)
+        if previous is None:
+            diff["added"].append(position)
+        elif previous.get("content_hash") != metadata["content_hash"]:
+            diff["changed"].append(position)
+        else:
+            diff["unchanged"].append(position)
+            if previous.get("metadata_hash") != metadata["metadata_hash"]:
+                diff["metadata_changed"].append(position)
+
+    current = set(batch["ids"])
+    diff["deleted"] = [doc_id for doc_id in stored if doc_id not in current]
+    return diff
+
+def populate_chroma_from_data(
+    batch_size: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None
+) -> Dict[str, Any]:
+    """
+    Bring ChromaDB in line with the MovieLens dataset
 
-        return movies
+    Documents are built column-wise from a freshly loaded catalog and
+    diffed against the content hashes already stored in the collection.
+    Only new movies and movies whose embedding text changed are embedded
+    and upserted, chunk by chunk. Unchanged movies only get their metadata
+    updated when it differs (e.g. new ratings), and movies no longer in
+    the dataset are deleted.
 
-    except Exception as e:
-        logger.error(f"Error searching ChromaDB: {e}")
-        raise
+    Each chunk's content hashes are committed together with its
+    embeddings, so an interrupted run is resumed simply by running again:
+    chunks it committed diff as unchanged and are not embedded twice.
+
+    Args:
+        batch_size: Rows embedded and upserted per chunk (defaults to settings.INGEST_BATCH_SIZE)
+        progress_callback: Called after each committed chunk with rows
+            embedded so far, rows to embed and the catalog row after the chunk
+        should_cancel: Checked before each chunk; when it returns True the
+            run stops, leaving deletions and metadata updates for the next run
 
-def populate_chroma_from_data():
-    """Populate ChromaDB with movie data from the MovieLens dataset"""
-    from app.data.loader import load_movie_data
+    Returns:
+        Ingestion statistics (counts of added, changed, unchanged and
+        deleted movies, elapsed seconds, embedded rows per second, and
+        whether the run was cancelled)
+    """
+    batch_size = batch_size or settings.INGEST_BATCH_SIZE
 
     # Load movie data
-    movies_df = load_movie_data()
-
-    # Add each movie to ChromaDB
-    total = len(movies_df)
-    logger.info(f"Adding {total} movies to ChromaDB")
-
-    for idx, row in movies_df.iterrows():
-        movie = {
-            "id": int(row["movieId"]),
-            "title": row["title_clean"],
-            "year": row["year"],
-            "genres": row["genres"]
-        }
+    catalog = reload_catalog()
+    total = len(catalog)
 
-        add_movie_to_chroma(movie)
+    start = time.perf_counter()
+    batch = build_movie_batch(catalog)
 
-        # Log progress
-        if (idx + 1) % 100 == 0:
-            logger.info(f"Progress: {idx + 1}/{total} movies added to ChromaDB")
+    client = get_chroma_client()
+    collection = client.get_collection("movies")
 
-    logger.info("Finished adding movies to ChromaDB")
\ No newline at end of file
+    diff = diff_movie_batch(batch, _stored_metadata(collection))
+    to_embed = sorted(diff["added"] + diff["changed"])
+    logger.info(
+        f"{total} movies: {len(diff['added'])} new, {len(diff['changed'])} changed, "
+        f"{len(diff['unchanged'])} unchanged, {len(diff['deleted'])} removed; "
+        f"embedding {len(to_embed)} in chunks of {batch_size}"
+    )
+
+    done = 0
+    cancelled = False
+    if progress_callback:
+        progress_callback(done, len(to_embed), 0)
+
+    for offset in range(0, len(to_embed), batch_size):
+        if should_cancel and should_cancel():
+            logger.info(f"Population cancelled after {done}/{len(to_embed)} movies")
+            cancelled = True
+            break
+
+        positions = to_embed[offset:offset + batch_size]
+
+        embeddings = generate_embeddings([batch["texts"][i] for i in positions])
+        collection.upsert(
+            ids=[batch["ids"][i] for i in positions],
+            embeddings=embeddings.tolist(),
+            metadatas=[batch["metadatas"][i] for i in positions],
+            documents=[batch["documents"][i] for i in positions]
+        )
+        done += len(positions)
+        if progress_callback:
+            progress_callback(done, len(to_embed), positions[-1] + 1)
+
+        # Log progress and throughput
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (len(to_embed) - done) / rate if rate > 0 else 0.0
+        logger.info(
+            f"Progress: {done}/{len(to_embed)} movies embedded into ChromaDB "
+            f"({rate:.0f} rows/s, ETA {eta:.0f}s)"
+        )
+
+    if not cancelled:
+        # Metadata-only changes keep their stored embeddings
+        for offset in range(0, len(diff["metadata_changed"]), batch_size):
+            positions = diff["metadata_changed"][offset:offset + batch_size]
+            collection.update(
+                ids=[batch["ids"][i] for i in positions],
+                metadatas=[batch["metadatas"][i] for i in positions]
+            )
+
+        for offset in range(0, len(diff["deleted"]), batch_size):
+            collection.delete(ids=diff["deleted"][offset:offset + batch_size])
+
+    # A cancelled run leaves the collection partly synced, so its contents are unknown
+    fingerprint = None if cancelled else embeddings_fingerprint(
+        catalog.ids.tolist(), (metadata["content_hash"] for metadata in batch["metadatas"])
+    )
+    write_fingerprint(collection_fingerprint_path(), fingerprint)
+    reset_neighbor_table()
+
+    # Rewrite the NumPy backend's matrix only when it is in use and the collection changed
+    if settings.VECTOR_BACKEND == "numpy":
+        matrix_path = os.path.join(settings.VECTOR_STORE_DIR, "embeddings.npy")
+        if done or (diff["deleted"] and not cancelled) or not os.path.exists(matrix_path):
+            if collection.count():
+                export_chroma_to_numpy()
+    reset_vector_store()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "total": total,
+        "added": len(diff["added"]),
+        "changed": len(diff["changed"]),
+        "unchanged": len(diff["unchanged"]),
+        "metadata_updated": len(diff["metadata_changed"]),
+        "deleted": 0 if cancelled else len(diff["deleted"]),
+        "embedded": done,
+        "cancelled": cancelled,
+        "elapsed_seconds": round(elapsed, 2),
+        "rows_per_second": round(done / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    logger.info(f"Finished syncing movies to ChromaDB: {stats}")
+    return stats
@@ -0,0 +1,273 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _key_tag(key: str) -> int:
+    """Non-zero 64-bit hash of a cache key, stored next to its row"""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+class DiskEmbeddingStore:
+    """
+    On-disk embedding tier backed by a memory-mapped float32 matrix
+
+    Vectors live in `<path>.f32` as fixed-size rows; `<path>.index.json`
+    maps cache keys to row slots. Slots are reused round-robin once the
+    file is full, so the oldest entries are overwritten first.
+
+    The index is only flushed periodically, so after a crash it can point
+    a key at a slot that has since been reused. Each row's key hash is
+    therefore kept in `<path>.tags` and checked on every read.
+    """
+
+    def __init__(self, path: str, capacity: int):
+        self.path = path
+        self.capacity = capacity
+        self.data_path = f"{path}.f32"
+        self.index_path = f"{path}.index.json"
+        self.tags_path = f"{path}.tags"
+        self.dim: Optional[int] = None
+        self._slots: Dict[str, int] = {}
+        self._keys: Dict[int, str] = {}
+        self._next_slot = 0
+        self._dirty = False
+        self._matrix: Optional[np.memmap] = None
+        self._tags: Optional[np.memmap] = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._load_index()
+
+    def _load_index(self):
+        """Load the key index and map the matrix if a previous run left one"""
+        if not all(os.path.exists(p) for p in (self.index_path, self.data_path, self.tags_path)):
+            return
+
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+
+            if index.get("capacity") != self.capacity:
+                logger.warning("Embedding disk cache capacity changed, discarding existing entries")
+                return
+
+            dim = index["dim"]
+            if os.path.getsize(self.data_path) != self.capacity * dim * 4:
+                logger.warning("Embedding disk cache size does not match its index, discarding existing entries")
+                return
+
+            self._matrix = np.memmap(self.data_path, dtype=np.float32, mode="r+",
+                                     shape=(self.capacity, dim))
+            self._tags = np.memmap(self.tags_path, dtype=np.uint64, mode="r+", shape=(self.capacity,))
+            self.dim = dim
+            self._slots = index["slots"]
+            self._keys = {slot: key for key, slot in self._slots.items()}
+            self._next_slot = index["next_slot"]
+            logger.info(f"Loaded {len(self._slots)} embeddings from disk cache {self.data_path}")
+        except Exception as e:
+            logger.warning(f"Could not load embedding disk cache, starting empty: {e}")
+            self._reset()
+
+    def _reset(self):
+        self.dim = None
+        self._matrix = self._tags = None
+        self._slots, self._keys, self._next_slot = {}, {}, 0
+
+    def _ensure_matrix(self, dim: int):
+        if self._matrix is not None and self.dim != dim:
+            logger.warning(f"Embedding dimension changed from {self.dim} to {dim}, rebuilding disk cache")
+            self._reset()
+            self._dirty = True
+
+        if self._matrix is None:
+            self.dim = dim
+            self._matrix = np.memmap(self.data_path, dtype=np.float32, mode="w+",
+                                     shape=(self.capacity, dim))
+            self._tags = np.memmap(self.tags_path, dtype=np.uint64, mode="w+", shape=(self.capacity,))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+
+        if self._tags[slot] != _key_tag(key):
+            # The slot was reused after the index was last flushed
+            del self._slots[key]
+            self._keys.pop(slot, None)
+            return None
+        return np.array(self._matrix[slot])
+
+    def put(self, key: str, vector: np.ndarray):
+        self._ensure_matrix(vector.shape[0])
+
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot = (self._next_slot + 1) % self.capacity
+
+            # Evict whatever previously lived in this slot
+            evicted = self._keys.pop(slot, None)
+            if evicted is not None:
+                del self._slots[evicted]
+
+            self._slots[key] = slot
+            self._keys[slot] = key
+
+        # Invalidate the slot before rewriting it so a crash midway cannot pair the new row with the old tag
+        self._tags[slot] = 0
+        self._matrix[slot] = vector
+        self._tags[slot] = _key_tag(key)
+        self._dirty = True
+
+    def clear(self):
+        """Drop every entry"""
+        if self._tags is not None:
+            self._tags[:] = 0
+            self._tags.flush()
+        self._slots, self._keys, self._next_slot = {}, {}, 0
+        self._dirty = True
+        self.flush()
+
+    def flush(self):
+        """Persist the matrix and the key index"""
+        if not self._dirty or self._matrix is None:
+            return
+
+        self._matrix.flush()
+        self._tags.flush()
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "capacity": self.capacity,
+                "dim": self.dim,
+                "next_slot": self._next_slot,
+                "slots": self._slots,
+            }, f)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+
+class EmbeddingCache:
+    """
+    LRU cache for query embeddings with an optional on-disk tier
+
+    Keys are built by the caller (model name plus normalized text).
+    Cached arrays are read-only so callers cannot corrupt shared entries.
+    """
+
+    def __init__(self, max_entries: int, disk_path: Optional[str] = None,
+                 disk_capacity: int = 100000, flush_every: int = 100):
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = DiskEmbeddingStore(disk_path, disk_capacity) if disk_path else None
+        self._puts_since_flush = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into the memory tier, evicting least recently used entries"""
+        vector.setflags(write=False)
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            if self._disk is not None:
+                vector = self._disk.get(key)
+                if vector is not None:
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, vector: np.ndarray):
+        vector = np.array(vector, dtype=np.float32)
+
+        with self._lock:
+            self._remember(key, vector)
+
+            if self._disk is not None:
+                self._disk.put(key, vector)
+                self._puts_since_flush += 1
+                if self._puts_since_flush >= self.flush_every:
+                    self._disk.flush()
+                    self._puts_since_flush = 0
+
+    def flush(self):
+        with self._lock:
+            if self._disk is not None:
+                self._disk.flush()
+                self._puts_since_flush = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.clear()
+                self._puts_since_flush = 0
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "disk_enabled": self._disk is not None,
+                "disk_entries": len(self._disk) if self._disk is not None else 0,
+            }
+
+# Singleton for the embedding cache
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or initialize the embedding cache"""
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    max_entries=settings.EMBEDDING_CACHE_SIZE,
+                    disk_path=settings.EMBEDDING_CACHE_DISK_PATH or None,
+                    disk_capacity=settings.EMBEDDING_CACHE_DISK_SIZE
+                )
+                atexit.register(_cache.flush)
+
+    return _cache
@@ -1,23 +1,68 @@
 import logging
-from typing import List, Dict, Any, Optional, Union
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Tuple, Union
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
 from app.config import settings
+from app.services.embedding_cache import get_embedding_cache
+from app.utils.text_utils import normalize_text
 
 logger = logging.getLogger(__name__)
 
 # Singleton for the embedding model
 _model = None
 
+def load_embedding_model(backend: str):
+    """
+    Load the embedding model for a backend
+
+    Args:
+        backend: "torch" (SentenceTransformers on PyTorch) or "onnx" (the
+            model exported by app.services.onnx_embedding, on ONNX Runtime)
+
+    Returns:
+        Model exposing SentenceTransformer-style encode()
+    """
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME, device="cpu")
+        if settings.EMBEDDING_NUM_THREADS > 0:
+            import torch
+            torch.set_num_threads(settings.EMBEDDING_NUM_THREADS)
+        return model
+
+    if backend == "onnx":
+        from app.services.onnx_embedding import OnnxSentenceEncoder, default_onnx_dir
+
+        return OnnxSentenceEncoder(default_onnx_dir(), quantized=settings.EMBEDDING_ONNX_QUANTIZED)
+
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+def embedding_model_id() -> str:
+    """
+    Identify the configured embedding model, backend and quantization
+
+    Backends (and int8 quantization) produce slightly different vectors
+    for the same model, so cache keys and content hashes use this rather
+    than the model name alone.
+    """
+    model_id = f"{settings.EMBEDDING_MODEL_NAME}:{settings.EMBEDDING_BACKEND}"
+    if settings.EMBEDDING_BACKEND == "onnx" and settings.EMBEDDING_ONNX_QUANTIZED:
+        model_id += ":int8"
+    return model_id
+
 def get_embedding_model():
     """Get or initialize the embedding model"""
     global _model
 
     if _model is None:
         try:
-            logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL_NAME}")
-            _model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+            logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL_NAME} ({settings.EMBEDDING_BACKEND} backend)")
+            _model = load_embedding_model(settings.EMBEDDING_BACKEND)
             logger.info("Embedding model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
@@ -25,36 +70,151 @@ def get_embedding_model():
 
     return _model
 
-def generate_embedding(text: str) -> List[float]:
+class EmbeddingBatcher:
+    """
+    In-process micro-batcher for single-text embedding requests
+
+    Concurrent callers submit one text each; a worker thread collects the
+    requests for up to max_wait_ms (or until max_batch_size is reached) and
+    encodes them in a single forward pass.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def encode(self, text: str) -> np.ndarray:
+        """Submit a text and block until its embedding is ready"""
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        """Wait for a first request, then gather more until the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for text, _ in batch]
+
+            try:
+                embeddings = generate_embeddings(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            logger.debug(f"Encoded micro-batch of {len(batch)} texts")
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+# Singleton for the micro-batcher
+_batcher = None
+_batcher_lock = threading.Lock()
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Get or start the embedding micro-batcher"""
+    global _batcher
+
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = EmbeddingBatcher(
+                    max_batch_size=settings.EMBEDDING_MICROBATCH_MAX_SIZE,
+                    max_wait_ms=settings.EMBEDDING_MICROBATCH_WAIT_MS
+                )
+
+    return _batcher
+
+def _encode_single(text: str) -> np.ndarray:
+    """Encode one text, through the micro-batcher when enabled"""
+    if settings.EMBEDDING_MICROBATCH_ENABLED:
+        return get_embedding_batcher().encode(text)
+    return generate_embeddings([text])[0]
+
+def generate_embedding(text: str) -> np.ndarray:
     """
     Generate embedding for a text string
 
+    The text is always encoded as given. When settings.EMBEDDING_CACHE_ENABLED
+    is set, results are cached by embedding_model_id() plus the normalized
+    text, so case and whitespace variants share an entry. Concurrent misses
+    are coalesced by the micro-batcher when settings.EMBEDDING_MICROBATCH_ENABLED is set.
+
     Args:
         text: Text to generate embedding for
 
     Returns:
-        List of floats representing the embedding vector
+        float32 array representing the embedding vector
+    """
+    try:
+        if not settings.EMBEDDING_CACHE_ENABLED:
+            return _encode_single(text)
+
+        key = f"{embedding_model_id()}:{normalize_text(text)}"
+        cache = get_embedding_cache()
+
+        embedding = cache.get(key)
+        if embedding is None:
+            embedding = _encode_single(text)
+            cache.put(key, embedding)
+        return embedding
+    except Exception as e:
+        logger.error(f"Error generating embedding: {e}")
+        raise
+
+def generate_embeddings(texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+    """
+    Generate embeddings for a batch of text strings
+
+    Args:
+        texts: Texts to generate embeddings for
+        batch_size: Sentences per forward pass (defaults to settings.EMBEDDING_BATCH_SIZE)
+
+    Returns:
+        float32 array of shape (len(texts), dim) with one embedding per row
     """
     model = get_embedding_model()
+    batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
 
     try:
-        embedding = model.encode(text)
-        return embedding.tolist()
+        embeddings = model.encode(
+            list(texts),
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return embeddings.astype(np.float32, copy=False)
     except Exception as e:
-        logger.error(f"Error generating embedding: {e}")
+        logger.error(f"Error generating embeddings for batch of {len(texts)}: {e}")
         raise
 
-def generate_movie_embedding(movie: Dict[str, Any]) -> List[float]:
+def build_movie_text(movie: Dict[str, Any]) -> str:
     """
-    Generate embedding for a movie
+    Build the text representation of a movie that gets embedded
 
     Args:
         movie: Movie data dictionary
 
     Returns:
-        Embedding vector for the movie
+        Text representation of the movie
     """
-    # Create a text representation of the movie
     text_parts = []
 
     if "title" in movie:
@@ -68,7 +228,16 @@ def generate_movie_embedding(movie: Dict[str, Any]) -> List[float]:
         text_parts.append(f"Year: {movie['year']}")
 
     # Combine all parts
-    movie_text = " ".join(text_parts)
+    return " ".join(text_parts)
+
+def generate_movie_embedding(movie: Dict[str, Any]) -> np.ndarray:
+    """
+    Generate embedding for a movie
 
-    # Generate embedding
-    return generate_embedding(movie_text)
\ No newline at end of file
+    Args:
+        movie: Movie data dictionary
+
+    Returns:
+        Embedding vector for the movie
+    """
+    return generate_embedding(build_movie_text(movie))
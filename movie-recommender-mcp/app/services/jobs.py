@@ -0,0 +1,312 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Any, Callable, Optional
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Job statuses; "interrupted" jobs were running when the process stopped
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+
+ACTIVE_STATUSES = (PENDING, RUNNING)
+
+class JobAlreadyRunningError(RuntimeError):
+    """Raised when a job of the same kind is already pending or running"""
+
+    def __init__(self, job_id: str):
+        super().__init__(f"Job {job_id} is already running")
+        self.job_id = job_id
+
+class Job(BaseModel):
+    """State of a background job, persisted across restarts"""
+    id: str
+    kind: str
+    status: str = PENDING
+    params: Dict[str, Any] = Field(default_factory=dict)
+    created_at: float = Field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    attempts: int = 0
+    done: int = 0
+    total: Optional[int] = None
+    checkpoint: int = 0  # Position after the last committed batch
+    run_started_at: Optional[float] = None  # Start of the current attempt
+    run_start_done: int = 0  # Progress at the start of the current attempt
+    cancel_requested: bool = False
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+
+    def progress(self) -> Dict[str, Any]:
+        """Job state plus percentage, throughput and ETA of the current attempt"""
+        status = jsonable_encoder(self)
+        for field in ("run_started_at", "run_start_done"):
+            status.pop(field)
+
+        rate = 0.0
+        if self.status == RUNNING and self.run_started_at:
+            elapsed = time.time() - self.run_started_at
+            rate = (self.done - self.run_start_done) / elapsed if elapsed > 0 else 0.0
+
+        status["percent"] = round(100.0 * self.done / self.total, 1) if self.total else None
+        status["throughput_per_second"] = round(rate, 1)
+        status["eta_seconds"] = round((self.total - self.done) / rate, 1) if rate > 0 and self.total else None
+        return status
+
+class JobContext:
+    """Handle a runner uses to report progress and check for cancellation"""
+
+    def __init__(self, registry: "JobRegistry", job: Job):
+        self._registry = registry
+        self.job = job
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.job.params
+
+    @property
+    def checkpoint(self) -> int:
+        return self.job.checkpoint
+
+    @property
+    def committed(self) -> int:
+        """Units of work committed by earlier attempts of a resumed job"""
+        return self.job.run_start_done
+
+    def report(self, done: int, total: int, checkpoint: Optional[int] = None):
+        """
+        Record progress, and the checkpoint once a batch is committed
+
+        Args:
+            done: Units of work finished so far
+            total: Total units of work
+            checkpoint: Position after the last committed batch
+        """
+        self._registry.update(self.job.id, done=done, total=total, checkpoint=checkpoint)
+
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested; runners check this between batches"""
+        return self.job.cancel_requested
+
+JobRunner = Callable[[JobContext], Optional[Dict[str, Any]]]
+
+# Runners by job kind, registered by the modules that own the work
+_runners: Dict[str, JobRunner] = {}
+
+def register_job_runner(kind: str, runner: JobRunner):
+    """
+    Register the function that runs jobs of a kind
+
+    Runners are looked up when jobs are submitted and when interrupted
+    jobs are resumed after a restart, so they must be registered at import.
+
+    Args:
+        kind: Job kind
+        runner: Callable taking a JobContext and returning the job result
+    """
+    _runners[kind] = runner
+
+class JobRegistry:
+    """
+    Registry of background jobs persisted to a JSON file
+
+    Each job runs on its own thread. At most one job per kind may be
+    pending or running, so two runs cannot race on the same resource.
+    State, including each job's checkpoint, is written to disk on every
+    change, so jobs that were running when the process stopped can be
+    resumed from their last checkpoint.
+    """
+
+    def __init__(self, path: str, max_history: int):
+        self.path = path
+        self.max_history = max_history
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read job state from {self.path}: {e}")
+            return
+
+        for item in data.get("jobs", []):
+            job = Job(**item)
+            if job.status in ACTIVE_STATUSES:
+                job.status = INTERRUPTED
+            self._jobs[job.id] = job
+
+    def _save(self):
+        """Write all jobs atomically; callers hold the lock"""
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+
+        partial_path = self.path + ".tmp"
+        with open(partial_path, "w") as f:
+            json.dump({"jobs": jsonable_encoder(list(self._jobs.values()))}, f)
+        os.replace(partial_path, self.path)
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.status not in ACTIVE_STATUSES + (INTERRUPTED,)]
+        finished.sort(key=lambda job: job.created_at)
+        for job in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job.id]
+
+    def _active(self, kind: str) -> Optional[Job]:
+        for job in self._jobs.values():
+            if job.kind == kind and job.status in ACTIVE_STATUSES:
+                return job
+        return None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's progress (see Job.progress), or None if it does not exist"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.progress() if job is not None else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Get the progress of all jobs, newest first"""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+            return [job.progress() for job in jobs]
+
+    def update(self, job_id: str, **changes):
+        """Update fields of a job and persist; None values are ignored"""
+        with self._lock:
+            job = self._jobs[job_id]
+            for field, value in changes.items():
+                if value is not None:
+                    setattr(job, field, value)
+            self._save()
+
+    def submit(self, kind: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Start a job in the background
+
+        Args:
+            kind: Job kind (must have a registered runner)
+            params: JSON-serializable parameters for the runner
+
+        Returns:
+            The new job's progress
+
+        Raises:
+            JobAlreadyRunningError: A job of this kind is pending or running
+        """
+        if kind not in _runners:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        with self._lock:
+            active = self._active(kind)
+            if active is not None:
+                raise JobAlreadyRunningError(active.id)
+
+            job = Job(id=uuid.uuid4().hex, kind=kind, params=params or {})
+            self._jobs[job.id] = job
+            self._prune()
+            self._save()
+            self._start(job)
+            return job.progress()
+
+    def _start(self, job: Job):
+        thread = threading.Thread(target=self._run, args=(job,), name=f"job-{job.kind}-{job.id[:8]}", daemon=True)
+        thread.start()
+
+    def _run(self, job: Job):
+        now = time.time()
+        self.update(
+            job.id,
+            status=RUNNING,
+            started_at=job.started_at or now,
+            run_started_at=now,
+            run_start_done=job.done,
+            attempts=job.attempts + 1
+        )
+        logger.info(f"Job {job.id} ({job.kind}) started at checkpoint {job.checkpoint}")
+
+        try:
+            result = _runners[job.kind](JobContext(self, job))
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+            self.update(job.id, status=FAILED, error=str(e), finished_at=time.time())
+            return
+
+        status = CANCELLED if job.cancel_requested else COMPLETED
+        self.update(job.id, status=status, result=result or {}, finished_at=time.time())
+        logger.info(f"Job {job.id} ({job.kind}) {status}")
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Request cancellation of a job
+
+        Running jobs stop after their current batch; interrupted jobs are
+        marked cancelled so they are not resumed.
+
+        Returns:
+            The job's progress, or None if it does not exist
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+
+            if job.status in ACTIVE_STATUSES:
+                job.cancel_requested = True
+            elif job.status == INTERRUPTED:
+                job.status = CANCELLED
+                job.finished_at = time.time()
+            self._save()
+            return job.progress()
+
+    def resume_interrupted(self) -> List[str]:
+        """
+        Restart jobs that were running when the process last stopped
+
+        Returns:
+            IDs of the resumed jobs
+        """
+        resumed = []
+        with self._lock:
+            for job in sorted(self._jobs.values(), key=lambda job: job.created_at):
+                if job.status != INTERRUPTED or job.kind not in _runners:
+                    continue
+                if self._active(job.kind) is not None:
+                    continue
+                job.status = PENDING
+                resumed.append(job)
+            self._save()
+
+        for job in resumed:
+            logger.info(f"Resuming job {job.id} ({job.kind}) from checkpoint {job.checkpoint}")
+            self._start(job)
+        return [job.id for job in resumed]
+
+# Singleton for the job registry
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_job_registry() -> JobRegistry:
+    """Get or initialize the job registry"""
+    global _registry
+
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = JobRegistry(path=settings.JOBS_STATE_PATH, max_history=settings.JOBS_MAX_HISTORY)
+
+    return _registry
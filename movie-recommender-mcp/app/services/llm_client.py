@@ -0,0 +1,272 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Any, AsyncIterator, Optional
+import aiohttp
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class LLMAPIError(Exception):
+    """Raised when the LLM API returns an error that retries could not resolve"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"LLM API error {status}: {message}")
+        self.status = status
+
+class LLMClient:
+    """
+    Async client for an OpenAI-compatible chat completions API
+
+    One aiohttp session (and its keep-alive connection pool) is shared by
+    every request. A semaphore bounds in-flight calls, and 429/5xx
+    responses or connection errors are retried with jittered exponential
+    backoff.
+
+    Streams only report token usage when stream_usage is set, since older
+    OpenAI-compatible servers reject stream_options; calls that report no
+    usage are counted separately so token totals are known to be partial.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        max_concurrency: int,
+        timeout_seconds: float,
+        connect_timeout_seconds: float,
+        max_retries: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+        stream_usage: bool = False
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds, connect=connect_timeout_seconds)
+        # A stream may legitimately outlive the total timeout, so only bound the gap between chunks
+        self.stream_timeout = aiohttp.ClientTimeout(
+            total=None, connect=connect_timeout_seconds, sock_read=timeout_seconds
+        )
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.stream_usage = stream_usage
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self._stats = {
+            "calls": 0, "errors": 0, "retries": 0, "in_flight": 0,
+            "total_seconds": 0.0, "max_seconds": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0, "calls_without_usage": 0,
+            "streams": 0, "first_token_seconds": 0.0,
+        }
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.api_key}",
+                }
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when the server sends it"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max_seconds)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+
+    def _record(self, elapsed: float, usage: Optional[Dict[str, Any]] = None):
+        self._stats["calls"] += 1
+        self._stats["total_seconds"] += elapsed
+        self._stats["max_seconds"] = max(self._stats["max_seconds"], elapsed)
+        if usage:
+            self._stats["prompt_tokens"] += usage.get("prompt_tokens", 0)
+            self._stats["completion_tokens"] += usage.get("completion_tokens", 0)
+        else:
+            self._stats["calls_without_usage"] += 1
+
+    async def _post(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        payload: Dict[str, Any],
+        timeout: Optional[aiohttp.ClientTimeout] = None
+    ) -> aiohttp.ClientResponse:
+        """
+        POST with retries, returning the first successful response unread
+
+        The caller owns the returned response and must release it.
+        """
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                response = await session.post(url, json=payload, timeout=timeout or self.timeout)
+                if response.status < 400:
+                    if attempt:
+                        logger.info(f"LLM call succeeded after {attempt + 1} attempts")
+                    return response
+
+                async with response:
+                    if response.status not in RETRYABLE_STATUSES or last_attempt:
+                        raise LLMAPIError(response.status, await response.text())
+                    delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                    logger.warning(f"LLM API returned {response.status}, retrying in {delay:.2f}s")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"LLM API connection error ({e!r}), retrying in {delay:.2f}s")
+
+            self._stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def chat_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Call the chat completions endpoint
+
+        Args:
+            payload: Request body
+
+        Returns:
+            Parsed JSON response
+        """
+        session = self._get_session()
+        url = f"{self.base_url}/chat/completions"
+
+        async with self._semaphore:
+            self._stats["in_flight"] += 1
+            start = time.perf_counter()
+            try:
+                async with await self._post(session, url, payload) as response:
+                    result = await response.json()
+
+                elapsed = time.perf_counter() - start
+                self._record(elapsed, result.get("usage"))
+                logger.info(f"LLM call took {elapsed * 1000:.0f}ms (usage={result.get('usage')})")
+                return result
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+            finally:
+                self._stats["in_flight"] -= 1
+
+    async def stream_chat_completion(self, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Call the chat completions endpoint in streaming mode
+
+        Retries only happen before the first byte of the response; once
+        chunks are flowing, errors propagate to the caller.
+
+        Args:
+            payload: Request body (stream is set automatically)
+
+        Yields:
+            Parsed server-sent event chunks
+        """
+        session = self._get_session()
+        url = f"{self.base_url}/chat/completions"
+        payload = {**payload, "stream": True}
+        if self.stream_usage:
+            payload["stream_options"] = {"include_usage": True}
+
+        async with self._semaphore:
+            self._stats["in_flight"] += 1
+            start = time.perf_counter()
+            first_chunk_at = None
+            usage = None
+            try:
+                async with await self._post(session, url, payload, timeout=self.stream_timeout) as response:
+                    async for line in response.content:
+                        line = line.strip()
+                        if not line.startswith(b"data:"):
+                            continue
+
+                        data = line[5:].strip()
+                        if data == b"[DONE]":
+                            break
+
+                        chunk = json.loads(data)
+                        if first_chunk_at is None:
+                            first_chunk_at = time.perf_counter()
+                        usage = chunk.get("usage") or usage
+                        yield chunk
+
+                elapsed = time.perf_counter() - start
+                self._record(elapsed, usage)
+                if first_chunk_at is not None:
+                    self._stats["streams"] += 1
+                    self._stats["first_token_seconds"] += first_chunk_at - start
+                logger.info(
+                    f"LLM stream took {elapsed * 1000:.0f}ms, first chunk after "
+                    f"{((first_chunk_at or start) - start) * 1000:.0f}ms (usage={usage})"
+                )
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+            finally:
+                self._stats["in_flight"] -= 1
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self._stats["calls"]
+        streams = self._stats["streams"]
+        hidden = ("total_seconds", "max_seconds", "first_token_seconds")
+        return {
+            **{k: v for k, v in self._stats.items() if k not in hidden},
+            "max_concurrency": self.max_concurrency,
+            "avg_latency_ms": round(self._stats["total_seconds"] / calls * 1000, 2) if calls else 0.0,
+            "max_latency_ms": round(self._stats["max_seconds"] * 1000, 2),
+            "avg_time_to_first_token_ms": (
+                round(self._stats["first_token_seconds"] / streams * 1000, 2) if streams else 0.0
+            ),
+        }
+
+# Singleton for the LLM client
+_client = None
+
+def get_llm_client() -> LLMClient:
+    """Get or initialize the shared LLM client"""
+    global _client
+
+    if _client is None:
+        _client = LLMClient(
+            base_url=settings.LLM_API_BASE,
+            api_key=settings.LLM_API_KEY,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+            connect_timeout_seconds=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff_base_seconds=settings.LLM_BACKOFF_BASE_SECONDS,
+            backoff_max_seconds=settings.LLM_BACKOFF_MAX_SECONDS,
+            stream_usage=settings.LLM_STREAM_USAGE
+        )
+
+    return _client
+
+async def close_llm_client():
+    """Close the shared client's connection pool"""
+    global _client
+
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -1,24 +1,51 @@
 import logging
 import json
 import os
-from typing import List, Dict, Any, Optional, Union
-import requests
-import aiohttp
-import asyncio
+from typing import List, Dict, Any, AsyncIterator, Optional, Union
 
 from app.config import settings
+from app.services.llm_client import get_llm_client
 from app.models.mcp_models import Message, MessageRole, FunctionCall, FunctionDefinition
 
 logger = logging.getLogger(__name__)
 
+def compile_function_schema(functions: List[FunctionDefinition]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Convert function definitions to the API's wire format once
+
+    Both the tools and the legacy functions form are built, so the result
+    can be shared by every request whatever settings.LLM_TOOL_FORMAT is.
+    Payloads reference these lists directly; they must not be mutated.
+
+    Args:
+        functions: Function definitions
+
+    Returns:
+        Dictionary with "tools" and "functions" lists
+    """
+    function_dicts = [
+        {
+            "name": func.name,
+            "description": func.description,
+            "parameters": func.parameters
+        }
+        for func in functions
+    ]
+
+    return {
+        "functions": function_dicts,
+        "tools": [{"type": "function", "function": function} for function in function_dicts],
+    }
+
 async def call_llm(
     messages: List[Message],
     functions: Optional[List[FunctionDefinition]] = None,
     function_call: Optional[str] = "auto",
     temperature: Optional[float] = None,
     max_tokens: Optional[int] = None,
-    stream: bool = False
-) -> Dict[str, Any]:
+    stream: bool = False,
+    function_schema: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> Union[Dict[str, Any], AsyncIterator[Dict[str, Any]]]:
     """
     Call the LLM API with the given messages and optional functions
 
@@ -29,9 +56,11 @@ async def call_llm(
         temperature: Temperature for response generation
         max_tokens: Maximum number of tokens in the response
         stream: Whether to stream the response
+        function_schema: Precompiled schema from compile_function_schema,
+            used instead of converting functions on every call
 
     Returns:
-        LLM API response
+        LLM API response, or an async iterator of response chunks if stream is set
     """
     if not settings.LLM_API_KEY:
         raise ValueError("LLM_API_KEY is not set")
@@ -41,43 +70,59 @@ async def call_llm(
     max_tokens = max_tokens if max_tokens is not None else settings.LLM_MAX_TOKENS
 
     # Convert Message objects to dictionaries
-    message_dicts = [
-        {
-            "role": message.role.value,
-            "content": message.content,
-            **({"name": message.name} if message.name else {})
-        }
-        for message in messages
-    ]
+    use_tools = settings.LLM_TOOL_FORMAT == "tools"
+    message_dicts = [message_to_dict(message, use_tools) for message in messages]
 
     # Convert function definitions to the format expected by the LLM API
-    function_dicts = None
-    if functions:
-        function_dicts = [
-            {
-                "name": func.name,
-                "description": func.description,
-                "parameters": func.parameters
-            }
-            for func in functions
-        ]
+    if function_schema is None and functions:
+        function_schema = compile_function_schema(functions)
 
     # Use OpenAI API format
-    return await _call_openai_api(message_dicts, function_dicts, function_call, temperature, max_tokens)
+    return await _call_openai_api(message_dicts, function_schema, function_call, temperature, max_tokens, stream)
 
-async def _call_openai_api(
+def message_to_dict(message: Message, use_tools: bool) -> Dict[str, Any]:
+    """
+    Convert a Message to the API's wire format
+
+    Tool calls and tool results are written in the tools format, or folded
+    back into the legacy function_call / function-role format.
+    """
+    if message.role == MessageRole.TOOL:
+        if use_tools:
+            return {"role": "tool", "tool_call_id": message.tool_call_id, "content": message.content}
+        return {"role": "function", "name": message.name, "content": message.content}
+
+    message_dict = {
+        "role": message.role.value,
+        "content": message.content,
+        **({"name": message.name} if message.name else {})
+    }
+
+    if message.tool_calls:
+        calls = [
+            {"name": call.name, "arguments": json.dumps(call.arguments)}
+            for call in message.tool_calls
+        ]
+        message_dict["content"] = message.content or None
+        if use_tools:
+            message_dict["tool_calls"] = [
+                {"id": call.id, "type": "function", "function": wire}
+                for call, wire in zip(message.tool_calls, calls)
+            ]
+        else:
+            # The legacy format has exactly one call per assistant message
+            message_dict["function_call"] = calls[0]
+
+    return message_dict
+
+def build_chat_payload(
     messages: List[Dict[str, Any]],
-    functions: Optional[List[Dict[str, Any]]] = None,
+    function_schema: Optional[Dict[str, List[Dict[str, Any]]]] = None,
     function_call: Optional[str] = "auto",
     temperature: float = 0.7,
     max_tokens: int = 1000
 ) -> Dict[str, Any]:
-    """Call the OpenAI API"""
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {settings.LLM_API_KEY}"
-    }
-
+    """Build the chat completions request body"""
     payload = {
         "model": settings.LLM_MODEL_NAME,
         "messages": messages,
@@ -85,20 +130,33 @@ async def _call_openai_api(
         "max_tokens": max_tokens
     }
 
-    # Add functions if provided
-    if functions:
-        payload["functions"] = functions
-        payload["function_call"] = function_call
+    # Add functions if provided (shared lists, not copies)
+    if function_schema:
+        if settings.LLM_TOOL_FORMAT == "tools":
+            payload["tools"] = function_schema["tools"]
+            payload["tool_choice"] = function_call
+        else:
+            payload["functions"] = function_schema["functions"]
+            payload["function_call"] = function_call
+
+    return payload
+
+async def _call_openai_api(
+    messages: List[Dict[str, Any]],
+    function_schema: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    function_call: Optional[str] = "auto",
+    temperature: float = 0.7,
+    max_tokens: int = 1000,
+    stream: bool = False
+) -> Union[Dict[str, Any], AsyncIterator[Dict[str, Any]]]:
+    """Call the OpenAI API"""
+    payload = build_chat_payload(messages, function_schema, function_call, temperature, max_tokens)
+
+    if stream:
+        return get_llm_client().stream_chat_completion(payload)
 
     try:
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-        return response.json()
+        return await get_llm_client().chat_completion(payload)
     except Exception as e:
         logger.error(f"Error calling OpenAI API: {e}")
-        raise
\ No newline at end of file
+        raise
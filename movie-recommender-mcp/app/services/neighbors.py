@@ -0,0 +1,203 @@
+"""
+Precomputed item-item nearest-neighbour table
+
+The table stores, for every movie, its top-K most similar movies as int32
+movie IDs and float16 cosine scores. It is built offline from the NumPy
+vector store's normalized embedding matrix with blocked matrix multiplies:
+
+    python -m app.services.neighbors --k 50
+
+The matrix is exported from the ChromaDB collection first when it is
+missing or does not match the collection, as with the Chroma vector
+backend, where ingestion does not maintain it.
+
+The table records the fingerprint of the embeddings it was built from and
+is ignored once the movies collection no longer matches it, so similar-
+movie lookups fall back to live search until the table is rebuilt.
+"""
+import argparse
+import logging
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _load_current_matrix():
+    """Load the NumPy vector store, exporting it from ChromaDB when missing or stale"""
+    from app.services.vector_store import NumpyVectorStore, collection_fingerprint_path, read_fingerprint
+
+    current = read_fingerprint(collection_fingerprint_path())
+    try:
+        store = NumpyVectorStore()
+        if store.fingerprint is not None and store.fingerprint == current:
+            return store
+        logger.info("Embedding matrix does not match the movies collection, exporting it again")
+    except FileNotFoundError:
+        logger.info("No embedding matrix found, exporting it from the movies collection")
+
+    from app.services.chromadb_service import export_chroma_to_numpy
+
+    export_chroma_to_numpy()
+    return NumpyVectorStore()
+
+def build_neighbor_table(
+    k: Optional[int] = None,
+    block_size: int = 1024,
+    directory: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None
+) -> int:
+    """
+    Compute every movie's top-k neighbours and write them to disk
+
+    Args:
+        k: Neighbours per movie (defaults to settings.NEIGHBOR_TABLE_K)
+        block_size: Rows multiplied against the full matrix at a time
+        directory: Output directory (defaults to settings.NEIGHBOR_TABLE_DIR)
+        progress_callback: Called after each block with movies done and total movies
+        should_cancel: Checked before each block; when it returns True the
+            build stops without writing the table
+
+    Returns:
+        Number of movies in the table (0 if the build was cancelled)
+    """
+    from app.services.vector_store import write_fingerprint
+
+    k = k or settings.NEIGHBOR_TABLE_K
+    directory = directory or settings.NEIGHBOR_TABLE_DIR
+
+    store = _load_current_matrix()
+    matrix = np.asarray(store.matrix, dtype=np.float32)
+    n = matrix.shape[0]
+    k = min(k, n - 1)
+
+    neighbors = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float16)
+    movie_ids = store.ids.astype(np.int32)
+
+    start = time.perf_counter()
+    for offset in range(0, n, block_size):
+        if should_cancel and should_cancel():
+            logger.info(f"Neighbour table build cancelled after {offset}/{n} movies")
+            return 0
+
+        end = min(offset + block_size, n)
+        block_scores = matrix[offset:end] @ matrix.T
+
+        # A movie is not its own neighbour
+        block_scores[np.arange(end - offset), np.arange(offset, end)] = -np.inf
+
+        top = np.argpartition(-block_scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block_scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+
+        neighbors[offset:end] = movie_ids[np.take_along_axis(top, order, axis=1)]
+        scores[offset:end] = np.take_along_axis(top_scores, order, axis=1)
+
+        logger.info(f"Neighbour table progress: {end}/{n} movies")
+        if progress_callback:
+            progress_callback(end, n)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "ids.npy"), movie_ids)
+    np.save(os.path.join(directory, "neighbors.npy"), neighbors)
+    np.save(os.path.join(directory, "scores.npy"), scores)
+    write_fingerprint(os.path.join(directory, "fingerprint"), store.fingerprint)
+
+    logger.info(f"Built neighbour table for {n} movies (k={k}) in {time.perf_counter() - start:.1f}s")
+    reset_neighbor_table()
+    return n
+
+class NeighborTable:
+    """Read-only, memory-mapped view of a neighbour table built by build_neighbor_table"""
+
+    def __init__(self, directory: Optional[str] = None):
+        from app.services.vector_store import read_fingerprint
+
+        directory = directory or settings.NEIGHBOR_TABLE_DIR
+
+        self.ids = np.load(os.path.join(directory, "ids.npy"))
+        self.neighbors = np.load(os.path.join(directory, "neighbors.npy"), mmap_mode="r")
+        self.scores = np.load(os.path.join(directory, "scores.npy"), mmap_mode="r")
+        self.fingerprint = read_fingerprint(os.path.join(directory, "fingerprint"))
+        self._row_by_id = {int(movie_id): row for row, movie_id in enumerate(self.ids.tolist())}
+
+        logger.info(f"Neighbour table loaded: {self.neighbors.shape[0]} movies x {self.neighbors.shape[1]} neighbours")
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    def lookup(self, movie_id: int, limit: int) -> Optional[List[Tuple[int, float]]]:
+        """
+        Get a movie's precomputed neighbours
+
+        Args:
+            movie_id: MovieLens movie ID
+            limit: Maximum number of neighbours
+
+        Returns:
+            List of (movie ID, similarity) pairs, or None if the movie is
+            not in the table or limit exceeds the stored k
+        """
+        row = self._row_by_id.get(int(movie_id))
+        if row is None or limit > self.k:
+            return None
+
+        return list(zip(
+            self.neighbors[row, :limit].tolist(),
+            self.scores[row, :limit].astype(np.float32).tolist()
+        ))
+
+# Singleton for the neighbour table
+_table = None
+_table_loaded = False
+_table_lock = threading.Lock()
+
+def get_neighbor_table() -> Optional[NeighborTable]:
+    """Get the neighbour table, or None if it has not been built or is out of date"""
+    from app.services.vector_store import collection_fingerprint_path, read_fingerprint
+
+    global _table, _table_loaded
+
+    if not _table_loaded:
+        with _table_lock:
+            if not _table_loaded:
+                try:
+                    _table = NeighborTable()
+                except FileNotFoundError:
+                    logger.info("No neighbour table found, similar-movie lookups will use live search")
+                    _table = None
+
+                current = read_fingerprint(collection_fingerprint_path())
+                if _table is not None and (_table.fingerprint is None or _table.fingerprint != current):
+                    logger.warning(
+                        "Neighbour table does not match the movies collection, similar-movie lookups "
+                        "will use live search until it is rebuilt"
+                    )
+                    _table = None
+                _table_loaded = True
+
+    return _table
+
+def reset_neighbor_table():
+    """Drop the cached table so the next call reloads it"""
+    global _table, _table_loaded
+
+    with _table_lock:
+        _table = None
+        _table_loaded = False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the item-item neighbour table")
+    parser.add_argument("--k", type=int, default=settings.NEIGHBOR_TABLE_K, help="Neighbours per movie")
+    parser.add_argument("--block-size", type=int, default=1024, help="Rows per matrix multiply")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    build_neighbor_table(k=args.k, block_size=args.block_size)
@@ -0,0 +1,221 @@
+"""
+ONNX Runtime backend for the sentence embedding model
+
+The SentenceTransformer's transformer is exported to ONNX once, optionally
+with int8 dynamic quantization, and served with ONNX Runtime on the CPU.
+Tokenization uses the model's fast tokenizer; mean pooling and
+normalization are done in NumPy, so serving needs neither PyTorch nor
+sentence-transformers:
+
+    python -m app.services.onnx_embedding --quantize
+"""
+import argparse
+import json
+import logging
+import os
+from typing import List, Dict, Any, Optional, Union
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+CONFIG_FILE = "embedding_config.json"
+
+def default_onnx_dir(model_name: Optional[str] = None) -> str:
+    """Directory the exported model of a SentenceTransformer lives in"""
+    model_name = model_name or settings.EMBEDDING_MODEL_NAME
+    return settings.EMBEDDING_ONNX_DIR or os.path.join(
+        settings.PROCESSED_DATA_DIR, "onnx", os.path.basename(model_name.rstrip("/"))
+    )
+
+def default_num_threads() -> int:
+    """Intra-op threads: settings.EMBEDDING_NUM_THREADS, or the CPUs this process may run on"""
+    if settings.EMBEDDING_NUM_THREADS > 0:
+        return settings.EMBEDDING_NUM_THREADS
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def export_onnx_model(
+    model_name: Optional[str] = None,
+    directory: Optional[str] = None,
+    quantize: bool = False,
+    opset: int = 14
+) -> str:
+    """
+    Export a SentenceTransformer to ONNX
+
+    Needs PyTorch and sentence-transformers (plus the onnx package for
+    quantization); the model is loaded from the local Hugging Face cache
+    or a local path like any SentenceTransformer.
+
+    Args:
+        model_name: Model name or path (defaults to settings.EMBEDDING_MODEL_NAME)
+        directory: Output directory (defaults to default_onnx_dir())
+        quantize: Also write an int8 dynamically quantized model
+        opset: ONNX opset version
+
+    Returns:
+        Path of the exported model (the quantized one when quantize is set)
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model_name = model_name or settings.EMBEDDING_MODEL_NAME
+    directory = directory or default_onnx_dir(model_name)
+    os.makedirs(directory, exist_ok=True)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    # Pooling and normalization are reproduced in NumPy, so only the transformer is exported
+    modules = [type(module).__name__ for module in model]
+    pooling = model[1].get_pooling_mode_str() if len(model) > 1 and hasattr(model[1], "get_pooling_mode_str") else "mean"
+    if pooling != "mean":
+        raise ValueError(f"Only mean pooling is supported, {model_name} uses {pooling}")
+
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    model_path = os.path.join(directory, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+
+    tokenizer.save_pretrained(directory)
+    config = {
+        "model_name": model_name,
+        "max_seq_length": int(model.max_seq_length),
+        "normalize": "Normalize" in modules,
+        "pad_token": tokenizer.pad_token,
+        "dimension": int(model.get_sentence_embedding_dimension()),
+    }
+    with open(os.path.join(directory, CONFIG_FILE), "w") as f:
+        json.dump(config, f, indent=2)
+    logger.info(f"Exported {model_name} to {model_path}")
+
+    if not quantize:
+        return model_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantized_path = os.path.join(directory, QUANTIZED_MODEL_FILE)
+    quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+    logger.info(
+        f"Quantized model written to {quantized_path} "
+        f"({os.path.getsize(model_path) / 1e6:.1f}MB -> {os.path.getsize(quantized_path) / 1e6:.1f}MB)"
+    )
+    return quantized_path
+
+class OnnxSentenceEncoder:
+    """
+    Sentence encoder running an exported model with ONNX Runtime
+
+    Exposes the subset of SentenceTransformer.encode that the embedding
+    service uses. Texts are sorted by length before batching so each batch
+    is padded only to its own longest text.
+    """
+
+    def __init__(self, directory: str, quantized: bool = False, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(directory, CONFIG_FILE)) as f:
+            self.config: Dict[str, Any] = json.load(f)
+
+        model_path = os.path.join(directory, QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"No ONNX model at {model_path}; run python -m app.services.onnx_embedding"
+                f"{' --quantize' if quantized else ''}"
+            )
+
+        self.num_threads = num_threads or default_num_threads()
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(directory, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        pad_token = self.config.get("pad_token") or "[PAD]"
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+
+        logger.info(f"ONNX embedding model loaded from {model_path} with {self.num_threads} threads")
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config["dimension"]
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        feed = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feed["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+
+        hidden = self.session.run(None, feed)[0]
+
+        # Mean pooling over real (unpadded) tokens
+        mask = attention_mask[..., None].astype(np.float32)
+        embeddings = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+        if self.config.get("normalize"):
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings.astype(np.float32, copy=False)
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        """
+        Encode sentences
+
+        Args:
+            sentences: One sentence or a list of sentences
+            batch_size: Sentences per inference call
+
+        Returns:
+            float32 array of shape (len(sentences), dim), or (dim,) for one sentence
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        embeddings = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for offset in range(0, len(texts), batch_size):
+            rows = order[offset:offset + batch_size]
+            embeddings[rows] = self._encode_batch([texts[row] for row in rows])
+
+        return embeddings[0] if single else embeddings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_NAME, help="Model name or local path")
+    parser.add_argument("--output", help="Output directory (defaults to EMBEDDING_ONNX_DIR)")
+    parser.add_argument("--quantize", action="store_true", help="Also write an int8 dynamically quantized model")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    export_onnx_model(model_name=args.model, directory=args.output, quantize=args.quantize)
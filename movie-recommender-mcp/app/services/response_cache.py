@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Any, Optional
+import numpy as np
+
+from app.config import settings
+from app.services.embeddings import generate_embedding
+
+logger = logging.getLogger(__name__)
+
+def cache_key_text(message: str, favorite_genres: Optional[List[str]] = None) -> str:
+    """Text embedded for a cache lookup: the user's message plus their favourite genres"""
+    text = message.strip()
+    if favorite_genres:
+        text += f"\nFavorite genres: {', '.join(sorted(favorite_genres))}"
+    return text
+
+def context_fingerprint(favorite_genres: Optional[List[str]], favorite_movies: Optional[List[int]]) -> str:
+    """
+    Exact-match part of the cache key
+
+    Answers are only reused for users with the same stated preferences,
+    since personalized recommendations depend on them.
+    """
+    genres = ",".join(sorted(genre.lower() for genre in favorite_genres or []))
+    movies = ",".join(str(movie_id) for movie_id in sorted(favorite_movies or []))
+    return f"{genres}|{movies}"
+
+class SemanticResponseCache:
+    """
+    In-process cache of chat answers keyed by query embedding
+
+    Entries live in a fixed-size matrix of normalized embeddings, so a
+    lookup is one matrix-vector product. An entry is a hit if its
+    similarity to the query is at least the threshold, its context
+    fingerprint matches exactly, and it has not expired. When full, the
+    least recently used entry is replaced.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+
+        self._matrix: Optional[np.ndarray] = None  # Allocated on first put, once the dimension is known
+        self._responses: List[Optional[Dict[str, Any]]] = [None] * max_entries
+        self._contexts = np.empty(max_entries, dtype=object)
+        self._active = np.zeros(max_entries, dtype=bool)
+        self._created_at = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expired = 0
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def _expire(self, now: float):
+        expired = self._active & (now - self._created_at > self.ttl_seconds)
+        count = int(expired.sum())
+        if count:
+            self._active[expired] = False
+            for slot in np.flatnonzero(expired):
+                self._responses[slot] = None
+            self.expired += count
+
+    def lookup(self, embedding: np.ndarray, context: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer for a query
+
+        Args:
+            embedding: Query embedding
+            context: Context fingerprint (see context_fingerprint)
+
+        Returns:
+            The cached response with its "similarity", or None on a miss
+        """
+        query = self._normalize(embedding)
+
+        with self._lock:
+            self.lookups += 1
+            if self._matrix is None:
+                return None
+
+            now = time.time()
+            self._expire(now)
+
+            candidates = np.flatnonzero(self._active & (self._contexts == context))
+            if candidates.size == 0:
+                return None
+
+            scores = self._matrix[candidates] @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+
+            slot = candidates[best]
+            self._last_used[slot] = now
+            self.hits += 1
+            return {**self._responses[slot], "similarity": round(float(scores[best]), 4)}
+
+    def put(self, embedding: np.ndarray, context: str, response: Dict[str, Any]):
+        """
+        Store an answer
+
+        Args:
+            embedding: Query embedding
+            context: Context fingerprint (see context_fingerprint)
+            response: JSON-serializable response to return on later hits
+        """
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+            free = np.flatnonzero(~self._active)
+            if free.size:
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+            now = time.time()
+            self._matrix[slot] = vector
+            self._responses[slot] = response
+            self._contexts[slot] = context
+            self._active[slot] = True
+            self._created_at[slot] = now
+            self._last_used[slot] = now
+            self.stores += 1
+
+    def clear(self):
+        with self._lock:
+            self._active[:] = False
+            self._responses = [None] * self.max_entries
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.RESPONSE_CACHE_ENABLED,
+            "entries": int(self._active.sum()),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.lookups - self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
+
+    def embed(self, message: str, favorite_genres: Optional[List[str]] = None) -> np.ndarray:
+        """Embed a query the way lookups and puts expect"""
+        return generate_embedding(cache_key_text(message, favorite_genres))
+
+# Singleton for the response cache
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> SemanticResponseCache:
+    """Get or initialize the response cache"""
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticResponseCache(
+                    max_entries=settings.RESPONSE_CACHE_SIZE,
+                    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+                    threshold=settings.RESPONSE_CACHE_THRESHOLD
+                )
+
+    return _cache
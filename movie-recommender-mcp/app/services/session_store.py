@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+from pydantic import BaseModel, Field
+
+from app.config import settings
+from app.models.mcp_models import Message
+
+logger = logging.getLogger(__name__)
+
+class SessionState(BaseModel):
+    """Conversation state kept between chat requests"""
+    messages: List[Message] = Field(default_factory=list)  # User/assistant turns still sent verbatim
+    summary: Optional[str] = None  # Condensed form of turns that fell out of the window
+    updated_at: float = Field(default_factory=time.time)
+
+class SessionStore(ABC):
+    """Storage for chat sessions keyed by session ID"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[SessionState]:
+        """Get a session, or None if it does not exist or has expired"""
+
+    @abstractmethod
+    def save(self, session_id: str, state: SessionState):
+        """Create or replace a session"""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Delete a session, returning whether it existed"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local session store
+
+    Sessions expire after ttl_seconds without activity; beyond max_sessions
+    the least recently used session is evicted.
+    """
+
+    def __init__(self, ttl_seconds: int, max_sessions: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evictions = 0
+
+    def _expire(self, now: float):
+        # Sessions are kept in last-used order, so expired ones are at the front
+        while self._sessions:
+            session_id, state = next(iter(self._sessions.items()))
+            if now - state.updated_at <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self.expired += 1
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            state = self._sessions.get(session_id)
+            if state is None:
+                return None
+
+            # Reads reorder sessions without refreshing them, so the front scan can miss this one
+            if now - state.updated_at > self.ttl_seconds:
+                del self._sessions[session_id]
+                self.expired += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            # Callers get their own message list, so concurrent requests cannot interleave appends
+            return SessionState(messages=list(state.messages), summary=state.summary, updated_at=state.updated_at)
+
+    def save(self, session_id: str, state: SessionState):
+        with self._lock:
+            state.updated_at = time.time()
+            self._sessions[session_id] = state
+            self._sessions.move_to_end(session_id)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+def create_session_store(backend: str) -> SessionStore:
+    """
+    Create a session store for a backend name
+
+    Args:
+        backend: "memory"
+
+    Returns:
+        SessionStore instance
+    """
+    if backend == "memory":
+        return InMemorySessionStore(
+            ttl_seconds=settings.SESSION_TTL_SECONDS,
+            max_sessions=settings.SESSION_MAX_SESSIONS
+        )
+    raise ValueError(f"Unknown session backend: {backend}")
+
+# Singleton for the session store
+_store = None
+_store_lock = threading.Lock()
+
+def get_session_store() -> SessionStore:
+    """Get or initialize the configured session store"""
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_session_store(settings.SESSION_BACKEND)
+                logger.info(f"Using {settings.SESSION_BACKEND} session store")
+
+    return _store
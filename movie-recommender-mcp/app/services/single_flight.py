@@ -0,0 +1,152 @@
+import asyncio
+import copy
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+def call_key(name: str, arguments: Dict[str, Any]) -> str:
+    """Canonical key for a tool call: name plus arguments as sorted JSON"""
+    return f"{name}:{json.dumps(arguments, sort_keys=True, separators=(',', ':'), default=str)}"
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls and briefly caches their results
+
+    The first caller for a key starts the computation as a detached task;
+    callers arriving while it is in flight await the same task instead of
+    starting their own. Every caller awaits it through a shield, so a
+    caller that is cancelled (e.g. its client disconnected) stops waiting
+    without cancelling the computation the others are waiting for.
+    Successful results are then served from a small LRU cache for
+    ttl_seconds. Errors are shared with the waiting callers but never
+    cached. Callers other than the one that ran the computation get a deep
+    copy, so one caller mutating its result cannot affect another.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _group_stats(self, group: str) -> Dict[str, int]:
+        return self._stats.setdefault(group, {"calls": 0, "executions": 0, "coalesced": 0, "cache_hits": 0})
+
+    def _cached(self, key: str) -> Tuple[bool, Any]:
+        entry = self._results.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._results[key]
+            return False, None
+
+        self._results.move_to_end(key)
+        return True, result
+
+    def _store(self, key: str, result: Any):
+        if self.ttl_seconds <= 0:
+            return
+
+        self._results[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    async def do(self, group: str, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func once per key among concurrent callers
+
+        Args:
+            group: Name metrics are reported under (the tool name)
+            key: Call key (see call_key)
+            func: Coroutine function computing the result
+
+        Returns:
+            The result
+        """
+        stats = self._group_stats(group)
+        stats["calls"] += 1
+
+        hit, result = self._cached(key)
+        if hit:
+            stats["cache_hits"] += 1
+            return copy.deepcopy(result)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            stats["coalesced"] += 1
+            _, snapshot = await asyncio.shield(task)
+            return copy.deepcopy(snapshot)
+
+        task = asyncio.ensure_future(self._execute(key, func))
+        # Mark the exception as retrieved in case every caller was cancelled
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._in_flight[key] = task
+        stats["executions"] += 1
+
+        result, _ = await asyncio.shield(task)
+        return result
+
+    async def _execute(self, key: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, Any]:
+        """Run the computation, returning the result and a snapshot for the other callers"""
+        try:
+            result = await func()
+            snapshot = copy.deepcopy(result)
+            self._store(key, snapshot)
+            return result, snapshot
+        finally:
+            del self._in_flight[key]
+
+    def clear(self):
+        self._results.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls, executions and deduplication ratio per tool"""
+        def summarize(counts: Dict[str, int]) -> Dict[str, Any]:
+            calls = counts["calls"]
+            return {
+                **counts,
+                "dedup_ratio": round(1 - counts["executions"] / calls, 4) if calls else 0.0,
+            }
+
+        totals = {"calls": 0, "executions": 0, "coalesced": 0, "cache_hits": 0}
+        for counts in self._stats.values():
+            for field in totals:
+                totals[field] += counts[field]
+
+        return {
+            "enabled": settings.SINGLE_FLIGHT_ENABLED,
+            "ttl_seconds": self.ttl_seconds,
+            "cached_results": len(self._results),
+            "in_flight": len(self._in_flight),
+            "total": summarize(totals),
+            "tools": {group: summarize(counts) for group, counts in self._stats.items()},
+        }
+
+# Singleton for the single-flight group
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+def get_single_flight() -> SingleFlight:
+    """Get or initialize the shared single-flight group"""
+    global _single_flight
+
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight(
+                    ttl_seconds=settings.TOOL_RESULT_CACHE_TTL_SECONDS,
+                    max_entries=settings.TOOL_RESULT_CACHE_SIZE
+                )
+
+    return _single_flight
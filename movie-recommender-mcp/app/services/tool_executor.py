@@ -0,0 +1,146 @@
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable
+
+from app.config import settings
+from app.services.single_flight import call_key, get_single_flight
+
+logger = logging.getLogger(__name__)
+
+class ToolExecutor:
+    """
+    Runs tool functions without blocking the event loop
+
+    Synchronous tools (vector search, embedding, catalog lookups) run on a
+    bounded thread pool; coroutine functions are awaited directly. Each
+    tool has its own concurrency limit, and calls beyond it wait in line
+    instead of piling onto the pool.
+    """
+
+    def __init__(self, max_workers: int, default_concurrency: int):
+        self.max_workers = max_workers
+        self.default_concurrency = default_concurrency
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._limits: Dict[str, int] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, name: str, max_concurrency: int):
+        """Set how many calls of a tool may run at once"""
+        with self._lock:
+            self._limits[name] = max_concurrency
+            self._semaphores.pop(name, None)
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(name)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self._limits.get(name, self.default_concurrency))
+                self._semaphores[name] = semaphore
+            return semaphore
+
+    def _tool_stats(self, name: str) -> Dict[str, Any]:
+        return self._stats.setdefault(name, {
+            "waiting": 0, "running": 0, "completed": 0, "errors": 0,
+            "total_seconds": 0.0, "max_seconds": 0.0,
+        })
+
+    async def run(self, name: str, func: Callable, **kwargs) -> Any:
+        """
+        Run a tool under its concurrency limit
+
+        Args:
+            name: Tool name (used for limits and metrics)
+            func: Tool implementation, sync or async
+            **kwargs: Tool arguments
+
+        Returns:
+            The tool's result
+        """
+        stats = self._tool_stats(name)
+        stats["waiting"] += 1
+
+        async with self._semaphore(name):
+            stats["waiting"] -= 1
+            stats["running"] += 1
+            start = time.perf_counter()
+
+            try:
+                if inspect.iscoroutinefunction(func):
+                    return await func(**kwargs)
+
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, functools.partial(func, **kwargs))
+            except Exception:
+                stats["errors"] += 1
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                stats["running"] -= 1
+                stats["completed"] += 1
+                stats["total_seconds"] += elapsed
+                stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight calls and latency per tool"""
+        tools = {}
+        for name, stats in self._stats.items():
+            completed = stats["completed"]
+            tools[name] = {
+                "max_concurrency": self._limits.get(name, self.default_concurrency),
+                "waiting": stats["waiting"],
+                "running": stats["running"],
+                "completed": completed,
+                "errors": stats["errors"],
+                "avg_latency_ms": round(stats["total_seconds"] / completed * 1000, 2) if completed else 0.0,
+                "max_latency_ms": round(stats["max_seconds"] * 1000, 2),
+            }
+
+        return {
+            "pool": {
+                "max_workers": self.max_workers,
+                "queue_depth": self._pool._work_queue.qsize(),
+            },
+            "tools": tools,
+        }
+
+# Singleton for the tool executor
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_tool_executor() -> ToolExecutor:
+    """Get or initialize the tool executor"""
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ToolExecutor(
+                    max_workers=settings.TOOL_EXECUTOR_MAX_WORKERS,
+                    default_concurrency=settings.TOOL_DEFAULT_CONCURRENCY
+                )
+
+    return _executor
+
+async def run_tool(name: str, func: Callable, **kwargs) -> Any:
+    """
+    Run a tool through the shared executor
+
+    Identical concurrent calls (same name and arguments) share one
+    execution, and results are reused for a few seconds, when
+    settings.SINGLE_FLIGHT_ENABLED is set.
+    """
+    executor = get_tool_executor()
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return await executor.run(name, func, **kwargs)
+
+    return await get_single_flight().do(
+        name, call_key(name, kwargs),
+        lambda: executor.run(name, func, **kwargs)
+    )
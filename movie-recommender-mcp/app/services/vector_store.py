@@ -0,0 +1,317 @@
+import hashlib
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Iterable, Optional
+import numpy as np
+
+from app.config import settings
+from app.data.catalog import MovieCatalog, genre_flag_key, get_catalog
+
+logger = logging.getLogger(__name__)
+
+class VectorStore(ABC):
+    """Interface for the movie embedding backends behind search_similar_movies"""
+
+    @abstractmethod
+    def get_embeddings(self, movie_ids: List[int]) -> Dict[int, np.ndarray]:
+        """
+        Get the stored embeddings of several movies in one call
+
+        Args:
+            movie_ids: MovieLens movie IDs
+
+        Returns:
+            Mapping of movie ID to embedding; unknown IDs are left out
+        """
+
+    @abstractmethod
+    def query(
+        self,
+        embedding: np.ndarray,
+        where: Optional[Dict[str, Any]] = None,
+        limit: int = 10,
+        include_embeddings: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the movies closest to an embedding
+
+        Args:
+            embedding: Query embedding
+            where: ChromaDB-style where clause (see build_metadata_filter)
+            limit: Maximum number of results
+            include_embeddings: Attach each result's embedding under "embedding"
+
+        Returns:
+            List of movie dictionaries with a similarity score, best first
+        """
+
+    def get_embedding(self, movie_id: int) -> np.ndarray:
+        """Get the stored embedding of one movie, raising ValueError if it is unknown"""
+        embeddings = self.get_embeddings([movie_id])
+        if movie_id not in embeddings:
+            raise ValueError(f"Movie with ID {movie_id} not found in database")
+        return embeddings[movie_id]
+
+# Comparison operators of the where clause, applied to NumPy columns
+_OPERATORS = {
+    "$eq": lambda column, value: column == value,
+    "$ne": lambda column, value: column != value,
+    "$gt": lambda column, value: column > value,
+    "$gte": lambda column, value: column >= value,
+    "$lt": lambda column, value: column < value,
+    "$lte": lambda column, value: column <= value,
+    "$in": lambda column, value: np.isin(column, value),
+    "$nin": lambda column, value: ~np.isin(column, value),
+}
+
+def where_to_mask(where: Optional[Dict[str, Any]], catalog: MovieCatalog) -> np.ndarray:
+    """
+    Evaluate a ChromaDB-style where clause over the catalog columns
+
+    Supports $and/$or, the comparison operators in _OPERATORS on year,
+    avg_rating, num_ratings, genre_mask and movie_id, and the boolean
+    genre flags written by build_movie_metadata. Like ChromaDB, a condition
+    on a field a movie has no value for (unknown year, no ratings) does not
+    match.
+
+    Args:
+        where: Where clause, or None for no filtering
+        catalog: Movie catalog to evaluate against
+
+    Returns:
+        Boolean array with one entry per catalog row
+    """
+    if not where:
+        return np.ones(len(catalog), dtype=bool)
+
+    if "$and" in where:
+        mask = np.ones(len(catalog), dtype=bool)
+        for condition in where["$and"]:
+            mask &= where_to_mask(condition, catalog)
+        return mask
+
+    if "$or" in where:
+        mask = np.zeros(len(catalog), dtype=bool)
+        for condition in where["$or"]:
+            mask |= where_to_mask(condition, catalog)
+        return mask
+
+    mask = np.ones(len(catalog), dtype=bool)
+    genre_flags = {genre_flag_key(genre): bit for genre, bit in catalog.genre_bits.items()}
+
+    for field, condition in where.items():
+        if field in genre_flags:
+            has_genre = (catalog.genre_masks & (1 << genre_flags[field])) != 0
+            mask &= has_genre if condition is True or condition == {"$eq": True} else ~has_genre
+            continue
+
+        if field == "year":
+            column, present = catalog.years, catalog.years > 0
+        elif field == "avg_rating":
+            column, present = catalog.avg_ratings, catalog.num_ratings > 0
+        elif field == "num_ratings":
+            column, present = catalog.num_ratings, catalog.num_ratings > 0
+        elif field == "genre_mask":
+            column, present = catalog.genre_masks, None
+        elif field == "movie_id":
+            column, present = catalog.ids.astype(str), None
+        elif field.startswith("genre_"):
+            # Flag for a genre the catalog has never seen
+            mask &= False
+            continue
+        else:
+            raise ValueError(f"Unsupported filter field: {field}")
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        for operator, value in condition.items():
+            if operator not in _OPERATORS:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+            mask &= _OPERATORS[operator](column, value)
+
+        if present is not None:
+            mask &= present
+
+    return mask
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+def embeddings_fingerprint(movie_ids: Iterable[int], content_hashes: Iterable[Optional[str]]) -> str:
+    """
+    Fingerprint of a set of movie embeddings
+
+    Built from each movie's ID and content hash, so it changes whenever a
+    movie is added, removed or re-embedded, regardless of row order.
+    """
+    digest = hashlib.sha1()
+    for movie_id, text_hash in sorted(zip((int(movie_id) for movie_id in movie_ids), content_hashes)):
+        digest.update(f"{movie_id}:{text_hash}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def collection_fingerprint_path() -> str:
+    """File holding the fingerprint of the movies collection after the last complete ingestion"""
+    return os.path.join(settings.CHROMA_PERSIST_DIRECTORY, "movies.fingerprint")
+
+def read_fingerprint(path: str) -> Optional[str]:
+    """Read a fingerprint file, or None if there is none"""
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def write_fingerprint(path: str, fingerprint: Optional[str]):
+    """Write a fingerprint file; None removes it, marking the contents as unknown"""
+    if fingerprint is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        f.write(fingerprint)
+
+def save_embedding_matrix(
+    movie_ids: np.ndarray,
+    embeddings: np.ndarray,
+    directory: Optional[str] = None,
+    fingerprint: Optional[str] = None
+):
+    """
+    Write movie embeddings in the NumPy backend's on-disk format
+
+    Args:
+        movie_ids: MovieLens movie IDs, one per row
+        embeddings: Embedding matrix (normalized before saving)
+        directory: Target directory (defaults to settings.VECTOR_STORE_DIR)
+        fingerprint: Fingerprint of the embeddings (see embeddings_fingerprint)
+    """
+    directory = directory or settings.VECTOR_STORE_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    np.save(os.path.join(directory, "ids.npy"), np.asarray(movie_ids, dtype=np.int64))
+    np.save(os.path.join(directory, "embeddings.npy"),
+            _normalize_rows(np.asarray(embeddings, dtype=np.float32)))
+    write_fingerprint(os.path.join(directory, "fingerprint"), fingerprint)
+    logger.info(f"Saved {len(movie_ids)} embeddings to {directory}")
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact in-process vector search over a memory-mapped embedding matrix
+
+    Rows are L2-normalized, so one matrix-vector product gives cosine
+    similarities for the whole catalog. Filters become a boolean mask and
+    the top k is selected with argpartition.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        directory = directory or settings.VECTOR_STORE_DIR
+        ids_path = os.path.join(directory, "ids.npy")
+        embeddings_path = os.path.join(directory, "embeddings.npy")
+
+        if not (os.path.exists(ids_path) and os.path.exists(embeddings_path)):
+            raise FileNotFoundError(
+                f"No embedding matrix in {directory}; populate the database or run export_chroma_to_numpy()"
+            )
+
+        self.ids = np.load(ids_path)
+        self.matrix = np.load(embeddings_path, mmap_mode="r")
+        self.fingerprint = read_fingerprint(os.path.join(directory, "fingerprint"))
+        self._row_by_id = {int(movie_id): row for row, movie_id in enumerate(self.ids.tolist())}
+
+        # Map store rows to catalog rows (-1 for movies missing from the catalog)
+        self.catalog = get_catalog()
+        rows = [self.catalog.row_for_id(movie_id) for movie_id in self.ids.tolist()]
+        self.catalog_rows = np.array([-1 if row is None else row for row in rows], dtype=np.int64)
+
+        logger.info(f"NumPy vector store loaded: {self.matrix.shape[0]} x {self.matrix.shape[1]} from {directory}")
+
+    def get_embeddings(self, movie_ids: List[int]) -> Dict[int, np.ndarray]:
+        found = [(movie_id, self._row_by_id[movie_id]) for movie_id in movie_ids if movie_id in self._row_by_id]
+        if not found:
+            return {}
+        rows = self.matrix[[row for _, row in found]]
+        return {movie_id: np.array(vector) for (movie_id, _), vector in zip(found, rows)}
+
+    def filter_mask(self, where: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Evaluate a where clause and map it onto store rows"""
+        in_catalog = self.catalog_rows >= 0
+        if not where:
+            return in_catalog
+        catalog_mask = where_to_mask(where, self.catalog)
+        return in_catalog & catalog_mask[np.maximum(self.catalog_rows, 0)]
+
+    def query(
+        self,
+        embedding: np.ndarray,
+        where: Optional[Dict[str, Any]] = None,
+        limit: int = 10,
+        include_embeddings: bool = False
+    ) -> List[Dict[str, Any]]:
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        scores = self.matrix @ query
+        mask = self.filter_mask(where)
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return []
+
+        candidate_scores = scores[candidates]
+        k = min(limit, len(candidates))
+        top = np.argpartition(-candidate_scores, k - 1)[:k]
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+
+        movies = []
+        for index in top:
+            row = candidates[index]
+            movie = self.catalog.movie_at(int(self.catalog_rows[row]))
+            movie["similarity"] = float(candidate_scores[index])
+            if include_embeddings:
+                movie["embedding"] = np.array(self.matrix[row])
+            movies.append(movie)
+        return movies
+
+# Singleton for the configured vector store
+_store = None
+_store_lock = threading.Lock()
+
+def get_vector_store() -> VectorStore:
+    """Get or initialize the vector store selected by settings.VECTOR_BACKEND"""
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_vector_store(settings.VECTOR_BACKEND)
+
+    return _store
+
+def create_vector_store(backend: str) -> VectorStore:
+    """
+    Create a vector store for a backend name
+
+    Args:
+        backend: "chroma" or "numpy"
+
+    Returns:
+        VectorStore instance
+    """
+    if backend == "chroma":
+        from app.services.chromadb_service import ChromaVectorStore
+        return ChromaVectorStore()
+    if backend == "numpy":
+        return NumpyVectorStore()
+    raise ValueError(f"Unknown vector backend: {backend}")
+
+def reset_vector_store():
+    """Drop the cached vector store so the next call reloads it (e.g. after ingestion)"""
+    global _store
+
+    with _store_lock:
+        _store = None
@@ -2,12 +2,37 @@ from typing import List, Dict, Any, Optional
 import logging
 import random
 from collections import Counter
+import numpy as np
 
-from app.tools.search_tools import search_movies, get_movie_by_id
+from app.tools.search_tools import search_movies, get_movie_by_id, get_top_movies
 from app.services.chromadb_service import search_similar_movies
+from app.services.neighbors import get_neighbor_table
+from app.services.cf_model import get_cf_model
+from app.services.vector_store import get_vector_store
+from app.config import settings
+from app.data.catalog import get_catalog
 
 logger = logging.getLogger(__name__)
 
+def _lookup_neighbors(movie_id: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """Get similar movies from the neighbour table, or None if the movie is not in it"""
+    table = get_neighbor_table()
+    if table is None:
+        return None
+
+    neighbors = table.lookup(movie_id, limit)
+    if neighbors is None:
+        return None
+
+    catalog = get_catalog()
+    movies = []
+    for neighbor_id, similarity in neighbors:
+        movie = catalog.get_movie(neighbor_id)
+        if movie is not None:
+            movie["similarity"] = round(similarity, 4)
+            movies.append(movie)
+    return movies
+
 def recommend_similar_movies(movie_id: int, limit: int = 5) -> List[Dict[str, Any]]:
     """
     Recommend movies similar to the given movie
@@ -23,12 +48,19 @@ def recommend_similar_movies(movie_id: int, limit: int = 5) -> List[Dict[str, An
 
     # Get the source movie
     source_movie = get_movie_by_id(movie_id)
+    if "error" in source_movie:
+        logger.warning(f"Cannot recommend movies similar to unknown movie {movie_id}")
+        return []
 
-    # Find similar movies using ChromaDB
-    similar_movies = search_similar_movies(
-        movie_id=movie_id,
-        limit=limit + 1  # Add 1 because the movie itself might be included
-    )
+    # Answer from the precomputed neighbour table when possible
+    similar_movies = _lookup_neighbors(movie_id, limit)
+
+    if similar_movies is None:
+        # Find similar movies using a live vector search
+        similar_movies = search_similar_movies(
+            movie_id=movie_id,
+            limit=limit + 1  # Add 1 because the movie itself might be included
+        )
 
     # Filter out the source movie
     recommendations = [
@@ -102,6 +134,107 @@ def recommend_by_query(query: str, limit: int = 5) -> List[Dict[str, Any]]:
 
     return movies
 
+def _recommend_collaborative(
+    favorite_movies: List[int],
+    favorite_genres: Optional[List[str]],
+    limit: int
+) -> List[Dict[str, Any]]:
+    """Recommend with the CF model, boosting favourite genres; empty if the model can't help"""
+    model = get_cf_model()
+    if model is None or not model.knows_any(favorite_movies):
+        return []
+
+    catalog = get_catalog()
+    candidates = model.recommend(favorite_movies, limit * 5)
+    genre_mask = catalog.genres_to_mask(favorite_genres) if favorite_genres else 0
+
+    scored = []
+    for movie_id, score in candidates:
+        row = catalog.row_for_id(movie_id)
+        if row is None:
+            continue
+        if genre_mask:
+            matches = bin(int(catalog.genre_masks[row]) & genre_mask).count("1")
+            score += abs(score) * settings.CF_GENRE_BOOST * matches
+        scored.append((score, movie_id, row))
+
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    recommendations = []
+    for score, _, row in scored[:limit]:
+        movie = catalog.movie_at(row)
+        movie["score"] = round(score, 4)
+        movie["reason"] = "People who liked your favorite movies also enjoyed this one."
+        recommendations.append(movie)
+    return recommendations
+
+def _recommend_multi_seed(
+    favorite_movies: List[int],
+    favorite_genres: Optional[List[str]],
+    limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Recommend from all favourites with one batched lookup and one vector query
+
+    Candidates come from a single query around the centroid of the
+    favourites' embeddings. Each candidate is scored by the mean of its
+    centroid similarity and its best similarity to any single favourite,
+    plus a boost per favourite genre it has. Ties break on movie ID, so
+    the same input always gives the same output.
+    """
+    store = get_vector_store()
+    seeds = store.get_embeddings(favorite_movies)
+    if not seeds:
+        return []
+
+    seed_matrix = np.stack(list(seeds.values())).astype(np.float32)
+    seed_matrix /= np.maximum(np.linalg.norm(seed_matrix, axis=1, keepdims=True), 1e-12)
+    centroid = seed_matrix.mean(axis=0)
+    centroid /= max(float(np.linalg.norm(centroid)), 1e-12)
+
+    candidates = store.query(
+        centroid,
+        limit=limit * settings.PERSONALIZATION_CANDIDATE_FACTOR + len(seeds),
+        include_embeddings=True
+    )
+    candidates = [movie for movie in candidates if movie["id"] not in seeds]
+    if not candidates:
+        return []
+
+    embeddings = np.stack([movie.pop("embedding") for movie in candidates]).astype(np.float32)
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+    centroid_similarity = embeddings @ centroid
+    seed_similarity = embeddings @ seed_matrix.T
+    best_seed = seed_similarity.argmax(axis=1)
+    scores = 0.5 * centroid_similarity + 0.5 * seed_similarity.max(axis=1)
+
+    catalog = get_catalog()
+    genre_mask = catalog.genres_to_mask(favorite_genres) if favorite_genres else 0
+    if genre_mask:
+        rows = [catalog.row_for_id(movie["id"]) for movie in candidates]
+        genre_matches = np.array([
+            bin(int(catalog.genre_masks[row]) & genre_mask).count("1") if row is not None else 0
+            for row in rows
+        ])
+        scores += settings.PERSONALIZATION_GENRE_BOOST * genre_matches
+
+    seed_titles = {movie_id: (catalog.get_movie(movie_id) or {}).get("title") for movie_id in seeds}
+    seed_ids = list(seeds.keys())
+
+    order = sorted(range(len(candidates)), key=lambda i: (-scores[i], candidates[i]["id"]))[:limit]
+    recommendations = []
+    for i in order:
+        movie = candidates[i]
+        movie["similarity"] = round(float(scores[i]), 4)
+        seed_title = seed_titles.get(seed_ids[best_seed[i]])
+        movie["reason"] = (
+            f"This movie is similar to {seed_title}, one of your favorites."
+            if seed_title else "This movie is similar to your favorite movies."
+        )
+        recommendations.append(movie)
+    return recommendations
+
 def recommend_personalized(
     favorite_movies: Optional[List[int]] = None,
     favorite_genres: Optional[List[str]] = None,
@@ -120,17 +253,28 @@ def recommend_personalized(
     """
     logger.info(f"Generating personalized recommendations based on: favorite_movies={favorite_movies}, favorite_genres={favorite_genres}")
 
+    # Use the collaborative-filtering model when it knows the user's favourites
+    if favorite_movies:
+        cf_recommendations = _recommend_collaborative(favorite_movies, favorite_genres, limit)
+        if cf_recommendations:
+            return cf_recommendations
+
+    # Cold start: content-based neighbours, genre matches and popular movies
     recommendations = []
 
+    # Score candidates against all favourites at once, with genres as a boost
+    if favorite_movies and settings.PERSONALIZATION_MODE == "multi_seed":
+        recommendations = _recommend_multi_seed(favorite_movies, favorite_genres, limit)
+
     # If user has favorite movies, use them for recommendations
-    if favorite_movies and len(favorite_movies) > 0:
+    if favorite_movies and len(favorite_movies) > 0 and not recommendations:
         # Pick a random favorite movie to find similar movies
         random_favorite = random.choice(favorite_movies)
         similar_recs = recommend_similar_movies(random_favorite, limit=limit // 2)
         recommendations.extend(similar_recs)
 
     # If user has favorite genres, use them for recommendations
-    if favorite_genres and len(favorite_genres) > 0:
+    if favorite_genres and len(favorite_genres) > 0 and len(recommendations) < limit:
         # Use all favorite genres for recommendations
         genre_recs = recommend_by_genres(favorite_genres, limit=limit - len(recommendations))
 
@@ -142,8 +286,7 @@ def recommend_personalized(
 
     # If we still need more recommendations, add popular movies
     if len(recommendations) < limit:
-        from app.data.loader import get_popular_movies
-        popular_movies = get_popular_movies(limit=limit - len(recommendations))
+        popular_movies = get_top_movies(limit=limit - len(recommendations))
 
         # Filter out duplicates
         existing_ids = {movie["id"] for movie in recommendations}
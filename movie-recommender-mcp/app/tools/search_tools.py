@@ -1,20 +1,14 @@
 from typing import List, Dict, Any, Optional
 import logging
-import re
 
-from app.services.chromadb_service import search_similar_movies
-from app.data.loader import get_movie_details, get_popular_movies, load_movie_data
+import numpy as np
 
-logger = logging.getLogger(__name__)
+from app.config import settings
+from app.services.chromadb_service import build_metadata_filter, search_similar_movies
+from app.data.catalog import MovieCatalog, genre_slug, get_catalog
+from app.data.loader import get_popular_movies
 
-def normalize_text(text: str) -> str:
-    """Normalize text for better matching"""
-    if not text:
-        return ""
-    # Convert to lowercase, remove extra spaces, and strip punctuation
-    text = text.lower().strip()
-    text = re.sub(r'\s+', ' ', text)
-    return text
+logger = logging.getLogger(__name__)
 
 def search_movies(
     query: Optional[str] = None,
@@ -44,18 +38,13 @@ def search_movies(
 
     # Try ChromaDB search first
     try:
-        # Prepare filter dictionary for ChromaDB
-        filter_dict = {}
-
-        # Year filtering
-        if year_from:
-            filter_dict["year"] = {"$gte": str(year_from)}
-
-        if year_to:
-            if "year" in filter_dict:
-                filter_dict["year"]["$lte"] = str(year_to)
-            else:
-                filter_dict["year"] = {"$lte": str(year_to)}
+        # Push genre, year and rating filters down into the vector query
+        filter_dict = build_metadata_filter(
+            genres=genres,
+            year_from=year_from,
+            year_to=year_to,
+            min_rating=min_rating
+        )
 
         results = []
 
@@ -63,11 +52,12 @@ def search_movies(
         if query or movie_id:
             # Try ChromaDB search
             try:
-                results = search_similar_movies(
-                    query_text=query,
+                results = _search_with_overfetch(
+                    query=query,
                     movie_id=movie_id,
                     filter_dict=filter_dict,
-                    limit=limit * 3  # Get more to filter later
+                    genres=genres,
+                    limit=limit
                 )
             except Exception as e:
                 logger.warning(f"ChromaDB search failed, falling back to direct search: {e}")
@@ -77,58 +67,31 @@ def search_movies(
         if not results:
             logger.info("No semantic search results, trying direct title matching")
 
-            # Load all movies
-            movies_df = load_movie_data()
+            catalog = get_catalog()
+            mask = catalog.filter_mask(
+                genres=genres,
+                year_from=year_from,
+                year_to=year_to,
+                min_rating=min_rating
+            )
 
             if query:
-                # Normalize the query
-                normalized_query = normalize_text(query)
-
-                # First try exact title match
-                matches = []
-                for _, row in movies_df.iterrows():
-                    title = normalize_text(row["title_clean"])
-
-                    # Check for exact match
-                    if normalized_query == title:
-                        matches.append({
-                            "id": int(row["movieId"]),
-                            "title": row["title_clean"],
-                            "year": row["year"],
-                            "genres": row["genres"],
-                            "match_type": "exact"
-                        })
-                    # Check for title containing query
-                    elif normalized_query in title:
-                        matches.append({
-                            "id": int(row["movieId"]),
-                            "title": row["title_clean"],
-                            "year": row["year"],
-                            "genres": row["genres"],
-                            "match_type": "partial"
-                        })
-
-                # Sort exact matches first, then partial matches
-                matches.sort(key=lambda x: 0 if x.get("match_type") == "exact" else 1)
-                results = matches[:limit * 3]  # Get more to filter later
+                # Exact, prefix and substring title matches first, then fuzzy matches
+                matches = catalog.title_index.search(query, limit=limit * 3, mask=mask)
+                results = []
+                for row, score, match_type in matches:
+                    movie = catalog.movie_at(row)
+                    movie["match_type"] = match_type
+                    results.append(movie)
 
                 logger.info(f"Direct title matching found {len(results)} results")
             else:
                 # If no query and no semantic results, use popular movies
-                results = get_popular_movies(limit=limit)
+                results = _popular_movies(catalog, limit, mask)
 
         # Apply genre filtering if needed
         if genres and len(genres) > 0:
-            filtered_results = []
-            normalized_genres = [normalize_text(g) for g in genres]
-
-            for movie in results:
-                movie_genres = [normalize_text(g) for g in movie.get("genres", [])]
-                # Check if any of the specified genres match
-                if any(genre in movie_genres for genre in normalized_genres):
-                    filtered_results.append(movie)
-
-            results = filtered_results
+            results = [movie for movie in results if _has_any_genre(movie, genres)]
             logger.info(f"After genre filtering: {len(results)} results")
 
         # Apply limit
@@ -161,6 +124,67 @@ def search_movies(
         logger.error(f"Error in search_movies: {e}")
         return []
 
+def _has_any_genre(movie: Dict[str, Any], genres: List[str]) -> bool:
+    """Check whether a movie has any of the given genres, compared like the pushed-down filter"""
+    wanted = {genre_slug(g) for g in genres}
+    return any(genre_slug(g) in wanted for g in movie.get("genres", []))
+
+def _search_with_overfetch(
+    query: Optional[str],
+    movie_id: Optional[int],
+    filter_dict: Optional[Dict[str, Any]],
+    genres: Optional[List[str]],
+    limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Run a filtered vector search, widening it until enough results pass
+
+    Filters are pushed into the where clause, so one query normally
+    suffices. Results are still checked against the genre filter, and the
+    query is repeated with a doubled n_results until `limit` hits remain
+    or the collection runs out of candidates.
+    """
+    fetch = limit
+    max_fetch = limit * settings.SEARCH_MAX_OVERFETCH
+
+    while True:
+        results = search_similar_movies(
+            query_text=query,
+            movie_id=movie_id,
+            filter_dict=filter_dict,
+            limit=fetch
+        )
+        matched = [m for m in results if not genres or _has_any_genre(m, genres)]
+
+        if len(matched) >= limit or len(results) < fetch or fetch >= max_fetch:
+            return matched
+
+        fetch = min(fetch * 2, max_fetch)
+        logger.info(f"Only {len(matched)}/{limit} results passed filters, re-querying with n_results={fetch}")
+
+def find_titles(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Find movies by title, tolerating typos and partial titles
+
+    Args:
+        query: Full or partial movie title
+        limit: Maximum number of results
+
+    Returns:
+        List of matching movies, best match first
+    """
+    logger.info(f"Finding titles matching: {query}")
+
+    catalog = get_catalog()
+    movies = []
+    for row, score, match_type in catalog.title_index.search(query, limit=limit):
+        movie = catalog.movie_at(row)
+        movie["match_type"] = match_type
+        movie["match_score"] = score
+        movies.append(movie)
+
+    return movies
+
 def get_movie_by_id(movie_id: int) -> Dict[str, Any]:
     """
     Get details for a specific movie
@@ -173,7 +197,9 @@ def get_movie_by_id(movie_id: int) -> Dict[str, Any]:
     """
     logger.info(f"Getting details for movie {movie_id}")
     try:
-        movie = get_movie_details(movie_id)
+        movie = get_catalog().get_movie(movie_id)
+        if movie is None:
+            raise KeyError(movie_id)
         logger.info(f"Found movie: {movie.get('title', 'Unknown')}")
         return movie
     except Exception as e:
@@ -191,4 +217,10 @@ def get_top_movies(limit: int = 10) -> List[Dict[str, Any]]:
         List of top movies
     """
     logger.info(f"Getting top {limit} movies")
+    return _popular_movies(get_catalog(), limit)
+
+def _popular_movies(catalog: MovieCatalog, limit: int, mask: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """Get popular movies from the catalog, or from the loader if it has no rating data"""
+    if catalog.has_ratings:
+        return catalog.to_movies(catalog.popular_rows(limit, mask))
     return get_popular_movies(limit=limit)
\ No newline at end of file
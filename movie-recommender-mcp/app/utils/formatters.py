@@ -0,0 +1,94 @@
+from typing import List, Dict, Any, Optional
+
+def format_movie(movie: Dict[str, Any], index: Optional[int] = None) -> str:
+    """
+    Format one movie as a list line
+
+    Args:
+        movie: Movie dictionary as returned by the tools
+        index: Position to prefix the line with (optional)
+
+    Returns:
+        Formatted line, with the recommendation reason on a second line if present
+    """
+    # Basic movie info
+    title = movie.get("title", "Unknown Title")
+    year = f" ({movie.get('year')})" if movie.get("year") else ""
+    genres = ", ".join(movie.get("genres", [])) if movie.get("genres") else "Unknown Genre"
+
+    # Additional details if available
+    rating = f", Rating: {movie.get('avg_rating'):.1f}/5" if movie.get("avg_rating") else ""
+    similarity = f", Similarity: {movie.get('similarity'):.2f}" if movie.get("similarity") else ""
+    reason = f"\n   Reason: {movie.get('reason')}" if movie.get("reason") else ""
+
+    prefix = f"{index}. " if index is not None else ""
+    return f"{prefix}{title}{year} - {genres}{rating}{similarity}{reason}"
+
+def format_movie_list(movies: List[Dict[str, Any]]) -> str:
+    """Format a list of movies into a readable string"""
+    if not movies:
+        return "No movies found."
+
+    return "\n".join(format_movie(movie, i) for i, movie in enumerate(movies, 1))
+
+def render_search_results(movies: List[Dict[str, Any]]) -> Optional[str]:
+    """Answer a search_movies call"""
+    if not movies:
+        return "I searched for movies matching your query, but couldn't find any results."
+    return "I found the following movies that match your query:\n\n" + format_movie_list(movies)
+
+def render_title_matches(movies: List[Dict[str, Any]]) -> Optional[str]:
+    """Answer a find_titles call"""
+    if not movies:
+        return "I couldn't find any movies with that title."
+    return "Here are the movies matching that title:\n\n" + "\n".join(
+        f"{format_movie(movie, i)} [ID: {movie.get('id')}]" for i, movie in enumerate(movies, 1)
+    )
+
+def render_top_movies(movies: List[Dict[str, Any]]) -> Optional[str]:
+    """Answer a get_top_movies call"""
+    if not movies:
+        return None
+    return "Here are some popular movies you might enjoy:\n\n" + format_movie_list(movies)
+
+def render_movie_details(movie: Dict[str, Any]) -> Optional[str]:
+    """Answer a get_movie_by_id call, or None if the lookup failed"""
+    if not movie or "error" in movie:
+        return None
+
+    title = movie.get("title", "Unknown")
+    year = f" ({movie.get('year')})" if movie.get("year") else ""
+    genres = ", ".join(movie.get("genres", [])) if movie.get("genres") else "Unknown Genre"
+
+    details = f"Here are details about {title}{year}:\nGenres: {genres}"
+    if movie.get("avg_rating"):
+        details += f"\nAverage rating: {movie['avg_rating']:.1f}/5"
+        if movie.get("num_ratings"):
+            details += f" from {movie['num_ratings']} ratings"
+    return details
+
+def summarize_movies(movies: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Compact plain-text summary of a movie list for the LLM
+
+    One line per movie with only the fields the model needs to write an
+    answer, instead of the full JSON result.
+    """
+    if not isinstance(movies, list):
+        return None
+    if not movies:
+        return "No movies found."
+
+    lines = []
+    for movie in movies:
+        line = f"[{movie.get('id')}] {movie.get('title', 'Unknown')}"
+        if movie.get("year"):
+            line += f" ({movie['year']})"
+        if movie.get("genres"):
+            line += f" | {', '.join(movie['genres'])}"
+        if movie.get("avg_rating"):
+            line += f" | {movie['avg_rating']:.1f}/5"
+        if movie.get("reason"):
+            line += f" | {movie['reason']}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,61 @@
+from typing import List, Optional, Tuple
+
+from app.models.mcp_models import Message
+from app.utils.text_utils import estimate_tokens
+
+# Characters of each dropped message kept in the running summary
+SUMMARY_LINE_CHARS = 200
+
+def history_tokens(messages: List[Message], summary: Optional[str] = None) -> int:
+    """Estimated tokens of a message list plus its summary"""
+    return sum(estimate_tokens(message.content or "") for message in messages) + estimate_tokens(summary or "")
+
+def _summary_line(message: Message) -> str:
+    text = " ".join((message.content or "").split())
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS].rsplit(" ", 1)[0] + "..."
+    return f"- {message.role.value}: {text}"
+
+def fit_history(
+    messages: List[Message],
+    summary: Optional[str],
+    token_budget: int
+) -> Tuple[List[Message], Optional[str]]:
+    """
+    Keep a conversation within a token budget
+
+    Once the history passes the budget, the most recent messages are kept
+    verbatim (up to three quarters of the budget, and always the latest
+    one) and older ones are folded into a short extractive summary, which
+    is itself trimmed to the remaining quarter, oldest lines first (the
+    newest line is always kept).
+
+    Args:
+        messages: User/assistant messages, oldest first
+        summary: Summary of turns already dropped
+        token_budget: Maximum estimated tokens for messages plus summary
+
+    Returns:
+        Tuple of (messages to keep, updated summary)
+    """
+    if history_tokens(messages, summary) <= token_budget:
+        return messages, summary
+
+    kept = []
+    used = 0
+    for message in reversed(messages):
+        cost = estimate_tokens(message.content or "")
+        if kept and used + cost > token_budget * 3 // 4:
+            break
+        kept.append(message)
+        used += cost
+    kept.reverse()
+
+    dropped = messages[:len(messages) - len(kept)]
+    lines = (summary.split("\n") if summary else []) + [_summary_line(message) for message in dropped]
+
+    summary_budget = token_budget // 4
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > summary_budget:
+        lines.pop(0)
+
+    return kept, "\n".join(lines) or None
@@ -1,21 +1,29 @@
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 def get_system_prompt(favorite_genres: Optional[List[str]] = None) -> str:
     """
     Get the system prompt for the movie recommendation system
 
+    Prompts are memoized per genre list, so repeat requests reuse the same string.
+
     Args:
         favorite_genres: User's favorite genres (optional)
 
     Returns:
         System prompt string
     """
+    return _build_system_prompt(tuple(favorite_genres or ()))
+
+@lru_cache(maxsize=256)
+def _build_system_prompt(favorite_genres: Tuple[str, ...]) -> str:
     # Base system prompt
     system_prompt = """
 You are a helpful and knowledgeable movie recommendation assistant. Your goal is to help users discover movies they might enjoy.
 
 You have access to the following functions to help with recommendations:
 - search_movies: Search for movies based on various criteria
+- find_titles: Find movies by title, tolerating typos and partial titles
 - get_movie_by_id: Get details for a specific movie
 - get_top_movies: Get the top rated/popular movies
 - recommend_similar_movies: Recommend movies similar to a given movie
@@ -26,12 +34,13 @@ You have access to the following functions to help with recommendations:
 Guidelines:
 1. Use function calls to retrieve movie data rather than relying on your own knowledge
 2. When recommending movies, explain why you think the user might enjoy them
-3. If a user mentions a specific movie, consider using recommend_similar_movies
+3. If a user mentions a specific movie, use find_titles to get its ID, then consider recommend_similar_movies
 4. If a user mentions genres they like, consider using recommend_by_genres
 5. For vague requests, use recommend_by_query with the user's description
 6. For returning users, use recommend_personalized if their preferences are known
 7. Format your responses in a conversational, helpful manner
 8. When listing movies, include their title, year, and genres when available
+9. When a request needs several independent lookups (e.g. comparing two movies), call the functions together in one turn rather than one after another
 """
 
     # Add personalization if favorite genres are provided
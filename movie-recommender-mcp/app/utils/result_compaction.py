@@ -0,0 +1,101 @@
+import json
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.utils.text_utils import estimate_tokens
+
+# Movie fields the LLM needs to write an answer; everything else is dropped
+MOVIE_FIELDS = (
+    "id", "title", "year", "genres", "avg_rating", "num_ratings",
+    "similarity", "reason", "match_type", "error",
+)
+
+# Running totals across all compacted results
+_stats = {
+    "results": 0,
+    "tokens_before": 0,
+    "tokens_after": 0,
+    "items_dropped": 0,
+}
+
+def _compact_value(value: Any, float_digits: int) -> Any:
+    if isinstance(value, float):
+        return round(value, float_digits)
+    if isinstance(value, list):
+        return [_compact_value(item, float_digits) for item in value]
+    return value
+
+def _compact_item(item: Dict[str, Any], float_digits: int) -> Dict[str, Any]:
+    return {
+        key: _compact_value(item[key], float_digits)
+        for key in MOVIE_FIELDS
+        if item.get(key) is not None and item.get(key) != []
+    }
+
+def compact_result(result: Any, max_items: Optional[int] = None, float_digits: Optional[int] = None) -> Any:
+    """
+    Shrink a tool result to what the LLM needs
+
+    Movie dictionaries are projected onto MOVIE_FIELDS (dropping document
+    text, embeddings and empty values), floats are rounded, and lists are
+    capped at max_items.
+
+    Args:
+        result: Tool result (a movie, a list of movies, or anything else)
+        max_items: Maximum list length (defaults to settings.TOOL_RESULT_MAX_ITEMS)
+        float_digits: Decimal places kept (defaults to settings.TOOL_RESULT_FLOAT_DIGITS)
+
+    Returns:
+        The compacted result
+    """
+    max_items = max_items or settings.TOOL_RESULT_MAX_ITEMS
+    float_digits = float_digits if float_digits is not None else settings.TOOL_RESULT_FLOAT_DIGITS
+
+    if isinstance(result, dict):
+        return _compact_item(result, float_digits)
+
+    if isinstance(result, list):
+        return [
+            _compact_item(item, float_digits) if isinstance(item, dict) else _compact_value(item, float_digits)
+            for item in result[:max_items]
+        ]
+
+    return _compact_value(result, float_digits)
+
+def encode_result(result: Any) -> str:
+    """
+    Serialize a tool result for a tool message, compacting it first
+
+    Records token estimates before and after compaction.
+
+    Args:
+        result: Tool result
+
+    Returns:
+        JSON string
+    """
+    if result is None:
+        return "{}"
+
+    if not settings.TOOL_RESULT_COMPACTION_ENABLED:
+        return json.dumps(result, default=str)
+
+    before = json.dumps(result, default=str)
+    encoded = json.dumps(compact_result(result), separators=(",", ":"), ensure_ascii=False, default=str)
+
+    _stats["results"] += 1
+    _stats["tokens_before"] += estimate_tokens(before)
+    _stats["tokens_after"] += estimate_tokens(encoded)
+    if isinstance(result, list):
+        _stats["items_dropped"] += max(0, len(result) - settings.TOOL_RESULT_MAX_ITEMS)
+
+    return encoded
+
+def get_compaction_stats() -> Dict[str, Any]:
+    """Token estimates before and after compaction, summed over all results"""
+    before, after = _stats["tokens_before"], _stats["tokens_after"]
+    return {
+        **_stats,
+        "enabled": settings.TOOL_RESULT_COMPACTION_ENABLED,
+        "reduction": round(1 - after / before, 4) if before else 0.0,
+    }
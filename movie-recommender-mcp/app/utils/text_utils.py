@@ -0,0 +1,14 @@
+import re
+
+def normalize_text(text: str) -> str:
+    """Normalize text for better matching"""
+    if not text:
+        return ""
+    # Convert to lowercase, remove extra spaces, and strip punctuation
+    text = text.lower().strip()
+    text = re.sub(r'\s+', ' ', text)
+    return text
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English/JSON text (about four characters per token)"""
+    return (len(text) + 3) // 4
@@ -0,0 +1,128 @@
+"""
+Compare the PyTorch and ONNX Runtime embedding backends
+
+Encodes the same movie texts with the SentenceTransformers model and with
+the exported ONNX model (fp32 and, when exported, int8). Reports parity
+(cosine similarity to the PyTorch embeddings and overlap of each text's
+nearest neighbours) and performance (single-query latency percentiles and
+batch throughput). A backend is reported safe to switch to when its
+minimum cosine and neighbour overlap meet the thresholds.
+
+The model is loaded from the local Hugging Face cache or a local path in
+EMBEDDING_MODEL_NAME, so nothing is downloaded. Export the ONNX model
+first with:
+
+    python -m app.services.onnx_embedding --quantize
+
+Usage:
+    python -m benchmarks.embedding_backends --texts 2000 --queries 200
+"""
+import os
+
+# Everything must come from local files; fail instead of downloading
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+import argparse
+import logging
+import time
+from typing import List, Dict, Any
+import numpy as np
+
+from app.config import settings
+from app.data.loader import load_movie_data
+from app.services.embeddings import build_movie_text, load_embedding_model
+from app.services.onnx_embedding import QUANTIZED_MODEL_FILE, OnnxSentenceEncoder, default_onnx_dir
+
+def _movie_texts(count: int, seed: int) -> List[str]:
+    """Embedding texts of a random sample of catalog movies"""
+    movies_df = load_movie_data()
+    rows = np.random.default_rng(seed).choice(len(movies_df), size=min(count, len(movies_df)), replace=False)
+    return [
+        build_movie_text({
+            "title": row["title_clean"],
+            "genres": row["genres"],
+            "year": str(row["year"]) if row["year"] else None,
+        })
+        for _, row in movies_df.iloc[rows].iterrows()
+    ]
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    return embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+def _neighbour_overlap(reference: np.ndarray, candidate: np.ndarray, k: int) -> float:
+    """Mean fraction of each text's k nearest neighbours both embeddings agree on"""
+    def neighbours(embeddings: np.ndarray) -> np.ndarray:
+        scores = embeddings @ embeddings.T
+        np.fill_diagonal(scores, -np.inf)
+        return np.argpartition(-scores, k, axis=1)[:, :k]
+
+    expected, actual = neighbours(reference), neighbours(candidate)
+    return float(np.mean([len(set(e) & set(a)) / k for e, a in zip(expected, actual)]))
+
+def _measure(model, texts: List[str], queries: List[str], batch_size: int) -> Dict[str, Any]:
+    model.encode(queries[:8], batch_size=batch_size)  # Warm up
+
+    latencies = np.empty(len(queries))
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        model.encode([query], batch_size=1)
+        latencies[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embeddings = model.encode(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "embeddings": _normalize(np.asarray(embeddings, dtype=np.float32)),
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p95_ms": np.percentile(latencies, 95) * 1000,
+        "texts_per_second": len(texts) / elapsed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000, help="Movie texts encoded for parity and throughput")
+    parser.add_argument("--queries", type=int, default=200, help="Single-text encodes timed for latency")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--threads", type=int, help="ONNX Runtime intra-op threads (defaults to EMBEDDING_NUM_THREADS)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours compared per text")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Minimum cosine to the PyTorch embeddings")
+    parser.add_argument("--min-overlap", type=float, default=0.9, help="Minimum mean neighbour overlap")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    texts = _movie_texts(args.texts, args.seed)
+    queries = texts[:args.queries]
+    directory = default_onnx_dir()
+
+    backends = {
+        "torch": load_embedding_model("torch"),
+        "onnx": OnnxSentenceEncoder(directory, num_threads=args.threads),
+    }
+    if os.path.exists(os.path.join(directory, QUANTIZED_MODEL_FILE)):
+        backends["onnx-int8"] = OnnxSentenceEncoder(directory, quantized=True, num_threads=args.threads)
+
+    results = {name: _measure(model, texts, queries, args.batch_size) for name, model in backends.items()}
+    reference = results["torch"]["embeddings"]
+
+    print(f"{len(texts)} texts, {len(queries)} single-text queries, batch size {args.batch_size}")
+    for name, result in results.items():
+        line = (
+            f"{name:>10}: p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms "
+            f"throughput={result['texts_per_second']:.0f} texts/s"
+        )
+        if name != "torch":
+            cosines = np.sum(reference * result["embeddings"], axis=1)
+            overlap = _neighbour_overlap(reference, result["embeddings"], args.k)
+            safe = cosines.min() >= args.min_cosine and overlap >= args.min_overlap
+            line += (
+                f" cosine mean={cosines.mean():.5f} min={cosines.min():.5f} "
+                f"overlap@{args.k}={overlap:.3f} -> {'safe to switch' if safe else 'NOT safe to switch'}"
+            )
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Local OpenAI-compatible chat completions server for testing the LLM client
+
+Answers POST /v1/chat/completions with a canned assistant message, after
+an optional artificial delay, and can inject 429/503 errors to exercise
+retries. Requests with "stream": true get server-sent event chunks, one
+word at a time. A user message of the form
+"/call <function> <json args> | <function> <json args>" is answered with
+those tool calls (or the first one as a legacy function_call), to exercise
+the tool path. Steps separated by "=>" are requested one LLM call at a
+time, so "/call find_titles {...} => recommend_similar_movies {...}"
+exercises a multi-step agent turn. A "say <text>" entry in a step is sent
+as the assistant's text alongside that step's tool calls.
+Point the service at it with:
+
+    python -m benchmarks.mock_openai_server --port 8089 --latency-ms 200 --fail-rate 0.1
+    LLM_API_BASE=http://localhost:8089/v1 LLM_API_KEY=test uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from aiohttp import web
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def _requested_step(payload: Dict[str, Any]) -> Tuple[str, List[Dict[str, str]]]:
+    """Text and tool calls of the next step of the last "/call <name> <json> | ... => ..." user message"""
+    messages = payload.get("messages", [])
+    if not (payload.get("tools") or payload.get("functions")) or "none" in (payload.get("tool_choice"), payload.get("function_call")):
+        return "", []
+
+    last_user = next((i for i in range(len(messages) - 1, -1, -1) if messages[i].get("role") == "user"), None)
+    if last_user is None:
+        return "", []
+
+    content = (messages[last_user].get("content") or "").strip()
+    if not content.startswith("/call "):
+        return "", []
+
+    # Each assistant message with calls since the user message is a step already taken
+    step = sum(
+        1 for message in messages[last_user + 1:]
+        if message.get("role") == "assistant" and (message.get("tool_calls") or message.get("function_call"))
+    )
+    steps = content[len("/call "):].split("=>")
+    if step >= len(steps):
+        return "", []
+
+    text = ""
+    calls = []
+    for i, spec in enumerate(steps[step].split("|")):
+        parts = spec.strip().split(" ", 1)
+        if parts[0] == "say":
+            text = parts[1] if len(parts) > 1 else ""
+            continue
+        calls.append({"id": f"call_mock_{step}_{i}", "name": parts[0], "arguments": parts[1] if len(parts) > 1 else "{}"})
+    return text, calls
+
+def create_app(latency_ms: float = 0.0, fail_rate: float = 0.0, token_latency_ms: float = 0.0) -> web.Application:
+    """
+    Build the mock server application
+
+    Args:
+        latency_ms: Delay before every response (or before the first chunk)
+        fail_rate: Fraction of requests answered with 429 or 503
+        token_latency_ms: Delay between streamed chunks
+    """
+    stats = {"requests": 0, "failures": 0}
+
+    async def chat_completions(request: web.Request) -> web.Response:
+        stats["requests"] += 1
+        payload = await request.json()
+
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        if random.random() < fail_rate:
+            stats["failures"] += 1
+            status = random.choice([429, 503])
+            return web.json_response({"error": {"message": "injected failure"}}, status=status)
+
+        last_user = next(
+            (m.get("content") or "" for m in reversed(payload.get("messages", [])) if m.get("role") == "user"),
+            ""
+        )
+        text, tool_calls = _requested_step(payload)
+        use_tools = "tools" in payload
+        content = text if tool_calls else f"Mock response to: {last_user}"
+        prompt_tokens = sum(_estimate_tokens(m.get("content") or "") for m in payload.get("messages", []))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": _estimate_tokens(content),
+            "total_tokens": prompt_tokens + _estimate_tokens(content),
+        }
+
+        if payload.get("stream"):
+            return await _stream(request, payload, content, tool_calls, use_tools, usage)
+
+        message = {"role": "assistant", "content": content or None}
+        if tool_calls and use_tools:
+            message["tool_calls"] = [
+                {"id": call["id"], "type": "function",
+                 "function": {"name": call["name"], "arguments": call["arguments"]}}
+                for call in tool_calls
+            ]
+        elif tool_calls:
+            message["function_call"] = {"name": tool_calls[0]["name"], "arguments": tool_calls[0]["arguments"]}
+        finish_reason = ("tool_calls" if use_tools else "function_call") if tool_calls else "stop"
+
+        return web.json_response({
+            "id": f"chatcmpl-mock-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": finish_reason,
+            }],
+            "usage": usage,
+        })
+
+    async def _stream(
+        request: web.Request,
+        payload: Dict[str, Any],
+        content: str,
+        tool_calls: List[Dict[str, str]],
+        use_tools: bool,
+        usage: Dict[str, int]
+    ) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        base = {
+            "id": f"chatcmpl-mock-{stats['requests']}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload.get("model", "mock"),
+        }
+
+        async def send(delta: Dict[str, Any], finish_reason: Optional[str] = None):
+            chunk = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if token_latency_ms:
+                await asyncio.sleep(token_latency_ms / 1000)
+
+        await send({"role": "assistant"})
+        if content:
+            words = content.split(" ")
+            for i, word in enumerate(words):
+                await send({"content": word if i == 0 else " " + word})
+
+        if tool_calls and use_tools:
+            for index, call in enumerate(tool_calls):
+                await send({"tool_calls": [{"index": index, "id": call["id"], "type": "function",
+                                            "function": {"name": call["name"], "arguments": ""}}]})
+                arguments = call["arguments"]
+                for i in range(0, len(arguments), 8):
+                    await send({"tool_calls": [{"index": index, "function": {"arguments": arguments[i:i + 8]}}]})
+            await send({}, "tool_calls")
+        elif tool_calls:
+            await send({"function_call": {"name": tool_calls[0]["name"], "arguments": ""}})
+            arguments = tool_calls[0]["arguments"]
+            for i in range(0, len(arguments), 8):
+                await send({"function_call": {"arguments": arguments[i:i + 8]}})
+            await send({}, "function_call")
+        else:
+            await send({}, "stop")
+
+        if payload.get("stream_options", {}).get("include_usage"):
+            await response.write(f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n".encode())
+
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat completions server")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay before each response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests answered with 429/503")
+    parser.add_argument("--token-latency-ms", type=float, default=0.0, help="Delay between streamed chunks")
+    args = parser.parse_args()
+
+    web.run_app(create_app(args.latency_ms, args.fail_rate, args.token_latency_ms), port=args.port)
@@ -0,0 +1,69 @@
+"""
+Per-request CPU cost of building the LLM request body
+
+Compares building the payload from scratch on every request (function
+definitions converted from the registry, system prompt formatted again)
+with the precompiled path the chat endpoint uses (shared function schema,
+memoized system prompt). No network calls are made.
+
+Usage:
+    python -m benchmarks.request_templates --iterations 20000
+"""
+import argparse
+import json
+import time
+from typing import Callable, List
+
+from app.models.mcp_models import Message, MessageRole
+from app.routers.mcp import FUNCTION_SCHEMA, function_registry
+from app.services.llm_service import build_chat_payload, compile_function_schema, message_to_dict
+from app.utils.prompt_templates import _build_system_prompt, get_system_prompt
+
+GENRES = ["Action", "Sci-Fi", "Thriller"]
+
+CONVERSATION = [
+    Message(role=MessageRole.USER, content="Can you recommend something like The Matrix?"),
+    Message(role=MessageRole.ASSISTANT, content="Sure! Here are some movies similar to The Matrix..."),
+    Message(role=MessageRole.USER, content="Something more recent, please."),
+]
+
+def _messages(system_prompt: str) -> List[Message]:
+    return [Message(role=MessageRole.SYSTEM, content=system_prompt)] + CONVERSATION
+
+def build_from_scratch() -> dict:
+    """What every request did before: rebuild definitions, schema and prompt"""
+    definitions = [item["definition"] for item in function_registry.values()]
+    schema = compile_function_schema(definitions)
+    system_prompt = _build_system_prompt.__wrapped__(tuple(GENRES))
+    messages = [message_to_dict(message, True) for message in _messages(system_prompt)]
+    return build_chat_payload(messages, schema)
+
+def build_precompiled() -> dict:
+    """What every request does now: shared schema, memoized prompt"""
+    system_prompt = get_system_prompt(GENRES)
+    messages = [message_to_dict(message, True) for message in _messages(system_prompt)]
+    return build_chat_payload(messages, FUNCTION_SCHEMA)
+
+def _cpu_per_call(func: Callable[[], dict], iterations: int) -> float:
+    func()  # Warm up caches
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM request body construction")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    # Both paths must send the same request
+    assert json.dumps(build_from_scratch()) == json.dumps(build_precompiled())
+
+    before = _cpu_per_call(build_from_scratch, args.iterations)
+    after = _cpu_per_call(build_precompiled, args.iterations)
+
+    print(f"from scratch: {before * 1e6:.1f}us CPU per request")
+    print(f"precompiled:  {after * 1e6:.1f}us CPU per request ({before / after:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
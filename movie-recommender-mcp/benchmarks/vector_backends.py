@@ -0,0 +1,79 @@
+"""
+Compare the ChromaDB and NumPy vector backends
+
+Runs the same queries against both stores and reports latency percentiles
+and recall@k of ChromaDB's approximate (HNSW) results against the exact
+NumPy results. Requires a populated database.
+
+Usage:
+    python -m benchmarks.vector_backends --queries 200 --k 10
+"""
+import argparse
+import logging
+import time
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+
+from app.services.chromadb_service import build_metadata_filter
+from app.services.vector_store import VectorStore, create_vector_store
+
+def _time_queries(
+    store: VectorStore,
+    queries: np.ndarray,
+    k: int,
+    where: Optional[Dict[str, Any]]
+) -> Tuple[np.ndarray, List[List[int]]]:
+    latencies = np.empty(len(queries))
+    results = []
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        movies = store.query(query, where=where, limit=k)
+        latencies[i] = time.perf_counter() - start
+        results.append([movie["id"] for movie in movies])
+    return latencies, results
+
+def _report(name: str, latencies: np.ndarray):
+    ms = latencies * 1000
+    print(f"{name:>8}: p50={np.percentile(ms, 50):.2f}ms p95={np.percentile(ms, 95):.2f}ms "
+          f"mean={ms.mean():.2f}ms qps={len(ms) / latencies.sum():.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--genre", action="append", help="Genre filter (repeatable)")
+    parser.add_argument("--year-from", type=int, help="Minimum release year filter")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    chroma = create_vector_store("chroma")
+    numpy_store = create_vector_store("numpy")
+    where = build_metadata_filter(genres=args.genre, year_from=args.year_from)
+
+    # Use perturbed movie embeddings as realistic query vectors
+    rng = np.random.default_rng(args.seed)
+    rows = rng.choice(numpy_store.matrix.shape[0], size=args.queries, replace=True)
+    queries = np.asarray(numpy_store.matrix[rows], dtype=np.float32)
+    queries += rng.normal(scale=0.05, size=queries.shape).astype(np.float32)
+
+    # Warm up both backends
+    chroma.query(queries[0], where=where, limit=args.k)
+    numpy_store.query(queries[0], where=where, limit=args.k)
+
+    chroma_latencies, chroma_results = _time_queries(chroma, queries, args.k, where)
+    numpy_latencies, exact_results = _time_queries(numpy_store, queries, args.k, where)
+
+    recalls = [
+        len(set(approx) & set(exact)) / len(exact)
+        for approx, exact in zip(chroma_results, exact_results) if exact
+    ]
+
+    print(f"{args.queries} queries, k={args.k}, where={where}")
+    _report("chroma", chroma_latencies)
+    _report("numpy", numpy_latencies)
+    print(f"chroma recall@{args.k} vs exact: {np.mean(recalls):.4f}")
+
+if __name__ == "__main__":
+    main()
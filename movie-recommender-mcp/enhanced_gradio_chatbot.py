@@ -21,19 +21,20 @@ logger = logging.getLogger(__name__)
 
 # MCP Server connection settings
 MCP_SERVER_URL = "http://localhost:8000/api/mcp/chat"
+MCP_STREAM_URL = "http://localhost:8000/api/mcp/chat/stream"
 ADMIN_URL = "http://localhost:8000/api/admin"
 SESSION_ID = str(uuid.uuid4())  # Generate a session ID for this chat instance
 
 # Chat state
 class ChatState:
-    def __init__(self):
+    def __init__(self, session_id: Optional[str] = None):
         self.message_history = []
         self.favorite_genres = []
         self.favorite_movies = []
         self.recent_searches = []
-        self.session_id = SESSION_ID
+        self.session_id = session_id or str(uuid.uuid4())
 
-chat_state = ChatState()
+chat_state = ChatState(SESSION_ID)
 
 def format_movie_list(movies: List[Dict[str, Any]]) -> str:
     """Format a list of movies into a readable string"""
@@ -63,17 +64,8 @@ def send_message_to_mcp(message: str, history: List[List[str]]) -> Tuple[str, Li
     # Log the incoming message
     logger.info(f"User message: {message}")
 
-    # Prepare the request payload
-    mcp_messages = []
-
-    # Add history to provide context
-    for human_msg, ai_msg in history:
-        if human_msg is not None:  # Skip initial welcome message
-            mcp_messages.append({"role": "user", "content": human_msg})
-            mcp_messages.append({"role": "assistant", "content": ai_msg})
-
-    # Add the current message
-    mcp_messages.append({"role": "user", "content": message})
+    # The server keeps the conversation for this session, so only the new message is sent
+    mcp_messages = [{"role": "user", "content": message}]
 
     # Prepare the request payload
     payload = {
@@ -94,20 +86,43 @@ def send_message_to_mcp(message: str, history: List[List[str]]) -> Tuple[str, Li
         new_history = history + [[message, "Thinking..."]]
         yield "", new_history
 
-        # Send the request to the MCP server
-        logger.info(f"Sending request to MCP server")
-        response = requests.post(MCP_SERVER_URL, json=payload)
-
-        # Log the raw response
-        logger.debug(f"Raw MCP response: Status {response.status_code}, Content: {response.text[:1000]}...")
-
+        # Stream events from the MCP server so the answer renders as it is generated
+        logger.info(f"Sending streaming request to MCP server")
+        response = requests.post(MCP_STREAM_URL, json=payload, stream=True)
         response.raise_for_status()  # Raise an exception for 4XX/5XX responses
 
-        mcp_response = response.json()
-        logger.info(f"Received response from MCP server")
+        assistant_message = ""
+        status_line = ""
+        mcp_response = {}
+
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+
+            event = json.loads(line)
+            event_type = event.get("type")
+
+            if event_type == "token":
+                assistant_message += event.get("content", "")
+            elif event_type == "function_call_start":
+                logger.info(f"Function called: {event.get('name')} with arguments: {json.dumps(event.get('arguments', {}))}")
+                status_line = f"_Running {event.get('name')}..._"
+            elif event_type == "function_call_end":
+                logger.info(f"Function {event.get('name')} finished in {event.get('elapsed_ms')}ms")
+                status_line = ""
+            elif event_type == "error":
+                logger.error(f"MCP server reported an error: {event.get('message')}")
+                if not assistant_message:
+                    assistant_message = f"Error from the movie recommendation server: {event.get('message')}"
+            elif event_type == "done":
+                mcp_response = event
+                assistant_message = event.get("message", {}).get("content", assistant_message)
+
+            # Show tool progress under whatever text has arrived so far
+            parts = [part for part in (assistant_message, status_line) if part]
+            new_history[-1][1] = "\n\n".join(parts) or "Thinking..."
+            yield "", new_history
 
-        # Extract the assistant's message
-        assistant_message = mcp_response.get("message", {}).get("content", "")
         logger.info(f"Assistant message: {assistant_message[:100]}...")
 
         # Check if there was a function call and log it
@@ -115,7 +130,6 @@ def send_message_to_mcp(message: str, history: List[List[str]]) -> Tuple[str, Li
         if function_call:
             function_name = function_call.get("name", "")
             arguments = function_call.get("arguments", {})
-            logger.info(f"Function called: {function_name} with arguments: {json.dumps(arguments)}")
 
             # Log the direct function call attempt
             try:
@@ -221,9 +235,16 @@ def reset_chat_state():
     chat_state = ChatState()
     return "Chat state has been reset. Your preferences have been cleared."
 
+def start_new_conversation():
+    """Clear the chat and start a new server-side session"""
+    global chat_state
+    chat_state.session_id = str(uuid.uuid4())
+    logger.info(f"Started new session: {chat_state.session_id}")
+    return [], ""
+
 def initialize_chat():
     """Initialize the chat with a welcome message"""
-    logger.info(f"Initializing chat with session ID: {SESSION_ID}")
+    logger.info(f"Initializing chat with session ID: {chat_state.session_id}")
     return "", [[None, "👋 Welcome to the Movie Recommendation Chat! I can help you find movies based on genres, similar movies, or specific criteria. What kind of movies are you looking for today?"]]
 
 def make_direct_movie_call(movie_id: int) -> str:
@@ -317,7 +338,7 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
     )
 
     # Button handlers
-    clear.click(lambda: ([], ""), outputs=[chatbot, msg])
+    clear.click(start_new_conversation, outputs=[chatbot, msg])
 
     popular.click(
         lambda: ([chatbot[-1][0] if len(chatbot) > 0 else None, get_popular_movies()]),
@@ -11,6 +11,7 @@ logger = logging.getLogger(__name__)
 
 # MCP Server connection settings
 MCP_SERVER_URL = "http://localhost:8000/api/mcp/chat"
+MCP_STREAM_URL = "http://localhost:8000/api/mcp/chat/stream"
 SESSION_ID = str(uuid.uuid4())  # Generate a session ID for this chat instance
 
 # History of messages for context
@@ -37,23 +38,15 @@ def format_movie_list(movies: List[Dict[str, Any]]) -> str:
 
     return result
 
-def send_message_to_mcp(message: str, history: List[List[str]]) -> str:
-    """Send a message to the MCP server and get a response"""
+def send_message_to_mcp(message: str, history: List[List[str]]):
+    """Send a message to the MCP server and stream the response into the chat"""
     global message_history
 
-    # Prepare the request payload
-    mcp_messages = []
-
-    # Add history to provide context (excluding system messages)
-    for human_msg, ai_msg in history:
-        mcp_messages.append({"role": "user", "content": human_msg})
-        mcp_messages.append({"role": "assistant", "content": ai_msg})
-
-    # Add the current message
-    mcp_messages.append({"role": "user", "content": message})
+    # The server keeps the conversation for this session, so only the new message is sent
+    mcp_messages = [{"role": "user", "content": message}]
 
     # Store in our history
-    message_history = mcp_messages
+    message_history = message_history + mcp_messages
 
     # Prepare the request payload
     payload = {
@@ -64,32 +57,43 @@ def send_message_to_mcp(message: str, history: List[List[str]]) -> str:
         }
     }
 
+    new_history = history + [[message, ""]]
+    yield "", new_history
+
     try:
-        # Send the request to the MCP server
+        # Send the request to the MCP server and render tokens as they arrive
         logger.info(f"Sending request to MCP server: {payload}")
-        response = requests.post(MCP_SERVER_URL, json=payload)
+        response = requests.post(MCP_STREAM_URL, json=payload, stream=True)
         response.raise_for_status()  # Raise an exception for 4XX/5XX responses
 
-        mcp_response = response.json()
-        logger.info(f"Received response from MCP server: {mcp_response}")
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
 
-        # Extract the assistant's message
-        assistant_message = mcp_response.get("message", {}).get("content", "")
+            event = json.loads(line)
+            if event.get("type") == "token":
+                new_history[-1][1] += event.get("content", "")
+            elif event.get("type") == "done":
+                logger.info(f"Received response from MCP server: {event}")
+                new_history[-1][1] = event.get("message", {}).get("content", new_history[-1][1])
+            elif event.get("type") == "error" and not new_history[-1][1]:
+                new_history[-1][1] = f"Error from the movie recommendation server: {event.get('message')}"
+            else:
+                continue
 
-        # Check if there was a function call
-        function_call = mcp_response.get("function_call")
-        if function_call:
-            function_name = function_call.get("name", "")
-            arguments = function_call.get("arguments", {})
-
-            function_info = f"\n\n*Used function: {function_name} with arguments: {json.dumps(arguments, indent=2)}*"
-            return assistant_message
-
-        return assistant_message
+            yield "", new_history
 
     except Exception as e:
         logger.error(f"Error communicating with MCP server: {e}")
-        return f"Error communicating with the movie recommendation server: {str(e)}"
+        new_history[-1][1] = f"Error communicating with the movie recommendation server: {str(e)}"
+        yield "", new_history
+
+def start_new_conversation():
+    """Clear the chat and start a new server-side session"""
+    global SESSION_ID, message_history
+    SESSION_ID = str(uuid.uuid4())
+    message_history = []
+    return [], ""
 
 def initialize_chat():
     """Initialize the chat with a welcome message"""
@@ -111,13 +115,11 @@ with gr.Blocks(css="footer {visibility: hidden}") as demo:
     msg.submit(
         send_message_to_mcp,
         [msg, chatbot],
-        [msg, chatbot],
-        postprocess=lambda msg, history: ("", history + [[msg, send_message_to_mcp(msg, history)]])
+        [msg, chatbot]
     )
 
     # Clear the chat history
-    clear.click(lambda: ([], ""), outputs=[chatbot, msg])
-    clear.click(lambda: [], outputs=[chatbot])
+    clear.click(start_new_conversation, outputs=[chatbot, msg])
 
 # Launch the application
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+import os
+import pytest
+
+from app.config import settings
+
+@pytest.fixture(autouse=True)
+def isolated_settings(tmp_path, monkeypatch):
+    """Point every on-disk path at a per-test directory"""
+    data_dir = tmp_path / "data"
+    processed_dir = data_dir / "processed"
+
+    monkeypatch.setattr(settings, "DATA_DIR", str(data_dir))
+    monkeypatch.setattr(settings, "PROCESSED_DATA_DIR", str(processed_dir))
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIRECTORY", str(tmp_path / "chroma"))
+    monkeypatch.setattr(settings, "VECTOR_STORE_DIR", str(processed_dir / "vectors"))
+    monkeypatch.setattr(settings, "NEIGHBOR_TABLE_DIR", str(processed_dir / "neighbors"))
+    monkeypatch.setattr(settings, "CF_MODEL_DIR", str(processed_dir / "cf"))
+    monkeypatch.setattr(settings, "JOBS_STATE_PATH", str(processed_dir / "jobs.json"))
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_DISK_PATH", "")
+    os.makedirs(processed_dir, exist_ok=True)
+    return settings
+
+@pytest.fixture
+def movies_df():
+    """Small movies frame in the shape load_movie_data returns"""
+    import pandas as pd
+
+    return pd.DataFrame({
+        "movieId": [1, 2, 3, 4, 5, 6],
+        "title": ["Toy Story (1995)", "Heat (1995)", "Alien (1979)", "Aliens (1986)", "Clueless (1995)", "Unrated"],
+        "title_clean": ["Toy Story", "Heat", "Alien", "Aliens", "Clueless", "Unrated"],
+        "year": [1995, 1995, 1979, 1986, 1995, 0],
+        "genres": [
+            ["Animation", "Children", "Comedy"],
+            ["Action", "Crime", "Thriller"],
+            ["Horror", "Sci-Fi"],
+            ["Action", "Sci-Fi"],
+            ["Comedy", "Romance"],
+            ["(no genres listed)"],
+        ],
+        "avg_rating": [3.9, 3.8, 4.1, 3.9, 3.2, float("nan")],
+        "num_ratings": [200, 100, 150, 120, 50, 0],
+    })
+
+@pytest.fixture
+def catalog(movies_df, monkeypatch):
+    """Install a catalog of movies_df as the process-wide catalog"""
+    from app.data import catalog as catalog_module
+    from app.services.neighbors import reset_neighbor_table
+    from app.services.vector_store import reset_vector_store
+
+    movie_catalog = catalog_module.MovieCatalog.from_dataframe(movies_df)
+    monkeypatch.setattr(catalog_module, "_catalog", movie_catalog)
+    reset_vector_store()
+    reset_neighbor_table()
+    yield movie_catalog
+    reset_vector_store()
+    reset_neighbor_table()
+
+class FakeEncoder:
+    """Deterministic stand-in for the SentenceTransformer: a seeded random vector per text"""
+
+    dimension = 16
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        import hashlib
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = np.array([
+            np.random.default_rng(int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)).standard_normal(self.dimension)
+            for text in texts
+        ], dtype=np.float32).reshape(len(texts), self.dimension)
+        return embeddings[0] if single else embeddings
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    """Serve embeddings from FakeEncoder, without the micro-batcher or the embedding cache"""
+    from app.services import embeddings
+
+    encoder = FakeEncoder()
+    monkeypatch.setattr(embeddings, "_model", encoder)
+    monkeypatch.setattr(settings, "EMBEDDING_MICROBATCH_ENABLED", False)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", False)
+    return encoder
+
+MOVIES_CSV = """movieId,title,genres
+1,Toy Story (1995),Adventure|Animation|Children|Comedy|Fantasy
+2,Jumanji (1995),Adventure|Children|Fantasy
+3,Heat (1995),Action|Crime|Thriller
+4,"City of Lost Children, The (Cité des enfants perdus, La) (1995)",Adventure|Drama|Fantasy|Mystery|Sci-Fi
+5,Untitled Project,(no genres listed)
+"""
+
+RATINGS_CSV = """userId,movieId,rating,timestamp
+1,1,4.0,964982703
+1,3,4.0,964981247
+2,1,5.0,964982224
+2,2,3.0,964983815
+3,1,3.5,964982931
+3,4,5.0,964982400
+"""
+
+def write_movielens_archive(path, movies_csv: str = MOVIES_CSV, ratings_csv: str = RATINGS_CSV):
+    """Write a MovieLens-shaped zip (a top-level folder holding the CSVs)"""
+    import zipfile
+
+    folder = os.path.splitext(os.path.basename(path))[0]
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(f"{folder}/movies.csv", movies_csv)
+        if ratings_csv is not None:
+            archive.writestr(f"{folder}/ratings.csv", ratings_csv)
+        archive.writestr(f"{folder}/README.txt", "Test fixture")
+    return str(path)
+
+@pytest.fixture
+def movielens_archive(tmp_path, monkeypatch):
+    """Serve a local MovieLens-shaped archive as the dataset source, with fresh loader memos"""
+    from app.data import loader
+
+    path = write_movielens_archive(tmp_path / "ml-fixture.zip")
+    monkeypatch.setattr(settings, "MOVIE_DATA_SOURCE", path)
+    monkeypatch.setattr(settings, "MOVIE_DATA_SHA256", "")
+    for memo in ("_movies", "_popularity", "_ratings"):
+        monkeypatch.setattr(loader, memo, None)
+    return path
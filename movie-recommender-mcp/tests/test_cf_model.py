@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import cf_model
+
+@pytest.fixture
+def two_taste_ratings(monkeypatch):
+    """Users 0-19 love movies 1-5, users 20-39 love movies 6-10; everyone dislikes movie 11"""
+    rng = np.random.default_rng(0)
+    rows = []
+    for user in range(40):
+        liked = range(1, 6) if user < 20 else range(6, 11)
+        for movie in rng.choice(list(liked), size=4, replace=False):
+            rows.append((user, int(movie), 5.0))
+        rows.append((user, 11, 1.0))
+
+    ratings = pd.DataFrame(rows, columns=["userId", "movieId", "rating"])
+    monkeypatch.setattr(cf_model, "load_ratings_data", lambda: ratings)
+    yield ratings
+    cf_model.reset_cf_model()
+
+def test_fold_in_recommends_from_the_same_taste(two_taste_ratings):
+    assert cf_model.train_cf_model(factors=2) == 10
+
+    model = cf_model.get_cf_model()
+    recommended = [movie_id for movie_id, _ in model.recommend([1, 2], limit=3)]
+    assert set(recommended) == {3, 4, 5}
+
+    recommended = [movie_id for movie_id, _ in model.recommend([7], limit=4)]
+    assert set(recommended) == {6, 8, 9, 10}
+
+def test_negative_ratings_are_not_items(two_taste_ratings):
+    cf_model.train_cf_model(factors=2)
+    model = cf_model.get_cf_model()
+    assert not model.knows_any([11])
+    assert model.score([11]) is None
+    assert model.recommend([11, 999], limit=3) == []
+
+def test_favourites_are_never_recommended(two_taste_ratings):
+    cf_model.train_cf_model(factors=2)
+    model = cf_model.get_cf_model()
+    scores = model.score([1, 6])
+    assert np.isneginf(scores[[model._row_by_id[1], model._row_by_id[6]]]).all()
+    assert {1, 6}.isdisjoint(movie_id for movie_id, _ in model.recommend([1, 6], limit=8))
+
+def test_missing_model_is_none():
+    cf_model.reset_cf_model()
+    assert cf_model.get_cf_model() is None
+    cf_model.reset_cf_model()
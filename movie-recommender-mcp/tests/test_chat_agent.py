@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from aiohttp.test_utils import TestServer
+
+from app.config import settings
+from app.models.mcp_models import MCPContext, MCPRequest, Message, MessageRole
+from app.routers import mcp
+from app.services import llm_client, single_flight, tool_executor
+from app.services.vector_store import save_embedding_matrix
+from benchmarks.mock_openai_server import create_app
+
+@pytest.fixture
+def chat_env(catalog, monkeypatch):
+    """Numpy vector store over the test catalog and fresh LLM/tool singletons"""
+    embeddings = np.random.default_rng(0).standard_normal((len(catalog), 8)).astype(np.float32)
+    save_embedding_matrix(catalog.ids, embeddings)
+
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "numpy")
+    monkeypatch.setattr(settings, "LLM_API_KEY", "test")
+    monkeypatch.setattr(settings, "LLM_API_BASE", settings.LLM_API_BASE)  # Set per test to the mock server
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    monkeypatch.setattr(llm_client, "_client", None)
+    monkeypatch.setattr(tool_executor, "_executor", None)
+    monkeypatch.setattr(single_flight, "_single_flight", None)
+
+async def _chat(content: str, stream: bool):
+    server = TestServer(create_app())
+    await server.start_server()
+    settings.LLM_API_BASE = str(server.make_url("/v1"))
+    try:
+        request = MCPRequest(
+            messages=[Message(role=MessageRole.USER, content=content)],
+            context=MCPContext(session_id=f"test-{stream}-{content}")
+        )
+        return [event async for event in mcp.chat_events(request, stream=stream)]
+    finally:
+        await llm_client.close_llm_client()
+        await server.close()
+
+def _run(content: str, stream: bool):
+    llm_calls = mcp._chat_stats["llm_calls"]
+    events = asyncio.run(_chat(content, stream))
+    return events, mcp._chat_stats["llm_calls"] - llm_calls
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_title_lookup_continues_to_recommendation(chat_env, stream):
+    message = (
+        '/call find_titles {"query": "toy story"} '
+        '=> recommend_similar_movies {"movie_id": 1, "limit": 2}'
+    )
+    events, llm_calls = _run(message, stream)
+
+    started = [event["name"] for event in events if event["type"] == "function_call_start"]
+    assert started == ["find_titles", "recommend_similar_movies"]
+    assert llm_calls == 3
+
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["message"]["content"].startswith("Mock response to:")
+    assert [call["name"] for call in done["function_calls"]] == started
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_text_before_tool_calls_stays_in_the_answer(chat_env, stream):
+    message = (
+        '/call say Let me look that up. | find_titles {"query": "toy story"} '
+        '=> recommend_similar_movies {"movie_id": 1, "limit": 2}'
+    )
+    events, _ = _run(message, stream)
+
+    content = events[-1]["message"]["content"]
+    assert content.startswith("Let me look that up.\n\nMock response to:")
+    assert "".join(event["content"] for event in events if event["type"] == "token") == content
+
+def test_text_before_a_rendered_step_stays_in_the_answer(chat_env):
+    message = '/call say Checking. | find_titles {"query": "alien"} => get_movie_by_id {"movie_id": 3}'
+    events, _ = _run(message, stream=True)
+
+    content = events[-1]["message"]["content"]
+    assert content.startswith("Checking.\n\nHere are details about Alien (1979)")
+    assert "".join(event["content"] for event in events if event["type"] == "token") == content
+
+def test_terminal_lookup_is_rendered_without_follow_up(chat_env):
+    events, llm_calls = _run('/call get_movie_by_id {"movie_id": 3}', stream=False)
+
+    assert llm_calls == 1
+    assert events[-1]["message"]["content"].startswith("Here are details about Alien (1979)")
+
+def test_title_matches_reach_the_model_as_summary():
+    call = mcp.FunctionCall(id="call_0", name="find_titles", arguments={"query": "alien"})
+    result = [{"id": 3, "title": "Alien", "year": 1979, "genres": ["Horror", "Sci-Fi"]}]
+    content = mcp._tool_message_content(call, result, None)
+    assert "[ID: 3]" in content
+    assert content != json.dumps(result)
@@ -0,0 +1,65 @@
+import numpy as np
+
+from app.services.embedding_cache import DiskEmbeddingStore, EmbeddingCache
+
+def _vector(seed: int, dim: int = 4) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+def test_disk_store_round_trip(tmp_path):
+    path = str(tmp_path / "embeddings")
+    store = DiskEmbeddingStore(path, capacity=8)
+    store.put("a", _vector(1))
+    store.flush()
+
+    reopened = DiskEmbeddingStore(path, capacity=8)
+    np.testing.assert_array_equal(reopened.get("a"), _vector(1))
+
+def test_stale_index_never_returns_another_keys_vector(tmp_path):
+    path = str(tmp_path / "embeddings")
+    store = DiskEmbeddingStore(path, capacity=2)
+    store.put("a", _vector(1))
+    store.put("b", _vector(2))
+    store.flush()
+
+    # Reuse both slots without flushing the index, as if the process crashed
+    store.put("c", _vector(3))
+    store.put("d", _vector(4))
+    store._matrix.flush()
+    store._tags.flush()
+
+    reopened = DiskEmbeddingStore(path, capacity=2)
+    assert reopened.get("a") is None
+    assert reopened.get("b") is None
+
+def test_dimension_change_rebuilds_file(tmp_path):
+    path = str(tmp_path / "embeddings")
+    store = DiskEmbeddingStore(path, capacity=4)
+    store.put("a", _vector(1, dim=4))
+    store.flush()
+
+    reopened = DiskEmbeddingStore(path, capacity=4)
+    reopened.put("b", _vector(2, dim=8))
+    reopened.flush()
+
+    assert reopened.get("a") is None
+    np.testing.assert_array_equal(reopened.get("b"), _vector(2, dim=8))
+    np.testing.assert_array_equal(DiskEmbeddingStore(path, capacity=4).get("b"), _vector(2, dim=8))
+
+def test_clear_drops_disk_tier(tmp_path):
+    path = str(tmp_path / "embeddings")
+    cache = EmbeddingCache(max_entries=4, disk_path=path, disk_capacity=4)
+    cache.put("a", _vector(1))
+    cache.clear()
+
+    assert cache.get("a") is None
+    assert DiskEmbeddingStore(path, capacity=4).get("a") is None
+
+def test_memory_tier_is_lru(tmp_path):
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("a", _vector(1))
+    cache.put("b", _vector(2))
+    cache.get("a")
+    cache.put("c", _vector(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.config import settings
+from app.services import embedding_cache, embeddings
+from app.services.chromadb_service import content_hash
+
+def test_model_id_includes_backend_and_quantization(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_MODEL_NAME", "model")
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "torch")
+    torch_id, torch_hash = embeddings.embedding_model_id(), content_hash("text")
+
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "onnx")
+    monkeypatch.setattr(settings, "EMBEDDING_ONNX_QUANTIZED", False)
+    onnx_id, onnx_hash = embeddings.embedding_model_id(), content_hash("text")
+
+    monkeypatch.setattr(settings, "EMBEDDING_ONNX_QUANTIZED", True)
+    int8_id, int8_hash = embeddings.embedding_model_id(), content_hash("text")
+
+    assert len({torch_id, onnx_id, int8_id}) == 3
+    assert len({torch_hash, onnx_hash, int8_hash}) == 3
+
+def test_cache_is_not_shared_across_backends(fake_encoder, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", True)
+    monkeypatch.setattr(embedding_cache, "_cache", None)
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "torch")
+
+    first = embeddings.generate_embedding("Heat")
+    cache = embedding_cache.get_embedding_cache()
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    embeddings.generate_embedding("heat")
+    assert cache.hits == 1
+
+    monkeypatch.setattr(settings, "EMBEDDING_BACKEND", "onnx")
+    second = embeddings.generate_embedding("Heat")
+    assert cache.misses == 2
+    np.testing.assert_array_equal(first, second)
+
+def test_cache_does_not_change_the_embedding(fake_encoder, monkeypatch):
+    uncached = embeddings.generate_embedding("Space Opera")
+
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", True)
+    monkeypatch.setattr(embedding_cache, "_cache", None)
+    np.testing.assert_array_equal(embeddings.generate_embedding("Space Opera"), uncached)
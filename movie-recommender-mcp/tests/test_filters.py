@@ -0,0 +1,69 @@
+from app.data.catalog import MovieCatalog
+from app.services.chromadb_service import build_metadata_filter, build_movie_metadata
+from app.services.vector_store import where_to_mask
+from app.tools import search_tools
+from app.tools.search_tools import _has_any_genre
+
+def _ids(catalog, mask):
+    return catalog.ids[mask].tolist()
+
+def test_where_to_mask_matches_genre_spellings(movies_df):
+    catalog = MovieCatalog.from_dataframe(movies_df)
+    for spelling in ("Sci-Fi", "sci fi", "SCI_FI"):
+        assert _ids(catalog, where_to_mask(build_metadata_filter(genres=[spelling]), catalog)) == [3, 4]
+
+def test_where_to_mask_combines_filters(movies_df):
+    catalog = MovieCatalog.from_dataframe(movies_df)
+    where = build_metadata_filter(genres=["Comedy", "Action"], year_from=1990, min_rating=3.5)
+    assert _ids(catalog, where_to_mask(where, catalog)) == [1, 2]
+
+def test_where_to_mask_skips_missing_values(movies_df):
+    catalog = MovieCatalog.from_dataframe(movies_df)
+    assert 6 not in _ids(catalog, where_to_mask(build_metadata_filter(year_to=2000), catalog))
+    assert 6 not in _ids(catalog, where_to_mask(build_metadata_filter(min_rating=0), catalog))
+
+def test_unknown_genre_matches_nothing(movies_df):
+    catalog = MovieCatalog.from_dataframe(movies_df)
+    assert _ids(catalog, where_to_mask(build_metadata_filter(genres=["Bollywood"]), catalog)) == []
+
+def test_catalog_filter_agrees_with_where_clause(movies_df):
+    catalog = MovieCatalog.from_dataframe(movies_df)
+    filters = {"genres": ["sci fi", "Romance"], "year_from": 1980}
+    expected = where_to_mask(build_metadata_filter(**filters), catalog)
+    assert _ids(catalog, catalog.filter_mask(**filters)) == _ids(catalog, expected)
+
+def test_post_filter_keeps_pushed_down_matches():
+    metadata = build_movie_metadata(4, "Aliens", 1986, ["Action", "Sci-Fi"], genre_mask=0)
+    where = build_metadata_filter(genres=["Sci Fi"])
+    assert all(metadata.get(key) == value for key, value in where.items())
+    assert _has_any_genre({"genres": ["Action", "Sci-Fi"]}, ["Sci Fi"])
+    assert not _has_any_genre({"genres": ["Comedy"]}, ["Sci Fi"])
+
+def _fake_vector_search(monkeypatch, rows):
+    calls = []
+
+    def search_similar_movies(query_text=None, movie_id=None, filter_dict=None, limit=5):
+        calls.append(limit)
+        return rows[:limit]
+
+    monkeypatch.setattr(search_tools, "search_similar_movies", search_similar_movies)
+    return calls
+
+def test_overfetch_requeries_until_limit_hits(monkeypatch):
+    rows = [{"id": i, "title": str(i), "genres": ["Sci-Fi"] if i % 3 == 0 else ["Drama"]} for i in range(1, 100)]
+    calls = _fake_vector_search(monkeypatch, rows)
+
+    results = search_tools._search_with_overfetch("space", None, None, ["Sci Fi"], limit=5)
+    assert [movie["id"] for movie in results][:5] == [3, 6, 9, 12, 15]
+    assert calls == [5, 10, 20]
+
+def test_overfetch_stops_when_candidates_run_out(monkeypatch, isolated_settings):
+    rows = [{"id": i, "title": str(i), "genres": ["Drama"]} for i in range(1, 100)]
+    calls = _fake_vector_search(monkeypatch, rows[:7])
+    assert search_tools._search_with_overfetch("space", None, None, ["Sci Fi"], limit=5) == []
+    assert calls == [5, 10]
+
+    calls = _fake_vector_search(monkeypatch, rows)
+    monkeypatch.setattr(isolated_settings, "SEARCH_MAX_OVERFETCH", 3)
+    assert search_tools._search_with_overfetch("space", None, None, ["Sci Fi"], limit=5) == []
+    assert calls == [5, 10, 15]
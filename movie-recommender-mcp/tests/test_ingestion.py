@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from app.config import settings
+from app.data.catalog import MovieCatalog
+from app.services import chromadb_service
+from app.services.neighbors import build_neighbor_table, get_neighbor_table
+from app.services.vector_store import NumpyVectorStore, collection_fingerprint_path, read_fingerprint
+
+@pytest.fixture
+def ingest(movies_df, catalog, fake_encoder, monkeypatch):
+    """Run populate_chroma_from_data against a fresh collection, over a given movies frame"""
+    monkeypatch.setattr(chromadb_service, "_client", None)
+
+    def run(frame=None):
+        monkeypatch.setattr(chromadb_service, "reload_catalog", lambda: MovieCatalog.from_dataframe(
+            movies_df if frame is None else frame
+        ))
+        return chromadb_service.populate_chroma_from_data(batch_size=2)
+
+    return run
+
+def test_second_run_finds_nothing_to_do(ingest):
+    first = ingest()
+    assert (first["added"], first["embedded"]) == (6, 6)
+
+    second = ingest()
+    assert (second["unchanged"], second["embedded"], second["metadata_updated"], second["deleted"]) == (6, 0, 0, 0)
+
+def test_rating_change_updates_metadata_only(ingest, movies_df):
+    ingest()
+    changed = movies_df.copy()
+    changed.loc[changed["movieId"] == 2, "avg_rating"] = 4.5
+
+    stats = ingest(changed)
+    assert (stats["embedded"], stats["metadata_updated"]) == (0, 1)
+
+    stored = chromadb_service.get_chroma_client().get_collection("movies").get(ids=["movie_2"])
+    assert stored["metadatas"][0]["avg_rating"] == 4.5
+
+def test_title_change_and_removal(ingest, movies_df):
+    ingest()
+    changed = movies_df[movies_df["movieId"] != 6].copy()
+    changed.loc[changed["movieId"] == 1, "title_clean"] = "Toy Story!"
+
+    stats = ingest(changed)
+    assert (stats["changed"], stats["embedded"], stats["deleted"]) == (1, 1, 1)
+    assert chromadb_service.get_chroma_client().get_collection("movies").count() == 5
+
+def test_chroma_backend_does_not_export_matrix(ingest, monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "chroma")
+    ingest()
+    assert not os.path.exists(os.path.join(settings.VECTOR_STORE_DIR, "embeddings.npy"))
+
+def test_neighbor_table_builds_with_chroma_backend(ingest, movies_df, monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "chroma")
+    ingest()
+    assert build_neighbor_table(k=3) == 6
+    assert get_neighbor_table() is not None
+
+    # A rebuild after the collection changed exports the matrix again
+    ingest(movies_df[movies_df["movieId"] != 6])
+    assert get_neighbor_table() is None
+    assert build_neighbor_table(k=3) == 5
+    assert get_neighbor_table().lookup(1, 3) is not None
+
+def test_numpy_backend_exports_matching_matrix(ingest, monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "numpy")
+    ingest()
+
+    store = NumpyVectorStore()
+    assert sorted(store.ids.tolist()) == [1, 2, 3, 4, 5, 6]
+    assert store.fingerprint == read_fingerprint(collection_fingerprint_path())
+
+def test_metadata_hash_ignores_value_types():
+    metadata = chromadb_service.build_movie_metadata(1, "Heat", 1995, ["Action"], 1, 3.8, 100, "abc")
+    same = chromadb_service.build_movie_metadata(1, "Heat", "1995", ["Action"], 1, 3.8000001, 100.0, "abc")
+    assert metadata["metadata_hash"] == same["metadata_hash"]
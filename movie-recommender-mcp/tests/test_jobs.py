@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from app.services import jobs
+
+def _wait(registry, job_id, statuses=(jobs.COMPLETED, jobs.FAILED, jobs.CANCELLED), timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = registry.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish: {registry.get(job_id)}")
+
+@pytest.fixture
+def registry(tmp_path):
+    return jobs.JobRegistry(path=str(tmp_path / "jobs.json"), max_history=10)
+
+@pytest.fixture
+def gated_runner():
+    """Runner that processes 4 units, pausing before each one until released"""
+    release = threading.Semaphore(0)
+    seen = []
+
+    def run(context):
+        seen.append(context.committed)
+        for done in range(context.checkpoint + 1, 5):
+            if context.cancelled():
+                break
+            release.acquire(timeout=5)
+            context.report(done, 4, checkpoint=done)
+        return {"committed": context.committed}
+
+    jobs.register_job_runner("test-gated", run)
+    yield release, seen
+    jobs._runners.pop("test-gated", None)
+
+def test_job_reports_progress_and_completes(registry, gated_runner):
+    release, _ = gated_runner
+    job = registry.submit("test-gated", {"batch_size": 1})
+
+    release.release()
+    running = _wait(registry, job["id"], statuses=(jobs.RUNNING,))
+    assert running["params"] == {"batch_size": 1}
+
+    for _ in range(4):
+        release.release()
+    finished = _wait(registry, job["id"])
+    assert (finished["status"], finished["done"], finished["total"], finished["percent"]) == (jobs.COMPLETED, 4, 4, 100.0)
+
+def test_one_active_job_per_kind(registry, gated_runner):
+    release, _ = gated_runner
+    job = registry.submit("test-gated")
+    with pytest.raises(jobs.JobAlreadyRunningError) as error:
+        registry.submit("test-gated")
+    assert error.value.job_id == job["id"]
+
+    for _ in range(4):
+        release.release()
+    _wait(registry, job["id"])
+
+def test_cancel_stops_between_batches(registry, gated_runner):
+    release, _ = gated_runner
+    job = registry.submit("test-gated")
+    release.release()
+    _wait(registry, job["id"], statuses=(jobs.RUNNING,))
+
+    registry.cancel(job["id"])
+    release.release()
+    cancelled = _wait(registry, job["id"])
+    assert cancelled["status"] == jobs.CANCELLED
+    assert cancelled["done"] < 4
+
+def test_interrupted_job_resumes_from_checkpoint(tmp_path, gated_runner):
+    release, seen = gated_runner
+    path = str(tmp_path / "jobs.json")
+    first = jobs.JobRegistry(path=path, max_history=10)
+
+    job = first.submit("test-gated")
+    release.release()
+    release.release()
+    deadline = time.monotonic() + 5
+    while first.get(job["id"])["checkpoint"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Simulate the process dying: nothing the first run does from here on is recorded
+    first.update = lambda job_id, **changes: None
+    for _ in range(2):
+        release.release()
+    for thread in threading.enumerate():
+        if thread.name == f"job-test-gated-{job['id'][:8]}":
+            thread.join(timeout=5)
+
+    # A new registry reading the same state sees the job as interrupted, as after a restart
+    restarted = jobs.JobRegistry(path=path, max_history=10)
+    assert restarted.get(job["id"])["status"] == jobs.INTERRUPTED
+    assert restarted.resume_interrupted() == [job["id"]]
+
+    for _ in range(2):
+        release.release()
+    finished = _wait(restarted, job["id"])
+    assert (finished["status"], finished["done"], finished["attempts"]) == (jobs.COMPLETED, 4, 2)
+    assert seen == [0, 2]
+
+def test_unknown_kind_is_rejected(registry):
+    with pytest.raises(ValueError):
+        registry.submit("no-such-job")
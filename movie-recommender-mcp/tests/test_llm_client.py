@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from app.services.llm_client import LLMClient
+from benchmarks.mock_openai_server import create_app
+
+async def _stream_once(stream_usage: bool):
+    server = TestServer(create_app())
+    await server.start_server()
+    client = LLMClient(
+        base_url=str(server.make_url("/v1")), api_key="test", max_concurrency=2,
+        timeout_seconds=5, connect_timeout_seconds=5, max_retries=0,
+        backoff_base_seconds=0, backoff_max_seconds=0, stream_usage=stream_usage
+    )
+    try:
+        payload = {"model": "mock", "messages": [{"role": "user", "content": "hello there"}]}
+        chunks = [chunk async for chunk in client.stream_chat_completion(payload)]
+        return chunks, client.stats()
+    finally:
+        await client.close()
+        await server.close()
+
+@pytest.mark.parametrize("stream_usage", [False, True])
+def test_stream_usage_is_requested_only_when_enabled(stream_usage):
+    chunks, stats = asyncio.run(_stream_once(stream_usage))
+
+    assert any(chunk.get("usage") for chunk in chunks) == stream_usage
+    assert stats["calls"] == 1 and stats["streams"] == 1
+    assert stats["calls_without_usage"] == (0 if stream_usage else 1)
+    assert (stats["prompt_tokens"] > 0) == stream_usage
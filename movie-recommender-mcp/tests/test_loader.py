@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.data import loader
+from tests.conftest import MOVIES_CSV, write_movielens_archive
+
+def _sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def test_extracts_archive_once(movielens_archive):
+    directory = loader.download_and_extract_dataset()
+
+    assert directory == os.path.join(settings.DATA_DIR, "ml-fixture")
+    assert {"movies.csv", "ratings.csv", ".archive_sha256"} <= set(os.listdir(directory))
+
+    mtime = os.stat(os.path.join(directory, "movies.csv")).st_mtime_ns
+    assert loader.download_and_extract_dataset() == directory
+    assert os.stat(os.path.join(directory, "movies.csv")).st_mtime_ns == mtime
+
+def test_file_url_source(movielens_archive, monkeypatch):
+    monkeypatch.setattr(settings, "MOVIE_DATA_SOURCE", f"file://{movielens_archive}")
+    assert os.path.exists(os.path.join(loader.download_and_extract_dataset(), "movies.csv"))
+
+def test_checksum_mismatch_is_rejected(movielens_archive, monkeypatch):
+    monkeypatch.setattr(settings, "MOVIE_DATA_SHA256", "0" * 64)
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        loader.download_and_extract_dataset()
+    assert not os.path.exists(loader.dataset_dir())
+
+    monkeypatch.setattr(settings, "MOVIE_DATA_SHA256", _sha256(movielens_archive).upper())
+    loader.download_and_extract_dataset()
+
+def test_builds_column_cache(movielens_archive):
+    movies = loader.load_movie_data()
+
+    assert movies["movieId"].tolist() == [1, 2, 3, 4, 5]
+    assert movies["title_clean"].tolist()[3] == "City of Lost Children, The (Cité des enfants perdus, La)"
+    assert movies["year"].tolist() == [1995, 1995, 1995, 1995, 0]
+    assert movies["genres"].tolist()[2] == ["Action", "Crime", "Thriller"]
+    assert movies["num_ratings"].tolist() == [3, 1, 1, 1, 0]
+    assert movies["avg_rating"].tolist()[0] == pytest.approx(12.5 / 3)
+    assert np.isnan(movies["avg_rating"].tolist()[4])
+
+    directory = loader.cache_dir()
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    assert manifest["archive_sha256"] == _sha256(movielens_archive)
+    assert manifest["rows"] == {"movies": 5, "ratings": 6}
+    assert os.path.exists(os.path.join(directory, "ratings.rating.npy"))
+
+def test_reloads_from_memmap_without_parsing(movielens_archive, monkeypatch):
+    expected = loader.load_movie_data().copy()
+
+    def fail(path):
+        raise AssertionError(f"{path} was parsed again")
+
+    monkeypatch.setattr(loader, "parse_movies_csv", fail)
+    monkeypatch.setattr(loader, "parse_ratings_csv", fail)
+    monkeypatch.setattr(loader, "_movies", None)
+    monkeypatch.setattr(loader, "_ratings", None)
+
+    movies = loader.load_movie_data()
+    assert movies[["movieId", "title", "year", "num_ratings"]].equals(expected[["movieId", "title", "year", "num_ratings"]])
+
+    columns = loader._load_columns(loader.cache_dir(), "ratings", loader.RATING_COLUMNS)
+    assert all(isinstance(values, np.memmap) for values in columns.values())
+    assert loader.load_ratings_data()["rating"].sum() == pytest.approx(24.5)
+
+def test_changed_archive_invalidates_cache(movielens_archive):
+    assert len(loader.load_movie_data()) == 5
+
+    write_movielens_archive(
+        movielens_archive,
+        movies_csv=MOVIES_CSV + "6,Grumpier Old Men (1995),Comedy|Romance\n",
+        ratings_csv="userId,movieId,rating,timestamp\n1,6,2.0,964982703\n"
+    )
+
+    movies = loader.load_movie_data()
+    assert movies["movieId"].tolist() == [1, 2, 3, 4, 5, 6]
+    assert movies["num_ratings"].tolist() == [0, 0, 0, 0, 0, 1]
+    assert "Grumpier Old Men (1995)" in open(os.path.join(loader.dataset_dir(), "movies.csv")).read()
+
+def test_missing_ratings(movielens_archive):
+    write_movielens_archive(movielens_archive, ratings_csv=None)
+
+    movies = loader.load_movie_data()
+    assert movies["num_ratings"].sum() == 0
+    with pytest.raises(FileNotFoundError):
+        loader.load_ratings_data()
@@ -0,0 +1,60 @@
+import numpy as np
+
+from app.routers import admin
+from app.services import chromadb_service, jobs
+from app.services.neighbors import build_neighbor_table, get_neighbor_table, reset_neighbor_table
+from app.services.vector_store import (
+    collection_fingerprint_path, embeddings_fingerprint, save_embedding_matrix, write_fingerprint
+)
+from app.tools import recommend_tools
+from tests.test_jobs import _wait
+
+def _save_matrix(catalog, hashes):
+    embeddings = np.random.default_rng(0).standard_normal((len(catalog), 8)).astype(np.float32)
+    fingerprint = embeddings_fingerprint(catalog.ids, hashes)
+    save_embedding_matrix(catalog.ids, embeddings, fingerprint=fingerprint)
+    return fingerprint
+
+def test_table_is_used_while_collection_matches(catalog):
+    hashes = [f"h{movie_id}" for movie_id in catalog.ids]
+    write_fingerprint(collection_fingerprint_path(), _save_matrix(catalog, hashes))
+    build_neighbor_table(k=3)
+
+    table = get_neighbor_table()
+    assert table is not None
+    neighbors = table.lookup(1, 3)
+    assert len(neighbors) == 3 and 1 not in [movie_id for movie_id, _ in neighbors]
+
+def test_table_is_ignored_after_collection_changes(catalog):
+    hashes = [f"h{movie_id}" for movie_id in catalog.ids]
+    write_fingerprint(collection_fingerprint_path(), _save_matrix(catalog, hashes))
+    build_neighbor_table(k=3)
+
+    hashes[0] = "re-embedded"
+    write_fingerprint(collection_fingerprint_path(), embeddings_fingerprint(catalog.ids, hashes))
+    reset_neighbor_table()
+
+    assert get_neighbor_table() is None
+    assert recommend_tools._lookup_neighbors(1, 3) is None
+
+def test_fingerprint_ignores_row_order():
+    assert embeddings_fingerprint([1, 2], ["a", "b"]) == embeddings_fingerprint([2, 1], ["b", "a"])
+    assert embeddings_fingerprint([1, 2], ["a", "b"]) != embeddings_fingerprint([1, 2], ["a", "c"])
+
+def test_similar_movies_for_unknown_id_is_empty(catalog):
+    assert recommend_tools.recommend_similar_movies(999999) == []
+
+def test_build_runs_as_a_tracked_job(catalog, tmp_path):
+    hashes = [f"h{movie_id}" for movie_id in catalog.ids]
+    write_fingerprint(collection_fingerprint_path(), _save_matrix(catalog, hashes))
+
+    registry = jobs.JobRegistry(path=str(tmp_path / "jobs.json"), max_history=10)
+    job = _wait(registry, registry.submit(admin.NEIGHBOR_TABLE_JOB, {"k": 3})["id"])
+    assert (job["status"], job["done"], job["total"], job["result"]) == (jobs.COMPLETED, 6, 6, {"movies": 6})
+
+def test_failed_build_is_reported_by_the_job(catalog, tmp_path, monkeypatch):
+    monkeypatch.setattr(chromadb_service, "_client", None)
+
+    registry = jobs.JobRegistry(path=str(tmp_path / "jobs.json"), max_history=10)
+    job = _wait(registry, registry.submit(admin.NEIGHBOR_TABLE_JOB, {"k": 3})["id"])
+    assert job["status"] == jobs.FAILED and job["error"]
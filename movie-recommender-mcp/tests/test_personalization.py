@@ -0,0 +1,15 @@
+import numpy as np
+
+from app.config import settings
+from app.services.vector_store import save_embedding_matrix
+from app.tools import recommend_tools
+
+def test_multi_seed_boosts_favourite_genres_by_slug(catalog, monkeypatch):
+    embeddings = np.random.default_rng(0).standard_normal((len(catalog), 8)).astype(np.float32)
+    save_embedding_matrix(catalog.ids, embeddings)
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "numpy")
+    monkeypatch.setattr(settings, "PERSONALIZATION_GENRE_BOOST", 10.0)
+
+    recommendations = recommend_tools._recommend_multi_seed([1], ["sci fi"], limit=5)
+    assert {movie["id"] for movie in recommendations[:2]} == {3, 4}
+    assert 1 not in [movie["id"] for movie in recommendations]
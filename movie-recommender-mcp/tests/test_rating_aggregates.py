@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data import loader
+
+def test_aggregates_match_pandas():
+    rng = np.random.default_rng(0)
+    movie_ids = np.array([1, 2, 5, 10, 42], dtype=np.int64)
+    rating_movie_ids = rng.choice([1, 2, 5, 10, 99], size=500).astype(np.int32)  # 99 is not in the movies table
+    ratings = rng.choice(np.arange(0.5, 5.5, 0.5), size=500).astype(np.float32)
+
+    aggregates = loader.compute_rating_aggregates(movie_ids, rating_movie_ids, ratings, prior_count=10)
+
+    frame = pd.DataFrame({"movieId": rating_movie_ids, "rating": ratings})
+    frame = frame[frame["movieId"].isin(movie_ids)]
+    expected = frame.groupby("movieId")["rating"].agg(["mean", "count"]).reindex(movie_ids)
+
+    np.testing.assert_allclose(aggregates["avg_rating"], expected["mean"], rtol=1e-5)
+    assert aggregates["num_ratings"].tolist() == expected["count"].fillna(0).astype(int).tolist()
+    assert np.isnan(aggregates["avg_rating"][4]) and np.isnan(aggregates["bayesian_score"][4])
+
+    global_mean = frame["rating"].mean()
+    bayes = (expected["mean"] * expected["count"] + 10 * global_mean) / (expected["count"] + 10)
+    np.testing.assert_allclose(aggregates["bayesian_score"][:4], bayes[:4], rtol=1e-5)
+
+def test_popularity_orders_by_count_then_score():
+    movie_ids = np.array([1, 2, 3, 4])
+    rating_movie_ids = np.array([1, 2, 2, 3, 3, 3, 4, 4])
+    ratings = np.array([5.0, 1.0, 1.0, 4.0, 4.0, 4.0, 5.0, 5.0])
+
+    aggregates = loader.compute_rating_aggregates(movie_ids, rating_movie_ids, ratings, prior_count=1)
+    assert movie_ids[aggregates["popularity_order"]].tolist() == [3, 4, 2, 1]
+
+def test_without_ratings():
+    aggregates = loader.compute_rating_aggregates(np.array([1, 2]), None, None, prior_count=10)
+    assert aggregates["num_ratings"].tolist() == [0, 0]
+    assert np.isnan(aggregates["avg_rating"]).all()
+
+def test_popular_movies_from_cache(movielens_archive):
+    popular = loader.get_popular_movies(limit=2)
+    assert [movie["id"] for movie in popular] == [1, 4]
+    assert popular[0]["num_ratings"] == 3 and popular[0]["avg_rating"] == pytest.approx(4.17)
@@ -0,0 +1,43 @@
+import numpy as np
+
+from app.services.response_cache import SemanticResponseCache, cache_key_text, context_fingerprint
+
+def _cache(**overrides):
+    options = {"max_entries": 2, "ttl_seconds": 60, "threshold": 0.9, **overrides}
+    return SemanticResponseCache(**options)
+
+def test_similar_query_hits():
+    cache = _cache()
+    cache.put(np.array([1.0, 0.0, 0.0]), "ctx", {"message": {"content": "answer"}})
+
+    hit = cache.lookup(np.array([0.95, 0.1, 0.0]), "ctx")
+    assert hit["message"]["content"] == "answer"
+    assert hit["similarity"] >= 0.9
+    assert cache.lookup(np.array([0.0, 1.0, 0.0]), "ctx") is None
+
+def test_context_must_match_exactly():
+    cache = _cache()
+    cache.put(np.array([1.0, 0.0]), context_fingerprint(["Drama"], [1]), {"message": "a"})
+    assert cache.lookup(np.array([1.0, 0.0]), context_fingerprint(["drama"], [1])) is not None
+    assert cache.lookup(np.array([1.0, 0.0]), context_fingerprint(["Drama"], [2])) is None
+
+def test_least_recently_used_entry_is_replaced():
+    cache = _cache()
+    cache.put(np.array([1.0, 0.0, 0.0]), "ctx", {"message": "x"})
+    cache.put(np.array([0.0, 1.0, 0.0]), "ctx", {"message": "y"})
+    cache._last_used[0] += 1  # "x" was used most recently
+    cache.put(np.array([0.0, 0.0, 1.0]), "ctx", {"message": "z"})
+
+    assert cache.lookup(np.array([1.0, 0.0, 0.0]), "ctx")["message"] == "x"
+    assert cache.lookup(np.array([0.0, 1.0, 0.0]), "ctx") is None
+    assert cache.stats()["evictions"] == 1
+
+def test_entries_expire():
+    cache = _cache(ttl_seconds=60)
+    cache.put(np.array([1.0, 0.0]), "ctx", {"message": "x"})
+    cache._created_at[0] -= 120
+    assert cache.lookup(np.array([1.0, 0.0]), "ctx") is None
+    assert cache.stats()["expired"] == 1
+
+def test_key_text_ignores_genre_order():
+    assert cache_key_text(" hi ", ["Drama", "Action"]) == cache_key_text("hi", ["Action", "Drama"])
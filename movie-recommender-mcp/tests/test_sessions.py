@@ -0,0 +1,62 @@
+from app.models.mcp_models import Message, MessageRole
+from app.services.session_store import InMemorySessionStore, SessionState
+from app.utils.history import fit_history, history_tokens
+
+def _turns(count: int, words: int = 20):
+    roles = [MessageRole.USER, MessageRole.ASSISTANT]
+    return [Message(role=roles[i % 2], content=f"turn {i} " + "word " * words) for i in range(count)]
+
+def test_history_within_budget_is_untouched():
+    messages = _turns(2)
+    assert fit_history(messages, None, token_budget=10_000) == (messages, None)
+
+def test_old_turns_are_summarized_within_budget():
+    messages = _turns(20)
+    kept, summary = fit_history(messages, None, token_budget=200)
+
+    assert kept[-1] is messages[-1]
+    assert kept == messages[len(messages) - len(kept):]
+    assert summary.startswith("- ")
+    assert "turn 0" not in "".join(message.content for message in kept)
+    assert history_tokens(kept, summary) <= 200
+
+def test_latest_message_is_always_kept():
+    huge = Message(role=MessageRole.USER, content="word " * 2000)
+    kept, summary = fit_history(_turns(2) + [huge], None, token_budget=100)
+    assert kept == [huge]
+    assert summary is not None
+
+def test_summary_accumulates_across_calls():
+    kept, summary = fit_history(_turns(10), None, token_budget=200)
+    kept, summary = fit_history(kept + _turns(10), summary, token_budget=200)
+    assert history_tokens(kept, summary) <= 200
+
+def test_store_returns_copies():
+    store = InMemorySessionStore(ttl_seconds=60, max_sessions=10)
+    store.save("a", SessionState(messages=_turns(1)))
+
+    state = store.get("a")
+    state.messages.append(Message(role=MessageRole.ASSISTANT, content="not saved"))
+    assert len(store.get("a").messages) == 1
+
+def test_store_expires_and_evicts():
+    store = InMemorySessionStore(ttl_seconds=60, max_sessions=2)
+    for session_id in ("a", "b", "c"):
+        store.save(session_id, SessionState())
+    assert store.get("a") is None
+    assert store.stats()["evictions"] == 1
+
+    store._sessions["b"].updated_at -= 120
+    assert store.get("b") is None
+    assert store.stats()["expired"] == 1
+    assert store.delete("c") and not store.delete("c")
+
+def test_idle_session_expires_when_read():
+    store = InMemorySessionStore(ttl_seconds=60, max_sessions=10)
+    for session_id in ("a", "b"):
+        store.save(session_id, SessionState())
+
+    store.get("a")  # Moves "a" behind "b" without refreshing it
+    store._sessions["a"].updated_at -= 120
+    assert store.get("a") is None
+    assert store.stats()["expired"] == 1
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight, call_key
+
+def test_call_key_ignores_argument_order():
+    assert call_key("tool", {"a": 1, "b": [2]}) == call_key("tool", {"b": [2], "a": 1})
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        group = SingleFlight(ttl_seconds=0, max_entries=10)
+        executions = 0
+
+        async def compute():
+            nonlocal executions
+            executions += 1
+            await asyncio.sleep(0.01)
+            return {"movies": [1, 2]}
+
+        results = await asyncio.gather(*(group.do("tool", "key", compute) for _ in range(5)))
+        return group, executions, results
+
+    group, executions, results = asyncio.run(scenario())
+    assert executions == 1
+    assert all(result == {"movies": [1, 2]} for result in results)
+    assert len({id(result) for result in results}) == 5  # Each caller gets its own copy
+    assert group.stats()["total"]["coalesced"] == 4
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def scenario():
+        group = SingleFlight(ttl_seconds=0, max_entries=10)
+        started = asyncio.Event()
+
+        async def compute():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.ensure_future(group.do("tool", "key", compute))
+        await started.wait()
+        follower = asyncio.ensure_future(group.do("tool", "key", compute))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, group.stats()["total"]
+
+    result, totals = asyncio.run(scenario())
+    assert result == "result"
+    assert totals["executions"] == 1
+
+def test_errors_are_shared_but_not_cached():
+    async def scenario():
+        group = SingleFlight(ttl_seconds=60, max_entries=10)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        outcomes = await asyncio.gather(
+            group.do("tool", "key", compute), group.do("tool", "key", compute), return_exceptions=True
+        )
+        with pytest.raises(ValueError):
+            await group.do("tool", "key", compute)
+        return outcomes, calls
+
+    outcomes, calls = asyncio.run(scenario())
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert calls == 2
+
+def test_results_are_cached_for_ttl():
+    async def scenario():
+        group = SingleFlight(ttl_seconds=60, max_entries=10)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return [calls]
+
+        first = await group.do("tool", "key", compute)
+        first.append("mutated")
+        return await group.do("tool", "key", compute), calls
+
+    second, calls = asyncio.run(scenario())
+    assert second == [1]
+    assert calls == 1
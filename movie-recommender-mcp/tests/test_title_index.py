@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.data.title_index import TitleIndex
+from app.utils.text_utils import normalize_text
+
+TITLES = ["Alien", "Aliens", "Alien: Resurrection", "Toy Story", "Toy Story 2", "Heat", "The Matrix"]
+
+def _index():
+    return TitleIndex(np.array([normalize_text(title) for title in TITLES]))
+
+def _titles(matches):
+    return [TITLES[row] for row, _, _ in matches]
+
+def test_exact_match_ranks_first():
+    matches = _index().search("alien", limit=3)
+    assert _titles(matches)[0] == "Alien"
+    assert [match_type for _, _, match_type in matches] == ["exact", "prefix", "prefix"]
+
+def test_prefix_and_substring():
+    index = _index()
+    assert _titles(index.search("toy sto", limit=2, fuzzy=False)) == ["Toy Story", "Toy Story 2"]
+    assert _titles(index.search("matrix", limit=5, fuzzy=False)) == ["The Matrix"]
+    assert index.search("matrix", fuzzy=False)[0][2] == "partial"
+
+def test_fuzzy_tolerates_typos():
+    matches = _index().search("toy stroy", limit=2)
+    assert _titles(matches)[0] in ("Toy Story", "Toy Story 2")
+    assert matches[0][2] == "fuzzy"
+
+def test_mask_filters_rows():
+    mask = np.array([title != "Alien" for title in TITLES])
+    assert "Alien" not in _titles(_index().search("alien", mask=mask))
+
+def test_empty_and_unknown_queries():
+    index = _index()
+    assert index.search("") == []
+    assert index.search("zzzzzz") == []